@@ -0,0 +1,540 @@
+"""
+Asyncio engine for the scholarly article scraper.
+AsyncScholarlyArticleScraper has the same public surface as
+EnhancedScholarlyArticleScraper, but its search, download and category
+methods are coroutines backed by one pooled aiohttp connector, so many
+queries and categories can run at once within the per-host rate limits.
+SyncScholarlyScraper wraps it for blocking callers such as main().
+"""
+
+import asyncio
+import io
+import os
+import time
+from concurrent.futures import Future as ThreadFuture
+from datetime import datetime
+
+import requests
+
+try:
+    import aiohttp
+except ImportError:
+    aiohttp = None
+
+from blob_store import InvalidPDFError, check_content_type
+from enhanced_scholarly_scraper import EnhancedScholarlyArticleScraper
+from paper import Paper
+from rate_limiter import get_host
+from resilience import BLOCKED_STATUSES, CircuitOpenError
+from response_cache import build_response, revalidation_headers
+from transport import DOWNLOAD_HEADERS
+
+# Every chunk is written from a worker thread, so chunks are larger than the sync engine's
+DOWNLOAD_CHUNK_SIZE = 64 * 1024
+
+
+class AsyncScholarlyArticleScraper(EnhancedScholarlyArticleScraper):
+    """Coroutine-based variant of EnhancedScholarlyArticleScraper."""
+
+    def __init__(self, base_path='Academic_Papers', max_connections=64, connections_per_host=4,
+                 query_concurrency=4, **kwargs):
+        if aiohttp is None:
+            raise ImportError("The async engine requires aiohttp: pip install aiohttp")
+
+        super().__init__(base_path, **kwargs)
+        self.max_connections = max_connections
+        self.connections_per_host = connections_per_host
+        self.query_concurrency = query_concurrency
+        self.http = None
+        self._loop = None
+        self._download_slots = None
+
+    async def open(self):
+        """Create the pooled HTTP client; must be called from inside the event loop."""
+        if self.http is None:
+            connector = aiohttp.TCPConnector(limit=self.max_connections,
+                                             limit_per_host=self.connections_per_host,
+                                             ttl_dns_cache=300)
+            self.http = aiohttp.ClientSession(connector=connector, headers=dict(self.session.headers))
+            # Semaphores belong to the loop they are first used on, and each
+            # SyncScholarlyScraper call runs on a new one
+            self._download_slots = {}
+            self._loop = asyncio.get_running_loop()
+        return self
+
+    async def close(self):
+        if self.http is not None:
+            await self.http.close()
+            self.http = None
+            self._loop = None
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc_info):
+        await self.close()
+
+    async def _throttle(self, url):
+        wait = self.rate_limiter.reserve(url)
+        if wait > 0:
+            self.metrics.inc('rate_limit_sleep_seconds', wait, host=get_host(url))
+            await asyncio.sleep(wait)
+
+    async def _fetch(self, url, source=None, headers=None, timeout=15, max_throttle_wait=60, stream=False):
+        """
+        GET `url` within its host's rate budget and return an in-memory requests.Response,
+        retrying 429/5xx and connection errors like the sync _send. With `stream`, the
+        final aiohttp response is returned instead, its body unread, for the caller to close.
+        """
+        breaker = self.circuit_breakers.get(source)
+        if breaker:
+            try:
+                breaker.check()
+            except CircuitOpenError:
+                self.metrics.inc('circuit_open_skips', source=source)
+                raise
+            deadline = time.monotonic() + self.academic_sources[source]['time_budget']
+            scraped = self.academic_sources[source].get('scraped', False)
+        else:
+            deadline = time.monotonic() + max_throttle_wait
+            scraped = False
+
+        for attempt in range(self.retry_policy.max_attempts):
+            await self._throttle(url)
+            retry_after = None
+            try:
+                with self.metrics.timer('request_seconds', source=source or 'download'):
+                    resp = await self.http.get(url, headers=headers, timeout=aiohttp.ClientTimeout(total=timeout))
+                    if stream:
+                        response = build_response(str(resp.url), resp.status, dict(resp.headers), b'')
+                    else:
+                        async with resp:
+                            content = await resp.read()
+                        response = build_response(str(resp.url), resp.status, dict(resp.headers), content)
+            except (aiohttp.ClientConnectionError, aiohttp.ClientPayloadError, asyncio.TimeoutError) as e:
+                response, error = None, e
+                self.metrics.inc('request_errors', source=source or 'download')
+            except Exception:
+                # Not worth retrying (redirect loop, bad URL), but a half-open trial must still end
+                self.metrics.inc('request_errors', source=source or 'download')
+                if breaker:
+                    breaker.record_failure()
+                raise
+            else:
+                self.metrics.inc('responses', source=source or 'download', status=response.status_code)
+                retry_after = self.rate_limiter.update_from_response(url, response)
+                if scraped and response.status_code in BLOCKED_STATUSES:
+                    breaker.record_failure()
+                    return resp if stream else response
+                if not self.retry_policy.should_retry(response.status_code):
+                    if breaker:
+                        breaker.record_success()
+                    return resp if stream else response
+                error = f"HTTP {response.status_code}"
+
+            delay = self.retry_policy.delay(attempt, retry_after)
+            if attempt + 1 == self.retry_policy.max_attempts or time.monotonic() + delay > deadline:
+                break
+            if stream and response is not None:
+                resp.close()
+
+            print(f"  {error} from {get_host(url)}, retrying in {delay:.1f}s")
+            self.metrics.inc('retries', source=source or 'download')
+            self.metrics.inc('retry_sleep_seconds', delay, source=source or 'download')
+            await asyncio.sleep(delay)
+
+        if breaker:
+            breaker.record_failure()
+        if response is None:
+            raise error
+        return resp if stream else response
+
+    async def _get(self, url, source=None, params=None, headers=None, timeout=None):
+        """Async counterpart of the sync _get, sharing its rate limiter and response cache."""
+        if params:
+            url = requests.Request('GET', url, params=params).prepare().url
+        if timeout is None:
+            timeout = sum(self.academic_sources[source]['timeout']) if source else 15
+
+        if not source or self.response_cache is None:
+            return await self._fetch(url, source, headers, timeout)
+
+        # The cache is SQLite on disk, so it is read and written from worker threads
+        key = self.response_cache.make_key(url)
+        cached, age = await asyncio.to_thread(self.response_cache.lookup, key)
+        if cached is not None and age < self.academic_sources[source]['cache_ttl']:
+            self.response_cache.hits += 1
+            return cached
+
+        request_headers = dict(headers or {})
+        if cached is not None:
+            request_headers.update(revalidation_headers(cached))
+
+        response = await self._fetch(url, source, request_headers or None, timeout)
+        if response.status_code == 304 and cached is not None:
+            self.response_cache.revalidated += 1
+            await asyncio.to_thread(self.response_cache.refresh, key)
+            return cached
+
+        self.response_cache.misses += 1
+        if response.status_code == 200:
+            await asyncio.to_thread(self.response_cache.store, key, response)
+        return response
+
+    async def search_arxiv(self, query, max_results=10):
+        """Search ArXiv using their API."""
+        papers = []
+        try:
+            request = self._arxiv_request(query, 0, max_results)
+            response = await self._get(request['url'], source='arxiv')
+
+            if response.status_code == 200:
+                with self.metrics.timer('parse_seconds', source='arxiv'):
+                    for item in self._iterparse_arxiv_feed(io.BytesIO(response.content), query):
+                        if isinstance(item, Paper):
+                            papers.append(item)
+                print(f"  ArXiv: Found {len(papers)} papers")
+
+        except Exception as e:
+            print(f"  Error searching ArXiv: {str(e)}")
+
+        return papers
+
+    async def search_semantic_scholar(self, query, max_results=10):
+        """Search Semantic Scholar API."""
+        papers = []
+        try:
+            request = self._semantic_scholar_request(query, max_results)
+            response = await self._get(request['url'], source='semantic_scholar', params=request['params'])
+
+            if response.status_code == 200:
+                with self.metrics.timer('parse_seconds', source='semantic_scholar'):
+                    papers = self._parse_semantic_scholar(response.json(), query)
+                print(f"  Semantic Scholar: Found {len(papers)} papers")
+
+        except Exception as e:
+            print(f"  Error searching Semantic Scholar: {str(e)}")
+
+        return papers
+
+    async def search_crossref(self, query, max_results=10):
+        """Search CrossRef API for academic papers."""
+        papers = []
+        try:
+            request = self._crossref_request(query, max_results)
+            response = await self._get(request['url'], source='crossref', params=request['params'])
+
+            if response.status_code == 200:
+                with self.metrics.timer('parse_seconds', source='crossref'):
+                    papers = self._parse_crossref(response.json(), query)
+                print(f"  CrossRef: Found {len(papers)} papers")
+
+        except Exception as e:
+            print(f"  Error searching CrossRef: {str(e)}")
+
+        return papers
+
+    async def search_google_scholar_web(self, query, max_results=10):
+        """Search Google Scholar via web scraping."""
+        papers = []
+        try:
+            request = self._google_scholar_request(query, max_results)
+            response = await self._get(request['url'], source='google_scholar')
+
+            if response.status_code == 200:
+                with self.metrics.timer('parse_seconds', source='google_scholar'):
+                    papers = self._parse_google_scholar(response.text, query)
+                print(f"  Google Scholar: Found {len(papers)} papers")
+
+        except Exception as e:
+            print(f"  Error searching Google Scholar: {str(e)}")
+
+        return papers
+
+    async def search_ieee_web(self, query, max_results=10):
+        """Search IEEE Xplore via web scraping."""
+        papers = []
+        try:
+            request = self._ieee_request(query, max_results)
+            response = await self._get(request['url'], source='ieee')
+
+            if response.status_code == 200:
+                with self.metrics.timer('parse_seconds', source='ieee'):
+                    papers = self._parse_ieee(response.text, query, max_results)
+                print(f"  IEEE Xplore: Found {len(papers)} papers")
+
+        except Exception as e:
+            print(f"  Error searching IEEE Xplore: {str(e)}")
+
+        return papers
+
+    async def query_source(self, source_key, query, max_results=5):
+        """Query a single source, reporting errors instead of raising them."""
+        source_info = self.academic_sources[source_key]
+        try:
+            with self.metrics.timer('search_seconds', source=source_key):
+                papers = await source_info['search_function'](query, max_results)
+            self.metrics.inc('papers_found', len(papers), source=source_key)
+            return papers
+        except Exception as e:
+            print(f"  Error with {source_info['name']}: {str(e)}")
+            return []
+
+    async def search_all_sources(self, query, max_results_per_source=5):
+        """Search all available academic sources at once."""
+        print(f"\nSearching for: '{query}'")
+        print("-" * 50)
+
+        results = await asyncio.gather(*[
+            self.query_source(source_key, query, max_results_per_source)
+            for source_key in self.academic_sources
+        ])
+
+        # Results come back in source order, so deduplication matches the sync engine
+        all_papers = [paper for papers in results for paper in papers]
+        unique_papers = self.deduplicate_papers(all_papers)
+
+        print(f"\nTotal unique papers found: {len(unique_papers)}")
+        return unique_papers
+
+    async def download_pdf(self, paper, save_path, progress=None):
+        """
+        Download a PDF into the blob store through the same throttled, retried requests
+        as searches, resuming a partial download with a Range request. The blob store's
+        files and index are written from worker threads, off the event loop.
+        """
+        if not paper.get('pdf_url'):
+            return None
+
+        url = paper['pdf_url']
+        host = get_host(url)
+        slots = self._download_slots.setdefault(host, asyncio.Semaphore(self.download_pool.per_host_limit))
+        source = paper.get('source')
+        filename = os.path.basename(self._pdf_path(paper, save_path))
+        start = time.perf_counter()
+        writer = None
+
+        try:
+            digest = await asyncio.to_thread(self.blob_store.lookup_url, url)
+            if digest:
+                print(f"    Already downloaded: {filename}")
+                self.metrics.inc('downloads', result='skipped', source=source)
+                return await asyncio.to_thread(self.blob_store.link, digest, save_path, filename, url)
+
+            headers = DOWNLOAD_HEADERS
+            writer = await asyncio.to_thread(self.blob_store.writer, url)
+            resume_from = writer.size
+            if resume_from:
+                headers = dict(DOWNLOAD_HEADERS, Range=f'bytes={resume_from}-')
+                print(f"    Resuming PDF: {filename} from {resume_from/1024:.1f} KB")
+            else:
+                print(f"    Downloading PDF: {filename}")
+
+            async with slots:
+                resp = await self._fetch(url, headers=headers, timeout=30, stream=True)
+                async with resp:
+                    try:
+                        if resp.status == 416 and resume_from:
+                            digest = await asyncio.to_thread(self.blob_store.commit, writer, url)
+                            return await asyncio.to_thread(self.blob_store.link, digest, save_path, filename, url)
+                        resp.raise_for_status()
+                        content_type = resp.headers.get('Content-Type')
+                        check_content_type(content_type)
+
+                        if resume_from and resp.status != 206:
+                            await asyncio.to_thread(writer.restart)
+                        received = 0
+                        async for chunk in resp.content.iter_chunked(DOWNLOAD_CHUNK_SIZE):
+                            await asyncio.to_thread(writer.write, chunk)
+                            received += len(chunk)
+                            if progress:
+                                progress(len(chunk))
+                    except BaseException:
+                        # Drop the connection rather than pool it with a body left unread
+                        resp.close()
+                        raise
+
+            digest = await asyncio.to_thread(self.blob_store.commit, writer, url, content_type)
+            print(f"      Downloaded: {writer.size/1024:.1f} KB")
+
+            self.metrics.observe('download_seconds', time.perf_counter() - start, source=source)
+            self.metrics.inc('download_bytes', received, source=source)
+            self.metrics.inc('downloads', result='ok', source=source)
+            return await asyncio.to_thread(self.blob_store.link, digest, save_path, filename, url)
+
+        except InvalidPDFError as e:
+            print(f"      Not a PDF: {str(e)}")
+            await asyncio.to_thread(self.blob_store.discard, url, writer)
+            self.metrics.inc('downloads', result='invalid', source=source)
+            return None
+        except Exception as e:
+            print(f"      Error downloading PDF: {str(e)}")
+            if writer is not None:
+                await asyncio.to_thread(self.blob_store.suspend, url, writer)
+            self.metrics.inc('downloads', result='error', source=source)
+            return None
+
+    def _submit_download(self, paper, save_path):
+        """
+        Schedule a download on the event loop from any thread. The returned Future is
+        completed from a worker thread, so the index updates and journal entries hooked
+        onto it (see _queue_paper) stay off the event loop.
+        """
+        future = ThreadFuture()
+
+        async def download():
+            try:
+                result = await self.download_pdf(paper, save_path, progress=self.download_pool.record_bytes)
+            except BaseException as e:
+                await asyncio.to_thread(future.set_exception, e)
+                raise
+            await asyncio.to_thread(future.set_result, result)
+
+        asyncio.run_coroutine_threadsafe(download(), self._loop)
+        return future
+
+    async def _start_query(self, category_name, category_path, query_index, query, total_queries, max_papers):
+        """Search one query and queue its downloads; return its pending summary entry."""
+        if self.journal.is_query_finished(category_name, query_index):
+            print(f"\n[{query_index}/{total_queries}] Skipping finished query: {query}")
+            return None
+
+        print(f"\n[{query_index}/{total_queries}] Processing query: {query}")
+
+        timestamp = datetime.now().isoformat()
+        papers = self.journal.get_search_results(category_name, query_index)
+        total_found = self.journal.get_total_found(category_name, query_index)
+        if papers is None:
+            papers = await self.search_all_sources(query, max_results_per_source=5)
+            papers = self.rank_papers(query, papers, category_name)
+            total_found = len(papers)
+            # Only the papers picked for download are journaled; a resumed run needs no more
+            await asyncio.to_thread(self.journal.record_search, category_name, query_index, query,
+                                    papers[:max_papers], total_found)
+
+        if not papers:
+            print("No papers found for this query.")
+            await asyncio.to_thread(self.journal.record_query, category_name, query_index, query)
+            return None
+
+        query_path = self._query_path(category_path, query_index, query)
+        papers_to_download = papers[:max_papers]
+        downloads = []
+        previously_downloaded = 0
+
+        def queue_papers():
+            # Metadata files, the corpus index and the journal are all written to disk here
+            nonlocal previously_downloaded
+            os.makedirs(query_path, exist_ok=True)
+            for j, paper in enumerate(papers_to_download, 1):
+                if self.journal.is_paper_finished(category_name, query_index, paper['title']):
+                    if self.journal.get_paper_file(category_name, query_index, paper['title']):
+                        previously_downloaded += 1
+                    continue
+
+                future = self._queue_journaled_paper(paper, category_name, query_index, query, query_path,
+                                                     f"  [{j}/{len(papers_to_download)}]",
+                                                     submit=self._submit_download)
+                if future is not None:
+                    downloads.append(future)
+
+        await asyncio.to_thread(queue_papers)
+
+        return {
+            'category': category_name,
+            'query_index': query_index,
+            'query': query,
+            'query_path': query_path,
+            'papers': papers,
+            'total_found': total_found,
+            'timestamp': timestamp,
+            'downloads': downloads,
+            'previously_downloaded': previously_downloaded
+        }
+
+    async def _wait_for_queries(self, pending_queries):
+        # Downloads and corpus links are both thread futures (see _submit_download)
+        downloads = [
+            asyncio.wrap_future(future) if isinstance(future, ThreadFuture) else future
+            for pending in pending_queries for future in pending['downloads']
+        ]
+        await asyncio.gather(*downloads, return_exceptions=True)
+
+        # Summaries, text extraction and the store flushes all block, so they run off the event loop
+        total_downloads = await asyncio.to_thread(self._finish_queries, pending_queries, True)
+        await asyncio.to_thread(self.wait_for_text_extraction)
+        await asyncio.to_thread(self.metadata_store.flush)
+        await asyncio.to_thread(self.search_index.flush)
+        return total_downloads
+
+    async def search_and_download_query(self, category_name, query_index, query, max_papers_per_query=3):
+        """Search and download papers for one query of a category."""
+        category_path = os.path.join(self.base_path, category_name)
+        os.makedirs(category_path, exist_ok=True)
+
+        total_queries = len(self.search_categories.get(category_name, [])) or query_index
+        pending = await self._start_query(category_name, category_path, query_index, query,
+                                          total_queries, max_papers_per_query)
+        return await self._wait_for_queries([pending] if pending else [])
+
+    async def search_and_download_category(self, category_name, max_papers_per_query=3):
+        """Search and download papers for a specific category, several queries at a time."""
+        if category_name not in self.search_categories:
+            print(f"Category '{category_name}' not found!")
+            return 0
+
+        queries = self.search_categories[category_name]
+        category_path = os.path.join(self.base_path, category_name)
+        os.makedirs(category_path, exist_ok=True)
+
+        print(f"\n{'='*60}")
+        print(f"Processing category: {category_name.replace('_', ' ').title()}")
+        print(f"Queries to process: {len(queries)}")
+        print('='*60)
+
+        limit = asyncio.Semaphore(self.query_concurrency)
+
+        async def run_query(i, query):
+            async with limit:
+                return await self._start_query(category_name, category_path, i, query,
+                                                 len(queries), max_papers_per_query)
+
+        results = await asyncio.gather(*[run_query(i, query) for i, query in enumerate(queries, 1)])
+        total_downloads = await self._wait_for_queries([pending for pending in results if pending is not None])
+        if self.columnar_exporter is not None:
+            self.columnar_exporter.flush()
+        self.write_metrics(category_name)
+        return total_downloads
+
+    async def search_and_download_categories(self, category_names, max_papers_per_query=3):
+        """Run several categories concurrently; return downloads per category."""
+        results = await asyncio.gather(*[
+            self.search_and_download_category(category_name, max_papers_per_query)
+            for category_name in category_names
+        ])
+        return dict(zip(category_names, results))
+
+
+class SyncScholarlyScraper:
+    """Blocking wrapper that runs the async engine on a private event loop per call."""
+
+    def __init__(self, **kwargs):
+        self.engine = AsyncScholarlyArticleScraper(**kwargs)
+
+    def __getattr__(self, name):
+        return getattr(self.engine, name)
+
+    def _run(self, method, *args):
+        async def runner():
+            async with self.engine:
+                return await method(*args)
+        return asyncio.run(runner())
+
+    def search_all_sources(self, query, max_results_per_source=5):
+        return self._run(self.engine.search_all_sources, query, max_results_per_source)
+
+    def search_and_download_category(self, category_name, max_papers_per_query=3):
+        return self._run(self.engine.search_and_download_category, category_name, max_papers_per_query)
+
+    def search_and_download_categories(self, category_names, max_papers_per_query=3):
+        return self._run(self.engine.search_and_download_categories, category_names, max_papers_per_query)
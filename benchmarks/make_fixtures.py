@@ -0,0 +1,227 @@
+"""
+Write the response fixtures replayed by the benchmark suite.
+
+By default the fixtures are generated deterministically in the shape of the
+real ArXiv Atom, Semantic Scholar/CrossRef JSON and Google Scholar/IEEE HTML
+responses. With --live QUERY they are recorded from the real services
+instead, using the scraper's own request builders.
+"""
+
+import argparse
+import json
+import os
+import random
+import sys
+from xml.sax.saxutils import escape
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+FIXTURE_FILES = {
+    'arxiv': 'arxiv_atom.xml',
+    'semantic_scholar': 'semantic_scholar.json',
+    'crossref': 'crossref.json',
+    'google_scholar': 'google_scholar.html',
+    'ieee': 'ieee.html'
+}
+
+WORDS = (
+    'learning neural network deep graph quantum distributed system model attention transformer '
+    'optimization robust efficient scalable adaptive federated privacy secure inference training '
+    'language vision retrieval reinforcement policy agent memory cache storage database query '
+    'compiler kernel scheduling energy hardware accelerator sparse dense embedding representation '
+    'generative diffusion adversarial benchmark dataset evaluation analysis theory algorithm'
+).split()
+
+FIRST_NAMES = 'Ada Alan Barbara Claude Donald Edsger Frances Grace John Leslie Radia Tim Yann'.split()
+LAST_NAMES = 'Lovelace Turing Liskov Shannon Knuth Dijkstra Allen Hopper McCarthy Lamport Perlman Berners LeCun'.split()
+
+
+def _title(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(6, 12))).capitalize()
+
+
+def _abstract(rng):
+    return ' '.join(rng.choice(WORDS) for _ in range(rng.randint(120, 220))).capitalize() + '.'
+
+
+def _author(rng):
+    return rng.choice(FIRST_NAMES), rng.choice(LAST_NAMES)
+
+
+def arxiv_atom(rng, count=100):
+    entries = []
+    for i in range(count):
+        arxiv_id = f"{rng.randint(1801, 2412)}.{rng.randint(10000, 99999)}"
+        authors = ''.join(
+            f"<author><name>{first} {last}</name></author>" for first, last in (_author(rng) for _ in range(rng.randint(1, 6)))
+        )
+        entries.append(f"""
+  <entry>
+    <id>http://arxiv.org/abs/{arxiv_id}v1</id>
+    <updated>2024-01-{i % 28 + 1:02d}T00:00:00Z</updated>
+    <published>2024-01-{i % 28 + 1:02d}T00:00:00Z</published>
+    <title>{escape(_title(rng))}</title>
+    <summary>{escape(_abstract(rng))}</summary>
+    {authors}
+    <link href="http://arxiv.org/abs/{arxiv_id}v1" rel="alternate" type="text/html"/>
+    <link title="pdf" href="http://arxiv.org/pdf/{arxiv_id}v1" rel="related" type="application/pdf"/>
+    <arxiv:primary_category xmlns:arxiv="http://arxiv.org/schemas/atom" term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+    <category term="cs.LG" scheme="http://arxiv.org/schemas/atom"/>
+  </entry>""")
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<feed xmlns="http://www.w3.org/2005/Atom">
+  <link href="http://arxiv.org/api/query" rel="self" type="application/atom+xml"/>
+  <title type="html">ArXiv Query: search_query=all:benchmark</title>
+  <id>http://arxiv.org/api/benchmark</id>
+  <updated>2024-01-01T00:00:00-05:00</updated>
+  <opensearch:totalResults xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{count}</opensearch:totalResults>
+  <opensearch:startIndex xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">0</opensearch:startIndex>
+  <opensearch:itemsPerPage xmlns:opensearch="http://a9.com/-/spec/opensearch/1.1/">{count}</opensearch:itemsPerPage>{''.join(entries)}
+</feed>
+"""
+
+
+def semantic_scholar_json(rng, count=100):
+    data = []
+    for i in range(count):
+        paper_id = ''.join(rng.choice('0123456789abcdef') for _ in range(40))
+        data.append({
+            'paperId': paper_id,
+            'url': f"https://www.semanticscholar.org/paper/{paper_id}",
+            'title': _title(rng),
+            'abstract': _abstract(rng) if rng.random() > 0.2 else None,
+            'venue': rng.choice(['NeurIPS', 'ICML', 'ICLR', 'SOSP', 'VLDB', '']),
+            'year': rng.randint(2000, 2024),
+            'citationCount': rng.randint(0, 5000),
+            'openAccessPdf': {'url': f"https://example.org/{paper_id}.pdf", 'status': 'GREEN'} if rng.random() > 0.5 else None,
+            'authors': [{'authorId': str(rng.randint(1, 10 ** 8)), 'name': ' '.join(_author(rng))}
+                        for _ in range(rng.randint(1, 8))]
+        })
+    return json.dumps({'total': count * 50, 'offset': 0, 'next': count, 'data': data})
+
+
+def crossref_json(rng, count=100):
+    items = []
+    for i in range(count):
+        year = rng.randint(1990, 2024)
+        doi = f"10.{rng.randint(1000, 9999)}/bench.{year}.{i:05d}"
+        items.append({
+            'DOI': doi,
+            'URL': f"https://doi.org/{doi}",
+            'title': [_title(rng)],
+            'abstract': f"<jats:p>{escape(_abstract(rng))}</jats:p>" if rng.random() > 0.5 else None,
+            'author': [dict(zip(('given', 'family'), _author(rng)), sequence='additional')
+                       for _ in range(rng.randint(1, 6))],
+            'publisher': rng.choice(['IEEE', 'ACM', 'Springer', 'Elsevier BV']),
+            'type': 'journal-article',
+            'published-print': {'date-parts': [[year, rng.randint(1, 12)]]},
+            'reference-count': rng.randint(0, 80),
+            'is-referenced-by-count': rng.randint(0, 900)
+        })
+    for item in items:
+        if item['abstract'] is None:
+            del item['abstract']
+    return json.dumps({
+        'status': 'ok', 'message-type': 'work-list',
+        'message': {'total-results': count * 100, 'items-per-page': count, 'items': items}
+    })
+
+
+def google_scholar_html(rng, count=20):
+    results = []
+    for i in range(count):
+        pdf = (f'<div class="gs_ggs gs_fl"><div class="gs_ggsd"><div class="gs_or_ggsm">'
+               f'<a href="https://example.org/papers/{i}.pdf"><span class="gs_ctg2">[PDF]</span> example.org</a>'
+               f'</div></div></div>') if rng.random() > 0.4 else ''
+        authors = ', '.join(' '.join(_author(rng)) for _ in range(rng.randint(1, 4)))
+        results.append(f"""
+<div class="gs_r gs_or gs_scl" data-cid="bench{i}" data-rp="{i}">{pdf}
+  <div class="gs_ri">
+    <h3 class="gs_rt" ontouchstart="gs_evt_dsp(event)"><a id="bench{i}" href="https://example.org/article/{i}">{escape(_title(rng))}</a></h3>
+    <div class="gs_a">{authors} - Journal of Benchmarks, {rng.randint(2000, 2024)} - example.org</div>
+    <div class="gs_rs">{escape(_abstract(rng)[:300])}</div>
+    <div class="gs_fl gs_flb"><a href="javascript:void(0)" class="gs_or_sav gs_or_btn">Save</a>
+      <a href="/scholar?cites={i}">Cited by {rng.randint(0, 999)}</a> <a href="/scholar?q=related:{i}">Related articles</a></div>
+  </div>
+</div>""")
+    boilerplate = ''.join(f'<script>var gs_{i} = {json.dumps(_abstract(rng))};</script>' for i in range(10))
+    return f"""<!doctype html><html><head><title>Google Scholar</title>{boilerplate}</head>
+<body><div id="gs_top"><div id="gs_hdr"><form action="/scholar"><input name="q" value="benchmark"></form></div>
+<div id="gs_bdy"><div id="gs_res_ccl"><div id="gs_res_ccl_mid">{''.join(results)}
+</div></div></div><div id="gs_ftr">{'<a href="#">link</a>' * 50}</div></div></body></html>
+"""
+
+
+def ieee_html(rng, count=25):
+    results = []
+    for i in range(count):
+        authors = '; '.join(' '.join(_author(rng)) for _ in range(rng.randint(1, 5)))
+        results.append(f"""
+<div class="List-results-items" id="{i}">
+  <div class="result-item"><div class="result-item-align">
+    <h2><a href="/document/{9000000 + i}/">{escape(_title(rng))}</a></h2>
+    <p class="author"><span>{escape(authors)}</span></p>
+    <div class="publisher-info-container"><span>IEEE Transactions on Benchmarks</span><span>Year: {rng.randint(2000, 2024)}</span></div>
+    <div class="description"><span>{escape(_abstract(rng)[:400])}</span></div>
+  </div></div>
+</div>""")
+    return f"""<!doctype html><html><head><title>IEEE Xplore Search Results</title></head>
+<body><xpl-root><div class="global-content-wrapper"><nav>{'<a href="#">menu</a>' * 80}</nav>
+<section class="results">{''.join(results)}</section></div></xpl-root></body></html>
+"""
+
+
+def generate(seed=7):
+    rng = random.Random(seed)
+    return {
+        'arxiv': arxiv_atom(rng),
+        'semantic_scholar': semantic_scholar_json(rng),
+        'crossref': crossref_json(rng),
+        'google_scholar': google_scholar_html(rng),
+        'ieee': ieee_html(rng)
+    }
+
+
+def record(query):
+    """Fetch live responses for `query` through the scraper's request builders."""
+    from enhanced_scholarly_scraper import EnhancedScholarlyArticleScraper
+
+    scraper = EnhancedScholarlyArticleScraper(use_cache=False)
+    requests_by_source = {
+        'arxiv': scraper._arxiv_request(query, 0, 100),
+        'semantic_scholar': scraper._semantic_scholar_request(query, 100),
+        'crossref': scraper._crossref_request(query, 100),
+        'google_scholar': scraper._google_scholar_request(query, 20),
+        'ieee': scraper._ieee_request(query, 25)
+    }
+
+    fixtures = {}
+    for source, request in requests_by_source.items():
+        response = scraper._send(request['url'], params=request.get('params'), timeout=30)
+        print(f"{source}: HTTP {response.status_code}, {len(response.content)} bytes")
+        if response.status_code == 200:
+            fixtures[source] = response.text
+    scraper.download_pool.shutdown(wait=False)
+    return fixtures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--live', metavar='QUERY', help="record real responses for QUERY instead of generating them")
+    parser.add_argument('--seed', type=int, default=7)
+    args = parser.parse_args()
+
+    fixtures = record(args.live) if args.live else generate(args.seed)
+
+    os.makedirs(FIXTURES_DIR, exist_ok=True)
+    for source, body in fixtures.items():
+        path = os.path.join(FIXTURES_DIR, FIXTURE_FILES[source])
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(body)
+        print(f"Wrote {path} ({len(body.encode('utf-8')) / 1024:.1f} KB)")
+
+
+if __name__ == "__main__":
+    main()
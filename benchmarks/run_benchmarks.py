@@ -0,0 +1,309 @@
+"""
+Offline benchmark suite for the scholarly article scraper.
+
+Replays the recorded fixtures (see make_fixtures.py) through the source
+parsers and through a local stub server, and measures:
+
+  - parse throughput of every source parser, reading each paper's keys
+  - each installed HTML backend against BeautifulSoup, fields included
+  - end-to-end search latency with a simulated network delay
+  - deduplication time from 10^3 up to 10^5 records
+  - peak memory of parsing and deduplication
+
+Results can be saved as the baseline and later runs compared against it:
+
+    python benchmarks/run_benchmarks.py --save-baseline
+    python benchmarks/run_benchmarks.py --compare
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import platform
+import random
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from dedup import paper_keys  # noqa: E402
+from enhanced_scholarly_scraper import EnhancedScholarlyArticleScraper  # noqa: E402
+from html_parsers import available_html_parsers, create_html_parser  # noqa: E402
+from make_fixtures import WORDS, arxiv_atom  # noqa: E402
+from paper import Paper  # noqa: E402
+from stub_server import load_fixtures, start_stub_server  # noqa: E402
+
+BASELINE_FILE = os.path.join(BENCHMARKS_DIR, 'baseline.json')
+
+
+class StubScraper(EnhancedScholarlyArticleScraper):
+    """Scraper whose sources all point at the local stub server."""
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(**kwargs)
+        self.base_url = base_url
+        for source_key in ('arxiv', 'semantic_scholar', 'crossref'):
+            self.academic_sources[source_key]['api_url'] = f"{base_url}/{source_key}"
+        # The stub is not rate limited, so only the simulated delay remains
+        self.rate_limiter.configure('127.0.0.1', 1000, 1000)
+
+    def _google_scholar_request(self, query, max_results):
+        return {'url': f"{self.base_url}/google_scholar?q={query}"}
+
+    def _ieee_request(self, query, max_results):
+        return {'url': f"{self.base_url}/ieee?q={query}"}
+
+
+def quiet():
+    """Silence the scraper's progress output while timing it."""
+    return contextlib.redirect_stdout(io.StringIO())
+
+
+def time_call(function, min_time=0.5, max_repeats=50):
+    """Median seconds per call, repeating until `min_time` has passed."""
+    timings = []
+    start = time.perf_counter()
+    while len(timings) < max_repeats and (len(timings) < 3 or time.perf_counter() - start < min_time):
+        call_start = time.perf_counter()
+        function()
+        timings.append(time.perf_counter() - call_start)
+    return statistics.median(timings)
+
+
+def make_scraper(base_path, base_url=None, **kwargs):
+    with quiet():
+        if base_url:
+            return StubScraper(base_url, base_path=base_path, use_cache=False, **kwargs)
+        return EnhancedScholarlyArticleScraper(base_path=base_path, use_cache=False, **kwargs)
+
+
+def bench_parsers(scraper, fixtures):
+    parsers = {
+        'arxiv': lambda body: [item for item in scraper._iterparse_arxiv_feed(io.BytesIO(body), 'q')
+                               if isinstance(item, Paper)],
+        'semantic_scholar': lambda body: scraper._parse_semantic_scholar(json.loads(body), 'q'),
+        'crossref': lambda body: scraper._parse_crossref(json.loads(body), 'q'),
+        'google_scholar': lambda body: scraper._parse_google_scholar(body.decode('utf-8'), 'q'),
+        'ieee': lambda body: scraper._parse_ieee(body.decode('utf-8'), 'q', 100)
+    }
+
+    def parse_and_read(parse, body):
+        # The pipeline reads every paper's identity keys right after parsing (deduplication),
+        # so a parser that defers work to the first read still pays for it here
+        papers = parse(body)
+        for paper in papers:
+            paper_keys(paper)
+        return papers
+
+    results = {}
+    for source, parse in parsers.items():
+        body = fixtures[source]
+        records = len(parse(body))
+        seconds = time_call(lambda: parse_and_read(parse, body))
+        results[f'parse_{source}'] = {
+            'seconds': seconds,
+            'records': records,
+            'records_per_second': records / seconds,
+            'mb_per_second': len(body) / seconds / 1e6
+        }
+    return results
+
+
+def bench_html_parsers(fixtures):
+    """Time every installed HTML backend and check it extracts the same fields as BeautifulSoup."""
+    pages = {
+        'google_scholar': (fixtures['google_scholar'].decode('utf-8'), lambda parser, html: parser.google_scholar_results(html)),
+        'ieee': (fixtures['ieee'].decode('utf-8'), lambda parser, html: parser.ieee_results(html, 100))
+    }
+
+    results = {}
+    for page, (html, extract) in pages.items():
+        expected = extract(create_html_parser('bs4'), html)
+        for name in available_html_parsers():
+            parser = create_html_parser(name)
+            fields = extract(parser, html)
+            seconds = time_call(lambda: extract(parser, html))
+            results[f'html_{page}_{name}'] = {
+                'seconds': seconds,
+                'records': len(fields),
+                'records_per_second': len(fields) / seconds,
+                'same_fields_as_bs4': fields == expected
+            }
+    return results
+
+
+def bench_end_to_end(base_path, delay, repeats=5):
+    server = start_stub_server(delay)
+    results = {}
+    try:
+        for concurrent in (True, False):
+            scraper = make_scraper(base_path, server.base_url)
+            timings = []
+            for i in range(repeats):
+                with quiet():
+                    start = time.perf_counter()
+                    papers = scraper.search_all_sources(f'benchmark query {i}', max_results_per_source=100,
+                                                        concurrent=concurrent)
+                    timings.append(time.perf_counter() - start)
+            scraper.download_pool.shutdown(wait=False)
+            name = 'search_all_sources_' + ('concurrent' if concurrent else 'sequential')
+            results[name] = {'seconds': statistics.median(timings), 'papers': len(papers), 'delay': delay}
+    finally:
+        server.shutdown()
+    return results
+
+
+def dedup_records(count, seed=11):
+    """Synthetic search results with ~10% near-duplicate titles and ~5% repeated DOIs."""
+    rng = random.Random(seed)
+    # Real titles draw on a large vocabulary; a small one would make every title look alike
+    vocabulary = list(WORDS) + [
+        ''.join(rng.choice('abcdefghijklmnopqrstuvwxyz') for _ in range(rng.randint(4, 10))) for _ in range(20000)
+    ]
+    records = []
+    for i in range(count):
+        roll = rng.random()
+        if records and roll < 0.10:
+            words = rng.choice(records)['title'].split()
+            words[rng.randrange(len(words))] = rng.choice(vocabulary)
+            records.append({'title': ' '.join(words), 'source': 'CrossRef'})
+        elif records and roll < 0.15 and records[-1].get('doi'):
+            records.append({'title': 'Other title ' + str(i), 'doi': records[-1]['doi'], 'source': 'CrossRef'})
+        else:
+            title = ' '.join(rng.choice(vocabulary) for _ in range(rng.randint(6, 14)))
+            records.append({'title': title, 'doi': f'10.1000/bench.{i}', 'source': 'Semantic Scholar'})
+    return records
+
+
+def bench_dedup(scraper, sizes):
+    results = {}
+    for size in sizes:
+        records = dedup_records(size)
+        start = time.perf_counter()
+        unique = scraper.deduplicate_papers(records)
+        seconds = time.perf_counter() - start
+        results[f'dedup_{size}'] = {
+            'seconds': seconds,
+            'records': size,
+            'unique': len(unique),
+            'us_per_record': seconds / size * 1e6
+        }
+    return results
+
+
+def peak_memory(function):
+    tracemalloc.start()
+    try:
+        function()
+        return tracemalloc.get_traced_memory()[1]
+    finally:
+        tracemalloc.stop()
+
+
+def bench_memory(scraper, dedup_sizes):
+    big_feed = arxiv_atom(random.Random(3), count=2000).encode('utf-8')
+
+    def parse_feed():
+        for _ in scraper._iterparse_arxiv_feed(io.BytesIO(big_feed), 'q'):
+            pass
+
+    results = {'memory_parse_arxiv_2000': {'peak_bytes': peak_memory(parse_feed), 'input_bytes': len(big_feed)}}
+    # The deduplicator's LSH buckets grow with every kept paper; bytes per record shows their cost
+    for size in dedup_sizes:
+        records = dedup_records(size)
+        peak = peak_memory(lambda: scraper.deduplicate_papers(records))
+        results[f'memory_dedup_{size}'] = {'peak_bytes': peak, 'records': size, 'bytes_per_record': peak / size}
+    return results
+
+
+def run(quick=False, delay=0.05):
+    fixtures = load_fixtures()
+    sizes = (1000, 10000) if quick else (1000, 10000, 100000)
+
+    with tempfile.TemporaryDirectory() as base_path:
+        scraper = make_scraper(base_path)
+        results = {}
+        results.update(bench_parsers(scraper, fixtures))
+        results.update(bench_html_parsers(fixtures))
+        results.update(bench_end_to_end(base_path, delay, repeats=3 if quick else 5))
+        results.update(bench_dedup(scraper, sizes))
+        # 10^4 records are measured in quick runs too, so --quick --compare catches memory regressions
+        results.update(bench_memory(scraper, sizes[1:]))
+        scraper.download_pool.shutdown(wait=False)
+
+    return {
+        'environment': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S')
+        },
+        'benchmarks': results
+    }
+
+
+def print_results(results):
+    for name, values in results['benchmarks'].items():
+        details = ', '.join(
+            f"{key}={value:.4g}" if isinstance(value, float) else f"{key}={value}"
+            for key, value in values.items()
+        )
+        print(f"{name:34s} {details}")
+
+
+def compare(results, baseline, tolerance):
+    """Print current vs baseline and return the names of benchmarks that regressed."""
+    regressions = []
+    print(f"\n{'benchmark':34s} {'baseline':>12s} {'current':>12s} {'change':>8s}")
+    for name, values in results['benchmarks'].items():
+        if name not in baseline['benchmarks']:
+            continue
+        metric = 'seconds' if 'seconds' in values else 'peak_bytes'
+        old, new = baseline['benchmarks'][name][metric], values[metric]
+        change = (new - old) / old if old else 0.0
+        flag = ''
+        if change > tolerance:
+            regressions.append(name)
+            flag = '  REGRESSION'
+        print(f"{name:34s} {old:12.4g} {new:12.4g} {change:+8.1%}{flag}")
+    return regressions
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the offline benchmark suite.")
+    parser.add_argument('--quick', action='store_true', help="skip the 10^5 record dedup run")
+    parser.add_argument('--delay', type=float, default=0.05, help="simulated network delay per request (s)")
+    parser.add_argument('--save-baseline', action='store_true', help=f"write results to {BASELINE_FILE}")
+    parser.add_argument('--compare', action='store_true', help="compare against the saved baseline")
+    parser.add_argument('--tolerance', type=float, default=0.25, help="allowed slowdown before failing")
+    parser.add_argument('--output', help="also write the results to this JSON file")
+    args = parser.parse_args()
+
+    results = run(args.quick, args.delay)
+    print_results(results)
+
+    if args.output:
+        with open(args.output, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+
+    if args.save_baseline:
+        with open(BASELINE_FILE, 'w', encoding='utf-8') as f:
+            json.dump(results, f, indent=2)
+        print(f"\nBaseline saved to {BASELINE_FILE}")
+
+    if args.compare:
+        with open(BASELINE_FILE, 'r', encoding='utf-8') as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print(f"\n{len(regressions)} benchmark(s) regressed by more than {args.tolerance:.0%}")
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
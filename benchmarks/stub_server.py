@@ -0,0 +1,109 @@
+"""
+Local HTTP stub that replays the benchmark fixtures with a simulated delay.
+
+    /arxiv, /semantic_scholar, /crossref, /google_scholar, /ieee -> fixture body
+    /pdf/<name>                                                  -> fake PDF (or 503, see pdf_failures)
+"""
+
+import os
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlsplit
+
+from make_fixtures import FIXTURE_FILES, FIXTURES_DIR
+
+CONTENT_TYPES = {
+    'arxiv': 'application/atom+xml; charset=utf-8',
+    'semantic_scholar': 'application/json',
+    'crossref': 'application/json',
+    'google_scholar': 'text/html; charset=utf-8',
+    'ieee': 'text/html; charset=utf-8'
+}
+
+
+def load_fixtures():
+    """Return {source: bytes} for every fixture on disk."""
+    fixtures = {}
+    for source, filename in FIXTURE_FILES.items():
+        with open(os.path.join(FIXTURES_DIR, filename), 'rb') as f:
+            fixtures[source] = f.read()
+    return fixtures
+
+
+class StubServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, fixtures, delay=0.0, pdf_size=256 * 1024):
+        super().__init__(('127.0.0.1', 0), StubHandler)
+        self.fixtures = fixtures
+        self.delay = delay
+        self.pdf_body = b'%PDF-1.4\n' + b'0' * pdf_size
+        self.requests_served = 0
+        # PDF requests being served right now, and the most there ever were at once
+        self.lock = threading.Lock()
+        self.pdf_requests_active = 0
+        self.pdf_requests_peak = 0
+        # The next this many PDF requests are answered 503, to exercise retries
+        self.pdf_failures = 0
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+
+class StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'
+
+    def log_message(self, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests_served += 1
+        path = urlsplit(self.path).path.strip('/')
+        if path.startswith('pdf/'):
+            server = self.server
+            with server.lock:
+                server.pdf_requests_active += 1
+                server.pdf_requests_peak = max(server.pdf_requests_peak, server.pdf_requests_active)
+            try:
+                self._reply(path)
+            finally:
+                with server.lock:
+                    server.pdf_requests_active -= 1
+        else:
+            self._reply(path)
+
+    def _reply(self, path):
+        if self.server.delay:
+            time.sleep(self.server.delay)
+
+        if path.startswith('pdf/'):
+            with self.server.lock:
+                failing = self.server.pdf_failures > 0
+                self.server.pdf_failures -= failing
+            if failing:
+                self.send_response(503)
+                self.send_header('Retry-After', '0')
+                self.send_header('Content-Length', '0')
+                self.end_headers()
+                return
+            body, content_type = self.server.pdf_body, 'application/pdf'
+        elif path in self.server.fixtures:
+            body, content_type = self.server.fixtures[path], CONTENT_TYPES[path]
+        else:
+            self.send_error(404)
+            return
+
+        self.send_response(200)
+        self.send_header('Content-Type', content_type)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+def start_stub_server(delay=0.0):
+    """Start a stub server on a free port in a background thread and return it."""
+    server = StubServer(load_fixtures(), delay)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
@@ -0,0 +1,300 @@
+"""
+Content-addressed PDF store for the scholarly article scraper.
+Every PDF is hashed (SHA-256) while it streams in and stored once under
+its digest in <base-path>/.blobs. Query folders get a hard link named
+after the paper, or a pdf_manifest.jsonl entry where hard links are not
+possible. Downloads are checked by Content-Type and by the %PDF- magic
+bytes, so HTML error pages never end up in the corpus.
+
+    python blob_store.py verify [--rehash]
+"""
+
+import argparse
+import hashlib
+import json
+import os
+import socket
+import sqlite3
+import threading
+import uuid
+from datetime import datetime
+
+from corpus_index import process_alive
+
+PDF_MAGIC = b'%PDF-'
+
+# Readers accept the magic anywhere in the first KB, after junk some servers prepend
+MAGIC_WINDOW = 1024
+
+
+class InvalidPDFError(ValueError):
+    """A download that is not a PDF."""
+
+
+def check_content_type(content_type):
+    """Raise InvalidPDFError for responses that are clearly not a PDF (HTML error or login pages)."""
+    media_type = (content_type or '').split(';')[0].strip().lower()
+    if media_type.startswith('text/') or media_type in ('application/xhtml+xml', 'application/json'):
+        raise InvalidPDFError(f"server sent {media_type}, not a PDF")
+
+
+class BlobWriter:
+    """
+    Writes one download to a partial file of its own, hashing it and checking
+    its magic bytes. An interrupted download left at `resume_path` is taken
+    over by renaming it, so no two writers ever share a file.
+    """
+
+    def __init__(self, partial_path, resume_path=None):
+        self.partial_path = partial_path
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+
+        try:
+            # Only one writer can rename the file away; the others start from scratch
+            os.rename(resume_path, partial_path)
+        except (OSError, TypeError):
+            self.file = open(partial_path, 'wb')
+            return
+
+        # The hash has to cover the bytes of the interrupted run as well
+        with open(partial_path, 'rb') as f:
+            for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                self._update(chunk)
+        self.file = open(partial_path, 'ab')
+
+    def restart(self):
+        """Drop the resumed bytes, for servers that ignore Range and send the whole file."""
+        self.file.seek(0)
+        self.file.truncate()
+        self.sha256 = hashlib.sha256()
+        self.size = 0
+        self.head = b''
+
+    def _update(self, chunk):
+        if len(self.head) < MAGIC_WINDOW:
+            self.head += chunk[:MAGIC_WINDOW - len(self.head)]
+            if len(self.head) >= MAGIC_WINDOW:
+                self.check_magic()
+        self.sha256.update(chunk)
+        self.size += len(chunk)
+
+    def write(self, chunk):
+        self._update(chunk)
+        self.file.write(chunk)
+
+    def check_magic(self):
+        if PDF_MAGIC not in self.head:
+            raise InvalidPDFError("no %PDF- header in the first KB")
+
+    @property
+    def digest(self):
+        return self.sha256.hexdigest()
+
+    def close(self):
+        self.file.close()
+
+
+class BlobStore:
+    """PDFs stored once by SHA-256, with an SQLite index of digests and source URLs."""
+
+    def __init__(self, root):
+        self.root = root
+        self.lock = threading.Lock()
+        os.makedirs(os.path.join(root, 'partial'), exist_ok=True)
+
+        # Sharded runs open the index from several processes at once
+        self.db = sqlite3.connect(os.path.join(root, 'index.sqlite'), timeout=30, check_same_thread=False)
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS blobs (
+                digest TEXT PRIMARY KEY,
+                size INTEGER NOT NULL,
+                content_type TEXT,
+                stored_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS urls (
+                url TEXT PRIMARY KEY,
+                digest TEXT NOT NULL REFERENCES blobs (digest)
+            );
+        """)
+        self.db.commit()
+
+        # Downloads of a process that was killed are left in its private files
+        self.recover_partials()
+
+    def blob_path(self, digest):
+        return os.path.join(self.root, digest[:2], f"{digest}.pdf")
+
+    def partial_path(self, url):
+        # Where an interrupted download of `url` waits to be resumed; keyed by URL,
+        # so two papers with the same title never share a partial file
+        return os.path.join(self.root, 'partial', hashlib.sha1(url.encode('utf-8')).hexdigest() + '.part')
+
+    def lookup_url(self, url):
+        """Return the digest stored for `url`, or None if its blob is missing."""
+        with self.lock:
+            row = self.db.execute("SELECT digest FROM urls WHERE url = ?", (url,)).fetchone()
+        if row and os.path.exists(self.blob_path(row[0])):
+            return row[0]
+        return None
+
+    def writer(self, url):
+        """
+        Open a private partial file for a download of `url`. It continues an
+        interrupted download when there is one: `writer.size` bytes to skip.
+        """
+        self.recover_partials(url)
+        resume_path = self.partial_path(url)
+        # Threads and worker processes downloading the same URL each get their own file,
+        # named after the process so it can be recovered if that process dies
+        partial_path = f"{resume_path[:-len('.part')]}.{socket.gethostname()}-{os.getpid()}-{uuid.uuid4().hex}.part"
+        return BlobWriter(partial_path, resume_path)
+
+    def recover_partials(self, url=None):
+        """
+        Hand the private partial files of processes that have exited (of `url`, or
+        of every URL) back to their URL, so the next download resumes them. The
+        shorter of two partials of one URL is removed.
+        """
+        directory = os.path.join(self.root, 'partial')
+        prefix = hashlib.sha1(url.encode('utf-8')).hexdigest() + '.' if url else ''
+        for name in os.listdir(directory):
+            url_hash, _, writer_name = name.partition('.')
+            if not name.startswith(prefix) or not writer_name.endswith('.part') or writer_name == 'part':
+                continue
+            hostname, _, pid = writer_name[:-len('.part')].rpartition('-')[0].rpartition('-')
+            if not pid.isdigit() or process_alive(hostname, int(pid)):
+                continue
+
+            orphan_path = os.path.join(directory, name)
+            resume_path = os.path.join(directory, url_hash + '.part')
+            try:
+                if os.path.exists(resume_path) and os.path.getsize(resume_path) >= os.path.getsize(orphan_path):
+                    os.remove(orphan_path)
+                else:
+                    os.replace(orphan_path, resume_path)
+            except OSError:
+                # Another process recovered it first
+                continue
+
+    def commit(self, writer, url, content_type=None):
+        """Validate a finished download, move it to its blob path and return the digest."""
+        writer.close()
+        try:
+            writer.check_magic()
+        except InvalidPDFError:
+            self.discard(url, writer)
+            raise
+
+        digest = writer.digest
+        blob_path = self.blob_path(digest)
+        os.makedirs(os.path.dirname(blob_path), exist_ok=True)
+        if os.path.exists(blob_path):
+            # Same bytes from another URL: keep the one copy
+            os.remove(writer.partial_path)
+        else:
+            os.replace(writer.partial_path, blob_path)
+
+        with self.lock:
+            self.db.execute("INSERT OR IGNORE INTO blobs VALUES (?, ?, ?, ?)",
+                            (digest, writer.size, content_type, datetime.now().isoformat()))
+            self.db.execute("INSERT OR REPLACE INTO urls VALUES (?, ?)", (url, digest))
+            self.db.commit()
+        return digest
+
+    def discard(self, url, writer=None):
+        """Drop a download of `url` that turned out not to be a PDF."""
+        if writer is not None:
+            writer.close()
+            if os.path.exists(writer.partial_path):
+                os.remove(writer.partial_path)
+
+    def suspend(self, url, writer):
+        """Keep an interrupted download of `url` so a later attempt can resume it."""
+        writer.close()
+        if writer.size:
+            os.replace(writer.partial_path, self.partial_path(url))
+        else:
+            os.remove(writer.partial_path)
+
+    def link(self, digest, target_dir, filename, url=None):
+        """
+        Expose a blob in `target_dir` as `filename` and return the path to use.
+        A different PDF that already has the name gets the digest appended; if
+        hard links are unsupported, a manifest entry points at the blob instead.
+        """
+        blob_path = self.blob_path(digest)
+        target_path = os.path.join(target_dir, filename)
+        if os.path.exists(target_path) and not os.path.samefile(target_path, blob_path):
+            stem, extension = os.path.splitext(filename)
+            target_path = os.path.join(target_dir, f"{stem}_{digest[:8]}{extension}")
+        if os.path.exists(target_path):
+            return target_path
+
+        try:
+            os.link(blob_path, target_path)
+            linked = True
+        except OSError:
+            # Different filesystem or no hard-link support
+            linked = False
+
+        entry = {'file': os.path.basename(target_path) if linked else None, 'sha256': digest,
+                 'blob': os.path.relpath(blob_path, target_dir), 'url': url}
+        with self.lock:
+            with open(os.path.join(target_dir, 'pdf_manifest.jsonl'), 'a', encoding='utf-8') as f:
+                f.write(json.dumps(entry, ensure_ascii=False) + '\n')
+        return target_path if linked else blob_path
+
+    def verify(self, rehash=False):
+        """
+        Check every indexed blob: present with the recorded size, and with
+        `rehash` also re-hashed. Returns a list of (digest, problem).
+        """
+        with self.lock:
+            rows = self.db.execute("SELECT digest, size FROM blobs").fetchall()
+
+        problems = []
+        for digest, size in rows:
+            blob_path = self.blob_path(digest)
+            if not os.path.exists(blob_path):
+                problems.append((digest, 'missing'))
+            elif os.path.getsize(blob_path) != size:
+                problems.append((digest, 'size mismatch'))
+            elif rehash:
+                sha256 = hashlib.sha256()
+                with open(blob_path, 'rb') as f:
+                    for chunk in iter(lambda: f.read(1024 * 1024), b''):
+                        sha256.update(chunk)
+                if sha256.hexdigest() != digest:
+                    problems.append((digest, 'hash mismatch'))
+        return problems
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM blobs").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Check the PDFs in the content-addressed store.")
+    parser.add_argument('command', choices=['verify'])
+    parser.add_argument('--base-path', default='Academic_Papers', help="scraper output folder")
+    parser.add_argument('--rehash', action='store_true', help="re-hash every PDF instead of checking sizes")
+    args = parser.parse_args()
+
+    store = BlobStore(os.path.join(args.base_path, '.blobs'))
+    problems = store.verify(args.rehash)
+    for digest, problem in problems:
+        print(f"{digest}: {problem}")
+    print(f"{len(store)} PDFs checked, {len(problems)} problem(s)")
+    store.close()
+    raise SystemExit(1 if problems else 0)
+
+
+if __name__ == "__main__":
+    main()
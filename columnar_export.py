@@ -0,0 +1,232 @@
+"""
+Columnar export of the corpus for analysis.
+Papers are appended in batches to one dataset under <base-path>/.columnar/<format>,
+partitioned by category (category=<name>/part-*.parquet) with the source, venue
+and query columns dictionary-encoded. Parquet files are the smallest; Arrow IPC
+files are stored uncompressed so they can be memory-mapped and read without
+copying:
+
+    python columnar_export.py --rebuild
+    python columnar_export.py --format arrow --rebuild
+    python columnar_export.py --category machine_learning
+"""
+
+import argparse
+import json
+import os
+import shutil
+import sqlite3
+import threading
+import time
+from datetime import datetime
+
+from dedup import extract_arxiv_id, extract_doi
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+    import pyarrow.fs as pafs
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+
+FORMATS = {'parquet': '.parquet', 'arrow': '.arrow'}
+
+STRING_FIELDS = ('title', 'authors', 'abstract', 'doi', 'arxiv_id', 'url', 'pdf_url')
+
+# Few distinct values repeated over many rows
+DICTIONARY_FIELDS = ('venue', 'source', 'query')
+
+
+def _require_pyarrow():
+    if pa is None:
+        raise ImportError("Columnar export requires pyarrow: pip install pyarrow")
+
+
+def paper_schema():
+    """Arrow schema of the exported files; the category is the partition key, not a column."""
+    _require_pyarrow()
+    dictionary = pa.dictionary(pa.int32(), pa.string())
+    return pa.schema(
+        [(name, pa.string()) for name in STRING_FIELDS]
+        + [('year', pa.int16()), ('citations', pa.int32()), ('relevance', pa.float32())]
+        + [(name, dictionary) for name in DICTIONARY_FIELDS]
+    )
+
+
+def _int_or_none(value):
+    if isinstance(value, str) and value[:4].isdigit():
+        return int(value[:4])
+    return value if isinstance(value, int) and not isinstance(value, bool) else None
+
+
+def papers_to_table(papers):
+    """Build a record batch table from papers, one column at a time."""
+    schema = paper_schema()
+    columns = {
+        'title': [paper.get('title') for paper in papers],
+        'authors': [paper.get('authors') for paper in papers],
+        'abstract': [paper.get('abstract') for paper in papers],
+        'doi': [extract_doi(paper) for paper in papers],
+        'arxiv_id': [extract_arxiv_id(paper) for paper in papers],
+        'url': [paper.get('url') for paper in papers],
+        'pdf_url': [paper.get('pdf_url') for paper in papers],
+        'year': [_int_or_none(paper.get('year')) for paper in papers],
+        'citations': [_int_or_none(paper.get('citations')) for paper in papers],
+        'relevance': [paper.get('relevance') for paper in papers],
+    }
+    for name in DICTIONARY_FIELDS:
+        columns[name] = [paper.get(name) or None for paper in papers]
+
+    arrays = []
+    for field in schema:
+        if pa.types.is_dictionary(field.type):
+            arrays.append(pa.array(columns[field.name], pa.string()).dictionary_encode())
+        else:
+            arrays.append(pa.array(columns[field.name], field.type))
+    return pa.Table.from_arrays(arrays, schema=schema)
+
+
+class ColumnarExporter:
+    """Appends papers to a category-partitioned Parquet or Arrow dataset in batches."""
+
+    def __init__(self, root, format='parquet', batch_size=5000):
+        _require_pyarrow()
+        if format not in FORMATS:
+            raise ValueError(f"Unknown columnar format: {format}")
+        self.root = root
+        self.format = format
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending = {}  # category -> papers
+        self.pending_count = 0
+        self.files_written = 0
+        os.makedirs(root, exist_ok=True)
+
+    def add_paper(self, paper, category=None):
+        """Queue a paper; a full batch is written as one file per category."""
+        self.add_papers([paper], category)
+
+    def add_papers(self, papers, category=None):
+        with self.lock:
+            self.pending.setdefault(category or 'uncategorized', []).extend(papers)
+            self.pending_count += len(papers)
+            if self.pending_count >= self.batch_size:
+                self._flush()
+
+    def _write(self, table, path):
+        # Written under a dot-name first: dataset readers skip those, so a half-written part is never read
+        partial_path = os.path.join(os.path.dirname(path), '.' + os.path.basename(path))
+        if self.format == 'parquet':
+            pq.write_table(table, partial_path, compression='zstd')
+        else:
+            with pa.OSFile(partial_path, 'wb') as sink, pa.ipc.new_file(sink, table.schema) as writer:
+                writer.write_table(table)
+        os.replace(partial_path, path)
+
+    def _flush(self):
+        # Caller must hold self.lock. Sharded workers append to the same dataset, so part
+        # names carry the process id as well as the time
+        stamp = datetime.now().strftime('%Y%m%d%H%M%S')
+        for category, papers in self.pending.items():
+            if not papers:
+                continue
+            folder = os.path.join(self.root, f"category={category}")
+            os.makedirs(folder, exist_ok=True)
+            path = os.path.join(folder, f"part-{stamp}-{os.getpid()}-{self.files_written:05d}{FORMATS[self.format]}")
+            self._write(papers_to_table(papers), path)
+            self.files_written += 1
+        self.pending = {}
+        self.pending_count = 0
+
+    def flush(self):
+        """Write every queued paper."""
+        with self.lock:
+            self._flush()
+
+    def close(self):
+        self.flush()
+
+
+def open_dataset(root, format='parquet'):
+    """Open the exported dataset; Arrow files are memory-mapped rather than read."""
+    _require_pyarrow()
+    # The category comes back dictionary-encoded, like the other repeated columns
+    partitioning = ds.HivePartitioning.discover(infer_dictionary=True)
+    return ds.dataset(root, format='parquet' if format == 'parquet' else 'ipc', partitioning=partitioning,
+                      filesystem=pafs.LocalFileSystem(use_mmap=True))
+
+
+def read_corpus(root, format='parquet', columns=None, category=None):
+    """Load the exported corpus (or one category of it) as a pyarrow Table."""
+    dataset = open_dataset(root, format)
+    row_filter = ds.field('category') == category if category else None
+    return dataset.to_table(columns=columns, filter=row_filter)
+
+
+def _saved_papers(base_path):
+    # (category, paper) of every saved paper, from metadata.sqlite or the JSON files
+    db_file = os.path.join(base_path, 'metadata.sqlite')
+    if os.path.exists(db_file):
+        db = sqlite3.connect(db_file, timeout=30)
+        try:
+            for category, data in db.execute("SELECT category, data FROM papers WHERE saved = 1 ORDER BY id"):
+                yield category, json.loads(data)
+        finally:
+            db.close()
+        return
+
+    for folder, dirnames, filenames in os.walk(base_path):
+        dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+        category = os.path.relpath(folder, base_path).split(os.sep)[0]
+        for filename in filenames:
+            if not filename.endswith('_metadata.json'):
+                continue
+            try:
+                with open(os.path.join(folder, filename), 'r', encoding='utf-8') as f:
+                    yield category, json.load(f)
+            except (OSError, ValueError):
+                continue
+
+
+def export_tree(base_path, format='parquet', batch_size=5000):
+    """Rewrite the dataset from every paper saved under `base_path`; returns how many were exported."""
+    root = os.path.join(base_path, '.columnar', format)
+    if os.path.exists(root):
+        shutil.rmtree(root)
+    exporter = ColumnarExporter(root, format, batch_size)
+    count = 0
+    for category, paper in _saved_papers(base_path):
+        exporter.add_paper(paper, category)
+        count += 1
+    exporter.close()
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the saved corpus to a columnar dataset and summarize it.")
+    parser.add_argument('--base-path', default='Academic_Papers', help="scraper output folder")
+    parser.add_argument('--format', choices=sorted(FORMATS), default='parquet')
+    parser.add_argument('--rebuild', action='store_true', help="(re)export every saved paper")
+    parser.add_argument('--category', help="only summarize this category")
+    args = parser.parse_args()
+
+    root = os.path.join(args.base_path, '.columnar', args.format)
+    if args.rebuild:
+        print(f"Exported {export_tree(args.base_path, args.format)} papers to {root}")
+    if not os.path.exists(root):
+        print(f"No {args.format} dataset at {root}; run with --rebuild first")
+        return
+
+    start = time.perf_counter()
+    table = read_corpus(root, args.format, category=args.category)
+    elapsed = time.perf_counter() - start
+    print(f"Loaded {table.num_rows} papers in {elapsed * 1000:.1f} ms "
+          f"({table.nbytes / 1024 / 1024:.1f} MB in memory, {pa.total_allocated_bytes() / 1024 / 1024:.1f} MB copied)")
+    # Each file has its own dictionaries; grouping needs them merged
+    for row in table.unify_dictionaries().group_by('source').aggregate([('title', 'count')]).to_pylist():
+        print(f"  {row['source'] or 'unknown'}: {row['title_count']}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,242 @@
+"""
+Persistent corpus index shared by every query and run of the scraper.
+Maps the identity keys of each paper (DOI, arXiv ID, title hash) to where
+its metadata and PDF were first saved, so a paper found again under another
+query or category is linked instead of downloaded again. Downloads are
+claimed in the index, so across sharded worker processes only one of them
+fetches a given paper.
+"""
+
+import os
+import socket
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+
+from dedup import paper_keys
+
+# A download claim older than this is taken to belong to a worker that died
+DOWNLOAD_CLAIM_TIMEOUT = timedelta(minutes=10)
+
+
+def download_owner(worker_id=None):
+    """Name a process claims downloads under: host, pid and worker."""
+    return f"{socket.gethostname()}:{os.getpid()}:{worker_id or 'main'}"
+
+
+def process_alive(hostname, pid):
+    """False only for a process on this host that has exited; other hosts cannot be checked."""
+    if hostname != socket.gethostname() or os.name != 'posix':
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except OSError:
+        pass
+    return True
+
+
+def owner_alive(owner):
+    """False only for a download owner on this host whose process has exited."""
+    parts = (owner or '').split(':')
+    if len(parts) < 3 or not parts[1].isdigit():
+        return True
+    # Another machine's worker: its claim only lapses after DOWNLOAD_CLAIM_TIMEOUT
+    return process_alive(parts[0], int(parts[1]))
+
+
+def link_file(source_path, target_dir):
+    """Hard-link `source_path` into `target_dir`; return the new path or None."""
+    target_path = os.path.join(target_dir, os.path.basename(source_path))
+    if os.path.exists(target_path):
+        return target_path
+    try:
+        os.link(source_path, target_path)
+        return target_path
+    except OSError:
+        # Different filesystem or no hard-link support: keep a reference instead
+        return None
+
+
+class CorpusIndex:
+    """SQLite index of every paper saved under the output folder."""
+
+    def __init__(self, index_file):
+        self.index_file = index_file
+        self.lock = threading.Lock()
+        # Sharded runs open the index from several processes at once
+        self.db = sqlite3.connect(index_file, timeout=30, check_same_thread=False)
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS papers (
+                id INTEGER PRIMARY KEY,
+                title TEXT,
+                category TEXT,
+                query TEXT,
+                metadata_path TEXT,
+                pdf_path TEXT,
+                added_at TEXT,
+                pdf_state TEXT,
+                claimed_by TEXT,
+                claimed_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS paper_keys (
+                key TEXT PRIMARY KEY,
+                paper_id INTEGER NOT NULL REFERENCES papers (id)
+            );
+        """)
+        # Indexes written before download claims existed lack these columns; the
+        # write lock keeps two workers from adding them at once
+        self.db.execute("BEGIN IMMEDIATE")
+        columns = {row[1] for row in self.db.execute("PRAGMA table_info(papers)")}
+        for column in ('pdf_state', 'claimed_by', 'claimed_at'):
+            if column not in columns:
+                self.db.execute(f"ALTER TABLE papers ADD COLUMN {column} TEXT")
+        self.db.commit()
+
+    def _row_to_dict(self, row):
+        if row is None:
+            return None
+        keys = ('id', 'title', 'category', 'query', 'metadata_path', 'pdf_path', 'added_at',
+                'pdf_state', 'claimed_by', 'claimed_at')
+        return dict(zip(keys, row))
+
+    def lookup(self, paper):
+        """Return the indexed entry for `paper`, or None if it has not been seen."""
+        keys = paper_keys(paper)
+        if not keys:
+            return None
+
+        with self.lock:
+            placeholders = ', '.join('?' * len(keys))
+            row = self.db.execute(
+                f"SELECT papers.* FROM paper_keys JOIN papers ON papers.id = paper_keys.paper_id "
+                f"WHERE paper_keys.key IN ({placeholders}) LIMIT 1", keys
+            ).fetchone()
+        return self._row_to_dict(row)
+
+    def add(self, paper, category, query, metadata_path=None):
+        """Index a newly saved paper and return its id (or the id another process added first)."""
+        keys = paper_keys(paper)
+        with self.lock:
+            # Lookup and insert run in one write transaction, so two workers cannot both add a paper
+            self.db.execute("BEGIN IMMEDIATE")
+            row = None
+            if keys:
+                placeholders = ', '.join('?' * len(keys))
+                row = self.db.execute(
+                    f"SELECT paper_id FROM paper_keys WHERE key IN ({placeholders}) LIMIT 1", keys
+                ).fetchone()
+            if row is not None:
+                self.db.commit()
+                return row[0]
+
+            cursor = self.db.execute(
+                "INSERT INTO papers (title, category, query, metadata_path, added_at) VALUES (?, ?, ?, ?, ?)",
+                (paper.get('title'), category, query, metadata_path, datetime.now().isoformat())
+            )
+            paper_id = cursor.lastrowid
+            self.db.executemany(
+                "INSERT OR IGNORE INTO paper_keys (key, paper_id) VALUES (?, ?)",
+                [(key, paper_id) for key in keys]
+            )
+            self.db.commit()
+        return paper_id
+
+    def set_pdf(self, paper_id, pdf_path):
+        """Record where the PDF of an indexed paper was saved."""
+        with self.lock:
+            self.db.execute("UPDATE papers SET pdf_path = ?, pdf_state = 'done' WHERE id = ?", (pdf_path, paper_id))
+            self.db.commit()
+
+    def claim_download(self, paper_id, owner):
+        """
+        Claim the download of a paper's PDF for `owner`. Returns False while
+        another live worker holds the claim or the PDF is saved and on disk.
+        """
+        now = datetime.now()
+        with self.lock:
+            # One UPDATE decides the race: only one process sees its row change
+            cursor = self.db.execute(
+                "UPDATE papers SET pdf_state = 'downloading', claimed_by = ?, claimed_at = ? "
+                "WHERE id = ? AND (pdf_state IS NULL OR pdf_state = 'failed' "
+                "OR (pdf_state = 'downloading' AND claimed_at < ?))",
+                (owner, now.isoformat(), paper_id, (now - DOWNLOAD_CLAIM_TIMEOUT).isoformat())
+            )
+            self.db.commit()
+            if cursor.rowcount == 1:
+                return True
+
+            row = self.db.execute("SELECT pdf_state, pdf_path, claimed_by FROM papers WHERE id = ?",
+                                  (paper_id,)).fetchone()
+            if row is None:
+                return False
+            pdf_state, pdf_path, claimed_by = row
+            if pdf_state == 'done' and not (pdf_path and os.path.exists(pdf_path)):
+                # The saved PDF has been deleted since
+                condition, value = "pdf_state = 'done' AND pdf_path IS ?", pdf_path
+            elif pdf_state == 'downloading' and not owner_alive(claimed_by):
+                # Left behind by a run that was killed or interrupted
+                condition, value = "pdf_state = 'downloading' AND claimed_by = ?", claimed_by
+            else:
+                return False
+            # The condition repeats what was read, so of two workers taking over only one wins
+            cursor = self.db.execute(
+                f"UPDATE papers SET pdf_state = 'downloading', claimed_by = ?, claimed_at = ? "
+                f"WHERE id = ? AND {condition}", (owner, now.isoformat(), paper_id, value)
+            )
+            self.db.commit()
+        return cursor.rowcount == 1
+
+    def release_download(self, paper_id, owner):
+        """Give up a claim after a failed download, so a later query may try again."""
+        with self.lock:
+            self.db.execute("UPDATE papers SET pdf_state = 'failed' WHERE id = ? AND claimed_by = ? "
+                            "AND pdf_state = 'downloading'", (paper_id, owner))
+            self.db.commit()
+
+    def release_claims(self, owner):
+        """Give up every claim `owner` still holds, when its run stops."""
+        with self.lock:
+            self.db.execute("UPDATE papers SET pdf_state = 'failed' WHERE claimed_by = ? "
+                            "AND pdf_state = 'downloading'", (owner,))
+            self.db.commit()
+
+    def wait_for_pdf(self, paper_id, interval=0.5):
+        """
+        Wait while another worker downloads a paper's PDF; return its path, or
+        None if that download failed or its worker died.
+        """
+        deadline = time.monotonic() + DOWNLOAD_CLAIM_TIMEOUT.total_seconds()
+        while time.monotonic() < deadline:
+            with self.lock:
+                row = self.db.execute("SELECT pdf_state, pdf_path, claimed_by FROM papers WHERE id = ?",
+                                      (paper_id,)).fetchone()
+            if row is None or row[0] != 'downloading' or not owner_alive(row[2]):
+                return row[1] if row and row[0] == 'done' else None
+            time.sleep(interval)
+        return None
+
+    def existing_pdf(self, entry):
+        """Return the PDF path of an entry if the file is still on disk."""
+        pdf_path = entry.get('pdf_path') if entry else None
+        if pdf_path and os.path.exists(pdf_path):
+            return pdf_path
+        return None
+
+    def link_pdf(self, entry, target_dir):
+        """Make an entry's PDF available in `target_dir` without downloading it again."""
+        pdf_path = self.existing_pdf(entry)
+        if not pdf_path:
+            return None
+        return link_file(pdf_path, target_dir) or pdf_path
+
+    def __len__(self):
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM papers").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self.db.close()
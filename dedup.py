@@ -0,0 +1,193 @@
+"""
+Paper deduplication for the scholarly article scraper.
+Exact matches on DOI, arXiv ID and normalized title are found with hash
+lookups; near-duplicate titles are found with MinHash/LSH banding and then
+confirmed with the original title similarity rule.
+"""
+
+import hashlib
+import random
+import re
+from array import array
+
+ARXIV_ID_PATTERN = re.compile(
+    r'arxiv\.org/(?:abs|pdf)/((?:\d{4}\.\d{4,5})|(?:[a-z\-]+(?:\.[a-z]{2})?/\d{7}))', re.IGNORECASE)
+DOI_PATTERN = re.compile(r'\b(10\.\d{4,9}/[^\s"<>]+)', re.IGNORECASE)
+ARXIV_VERSION_PATTERN = re.compile(r'v\d+$')
+
+# Mersenne prime used for the MinHash permutations
+MINHASH_PRIME = (1 << 61) - 1
+
+
+def find_arxiv_id(arxiv_id, *urls):
+    """Version-less arXiv ID from an arXiv ID or, failing that, from the first arXiv URL."""
+    if arxiv_id:
+        return ARXIV_VERSION_PATTERN.sub('', arxiv_id)
+    for value in urls:
+        # Cheap check before the regex: most URLs are not arXiv links
+        if not value or ('rxiv' not in value and 'RXIV' not in value):
+            continue
+        match = ARXIV_ID_PATTERN.search(value)
+        if match:
+            return match.group(1)
+    return None
+
+
+def find_doi(*values):
+    """Lower-cased DOI found in the first of `values` that holds one, or None."""
+    for value in values:
+        if not value or '10.' not in value:
+            continue
+        match = DOI_PATTERN.search(value)
+        if match:
+            return match.group(1).rstrip('.').lower()
+    return None
+
+
+def extract_arxiv_id(paper):
+    """Return the version-less arXiv ID of a paper, or None."""
+    return find_arxiv_id(paper.get('arxiv_id'), paper.get('pdf_url'), paper.get('url'))
+
+
+def extract_doi(paper):
+    """Return the lower-cased DOI of a paper, or None."""
+    return find_doi(paper.get('doi'), paper.get('url'), paper.get('pdf_url'))
+
+
+def normalize_title(title):
+    """Lower-case a title and collapse whitespace."""
+    return ' '.join((title or '').lower().split())
+
+
+def title_hash(title):
+    """Stable hash of a normalized title, or None for empty titles."""
+    normalized = normalize_title(title)
+    if not normalized:
+        return None
+    return hashlib.sha1(normalized.encode('utf-8')).hexdigest()
+
+
+def paper_keys(paper):
+    """Exact identity keys of a paper: DOI, arXiv ID and normalized title hash."""
+    keys = []
+    doi = extract_doi(paper)
+    if doi:
+        keys.append('doi:' + doi)
+    arxiv_id = extract_arxiv_id(paper)
+    if arxiv_id:
+        keys.append('arxiv:' + arxiv_id)
+    digest = title_hash(paper.get('title'))
+    if digest:
+        keys.append('title:' + digest)
+    return keys
+
+
+def titles_similar(title, existing_title, threshold=0.7, length_tolerance=0.2):
+    """The original title rule: similar length and word-set Jaccard above `threshold`."""
+    if abs(len(title) - len(existing_title)) / max(len(title), 1) >= length_tolerance:
+        return False
+
+    words = set(title.split())
+    existing_words = set(existing_title.split())
+    overlap = len(words.intersection(existing_words))
+    total_words = len(words.union(existing_words))
+    return overlap / max(total_words, 1) > threshold
+
+
+class PaperDeduplicator:
+    """Incremental deduplicator that keeps the first occurrence of every paper."""
+
+    def __init__(self, threshold=0.7, length_tolerance=0.2, bands=24, rows=3, seed=1):
+        self.threshold = threshold
+        self.length_tolerance = length_tolerance
+        self.bands = bands
+        self.rows = rows
+
+        rng = random.Random(seed)
+        self.permutations = [
+            (rng.randrange(1, MINHASH_PRIME), rng.randrange(0, MINHASH_PRIME))
+            for _ in range(bands * rows)
+        ]
+
+        self.papers = []
+        self.titles = []
+        self.exact_keys = {}
+        # band hash -> index of the one paper in the bucket, or a list once it holds several
+        self.buckets = {}
+        self.word_signatures = {}
+
+    def __len__(self):
+        return len(self.papers)
+
+    def _word_signature(self, word):
+        # Each distinct word is hashed under every permutation only once
+        signature = self.word_signatures.get(word)
+        if signature is None:
+            h = int.from_bytes(hashlib.blake2b(word.encode('utf-8'), digest_size=8).digest(), 'big')
+            signature = array('Q', [(a * h + b) % MINHASH_PRIME for a, b in self.permutations])
+            self.word_signatures[word] = signature
+        return signature
+
+    def _band_keys(self, title):
+        words = set(title.split())
+        if not words:
+            return []
+
+        # MinHash signature: element-wise minimum of the words' permuted hashes
+        signatures = [self._word_signature(word) for word in words]
+        signature = map(min, *signatures) if len(signatures) > 1 else iter(signatures[0])
+        # One int per band instead of a tuple of its rows keeps the buckets small at 10^5+ papers;
+        # a collision only adds a candidate that the title comparison then rejects
+        return [hash((band, *rows)) for band, rows in enumerate(zip(*[signature] * self.rows))]
+
+    def find_duplicate(self, paper, _keys=None, _bands=None):
+        """Return the kept paper that `paper` duplicates, or None."""
+        keys = paper_keys(paper) if _keys is None else _keys
+        for key in keys:
+            if key in self.exact_keys:
+                return self.papers[self.exact_keys[key]]
+
+        title = (paper.get('title') or '').lower().strip()
+        bands = self._band_keys(title) if _bands is None else _bands
+
+        checked = set()
+        for band_key in bands:
+            bucket = self.buckets.get(band_key)
+            if bucket is None:
+                continue
+            for index in (bucket,) if isinstance(bucket, int) else bucket:
+                if index in checked:
+                    continue
+                checked.add(index)
+                if titles_similar(title, self.titles[index], self.threshold, self.length_tolerance):
+                    return self.papers[index]
+        return None
+
+    def add(self, paper):
+        """Keep `paper` unless it duplicates one already kept; return True if kept."""
+        keys = paper_keys(paper)
+        title = (paper.get('title') or '').lower().strip()
+        bands = self._band_keys(title)
+
+        if self.find_duplicate(paper, keys, bands) is not None:
+            return False
+
+        index = len(self.papers)
+        self.papers.append(paper)
+        self.titles.append(title)
+        for key in keys:
+            self.exact_keys.setdefault(key, index)
+        buckets = self.buckets
+        for band_key in bands:
+            bucket = buckets.get(band_key)
+            if bucket is None:
+                buckets[band_key] = index
+            elif isinstance(bucket, int):
+                buckets[band_key] = [bucket, index]
+            else:
+                bucket.append(index)
+        return True
+
+    def deduplicate(self, papers):
+        """Return the papers that are not duplicates, in their original order."""
+        return [paper for paper in papers if self.add(paper)]
@@ -0,0 +1,111 @@
+"""
+Parallel PDF download pool for the scholarly article scraper.
+Downloads run concurrently across hosts while each host gets a capped
+number of simultaneous connections.
+"""
+
+import threading
+import time
+from collections import deque, OrderedDict
+from concurrent.futures import Future, ThreadPoolExecutor
+
+from rate_limiter import get_host
+
+
+class DownloadPool:
+    """Schedules download jobs on a thread pool with a per-host concurrency cap."""
+
+    def __init__(self, download_function, max_workers=8, per_host_limit=2):
+        self.download_function = download_function
+        self.max_workers = max_workers
+        self.per_host_limit = per_host_limit
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='pdf-download')
+
+        self.lock = threading.Lock()
+        self.pending = OrderedDict()  # host -> deque of (future, args)
+        self.active = {}  # host -> running downloads
+
+        self.started = time.monotonic()
+        self.bytes_downloaded = 0
+        self.completed = 0
+        self.failed = 0
+
+    def submit(self, paper, save_path):
+        """Queue a paper's PDF for download and return a Future for the saved path."""
+        future = Future()
+        host = get_host(paper.get('pdf_url') or '')
+
+        with self.lock:
+            self.pending.setdefault(host, deque()).append((future, paper, save_path))
+            self._dispatch()
+
+        return future
+
+    def _dispatch(self):
+        # Caller must hold self.lock
+        for host in list(self.pending):
+            queue = self.pending[host]
+            while queue and self.active.get(host, 0) < self.per_host_limit:
+                future, paper, save_path = queue.popleft()
+                self.active[host] = self.active.get(host, 0) + 1
+                self.executor.submit(self._run, host, future, paper, save_path)
+            if not queue:
+                del self.pending[host]
+
+    def _run(self, host, future, paper, save_path):
+        if not future.set_running_or_notify_cancel():
+            result, error = None, None
+        else:
+            try:
+                result = self.download_function(paper, save_path, progress=self.record_bytes)
+                error = None
+            except Exception as e:
+                result, error = None, e
+
+        with self.lock:
+            self.active[host] -= 1
+            if result:
+                self.completed += 1
+            else:
+                self.failed += 1
+            self._dispatch()
+
+        if future.cancelled():
+            return
+        if error is not None:
+            future.set_exception(error)
+        else:
+            future.set_result(result)
+
+    def record_bytes(self, count):
+        """Add downloaded bytes to the throughput counter."""
+        with self.lock:
+            self.bytes_downloaded += count
+
+    def queue_depth(self):
+        """Number of downloads waiting for a free slot."""
+        with self.lock:
+            return sum(len(queue) for queue in self.pending.values())
+
+    def stats(self):
+        """Return a snapshot of queue depth, activity and throughput."""
+        with self.lock:
+            elapsed = max(time.monotonic() - self.started, 1e-6)
+            return {
+                'queue_depth': sum(len(queue) for queue in self.pending.values()),
+                'active': sum(self.active.values()),
+                'completed': self.completed,
+                'failed': self.failed,
+                'bytes_downloaded': self.bytes_downloaded,
+                'bytes_per_second': self.bytes_downloaded / elapsed
+            }
+
+    def format_stats(self):
+        """Human readable one-line summary of the pool state."""
+        stats = self.stats()
+        return (f"Download pool: {stats['queue_depth']} queued, {stats['active']} active, "
+                f"{stats['completed']} done, {stats['bytes_per_second']/1024:.1f} KB/s")
+
+    def shutdown(self, wait=True):
+        """Stop accepting work and optionally wait for running downloads."""
+        self.executor.shutdown(wait=wait)
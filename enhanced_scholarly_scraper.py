@@ -1,16 +1,45 @@
+import io
 import os
-import time
 import requests
-import json
-import random
 import re
-from datetime import datetime
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from urllib.parse import quote_plus, urlencode
-from bs4 import BeautifulSoup
+from xml.etree import ElementTree as ET
 import importlib.util
 
+from blob_store import BlobStore, InvalidPDFError, check_content_type
+from columnar_export import ColumnarExporter
+from corpus_index import CorpusIndex, download_owner, link_file
+from dedup import PaperDeduplicator, extract_arxiv_id, extract_doi
+from download_pool import DownloadPool
+from harvest_state import HarvestState
+from html_parsers import create_html_parser
+from metadata_store import create_metadata_store
+from metrics import Metrics
+from paper import Paper
+from pdf_text import TextExtractor
+from pipeline import run_pipeline
+from ranking import RelevanceRanker
+from rate_limiter import HostRateLimiter, SharedRateLimiter, get_host
+from resilience import BLOCKED_STATUSES, CircuitBreaker, CircuitOpenError, RetryPolicy
+from response_cache import ResponseCache
+from run_journal import RunJournal
+from search_index import SearchIndex
+from transport import DOWNLOAD_HEADERS, build_session
+
+# Paper fields requested from every Semantic Scholar endpoint
+SEMANTIC_SCHOLAR_FIELDS = 'title,authors,abstract,url,venue,year,citationCount,openAccessPdf,externalIds'
+
+# Incremental harvests reach this far back before the last one, since sources index records late
+HARVEST_OVERLAP = timedelta(days=1)
+
 class EnhancedScholarlyArticleScraper:
-    def __init__(self, base_path='Academic_Papers'):
+    def __init__(self, base_path='Academic_Papers', concurrent_sources=True,
+                 download_workers=8, downloads_per_host=2, use_cache=True, metadata_backend='json',
+                 streaming=False, worker_id=None, html_parser='auto', extract_text=False,
+                 columnar_format=None):
         self.base_path = os.path.join(os.getcwd(), base_path)
         if not os.path.exists(self.base_path):
             os.makedirs(self.base_path)
@@ -23,37 +52,135 @@ class EnhancedScholarlyArticleScraper:
             'arxiv': {
                 'name': 'ArXiv',
                 'api_url': 'http://export.arxiv.org/api/query',
+                'host': 'export.arxiv.org',
                 'search_function': self.search_arxiv,
-                'rate_limit': 3  # seconds between requests
+                'stream_function': self.iter_arxiv,
+                'bulk_function': self.iter_arxiv,
+                'rate_limit': 3,  # seconds between requests
+                'cache_ttl': 24 * 3600,  # seconds a cached response stays fresh
+                'timeout': (5, 20),  # connect and read timeouts per request
+                'time_budget': 45  # seconds one search may spend on retries
             },
             'semantic_scholar': {
                 'name': 'Semantic Scholar',
                 'api_url': 'https://api.semanticscholar.org/graph/v1/paper/search',
+                'bulk_url': 'https://api.semanticscholar.org/graph/v1/paper/search/bulk',
+                'batch_url': 'https://api.semanticscholar.org/graph/v1/paper/batch',
+                'host': 'api.semanticscholar.org',
                 'search_function': self.search_semantic_scholar,
-                'rate_limit': 1
+                'bulk_function': self.iter_semantic_scholar_bulk,
+                'rate_limit': 1,
+                'cache_ttl': 24 * 3600,
+                'timeout': (5, 10),
+                'time_budget': 30
             },
             'crossref': {
                 'name': 'CrossRef',
                 'api_url': 'https://api.crossref.org/works',
+                'host': 'api.crossref.org',
                 'search_function': self.search_crossref,
-                'rate_limit': 1
+                'bulk_function': self.iter_crossref,
+                'rate_limit': 1,
+                'cache_ttl': 24 * 3600,
+                'timeout': (5, 10),
+                'time_budget': 30
             },
             'google_scholar': {
                 'name': 'Google Scholar (Web)',
+                'host': 'scholar.google.com',
+                'scraped': True,  # web pages rather than an API: 403/429 means we are blocked
                 'search_function': self.search_google_scholar_web,
-                'rate_limit': 5
+                'rate_limit': 5,
+                'cache_ttl': 7 * 24 * 3600,
+                'timeout': (5, 8),
+                'time_budget': 20
             },
             'ieee': {
                 'name': 'IEEE Xplore (Web)',
+                'host': 'ieeexplore.ieee.org',
+                'scraped': True,  # web pages rather than an API: 403/429 means we are blocked
                 'search_function': self.search_ieee_web,
-                'rate_limit': 3
+                'rate_limit': 3,
+                'cache_ttl': 7 * 24 * 3600,
+                'timeout': (5, 8),
+                'time_budget': 20
             }
         }
         
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
-        })
+        # Scholar/IEEE result pages go through a fast C-backed parser when one is installed
+        self.html_parser = create_html_parser(html_parser)
+        
+        # Query all sources in parallel; each source still keeps its own pacing
+        self.concurrent_sources = concurrent_sources
+        
+        # Stream search hits through dedup/selection into downloads instead of batching per query
+        self.streaming = streaming
+        
+        # Workers of a sharded run (see sharding.py) share their state through files in base_path
+        self.worker_id = worker_id
+        
+        # One token bucket per host; PDF hosts fall back to the limiter defaults
+        if worker_id is None:
+            self.rate_limiter = HostRateLimiter()
+        else:
+            self.rate_limiter = SharedRateLimiter(os.path.join(self.base_path, '.rate_limits.sqlite'))
+        for source_info in self.academic_sources.values():
+            self.rate_limiter.configure(source_info['host'], 1.0 / source_info['rate_limit'])
+        self.rate_limiter.configure('arxiv.org', 1.0 / 3)
+        
+        # Transient failures are retried; a source that keeps failing is skipped for a while
+        self.retry_policy = RetryPolicy()
+        self.circuit_breakers = {
+            source_key: CircuitBreaker(source_info['name']) for source_key, source_info in self.academic_sources.items()
+        }
+        
+        # One pooled keep-alive session for every search and download
+        self.session = build_session(pool_maxsize=max(download_workers, len(self.academic_sources)))
+        
+        # PDFs download in the background, overlapping with the next searches
+        self.download_pool = DownloadPool(self.download_pdf, max_workers=download_workers,
+                                          per_host_limit=downloads_per_host)
+        
+        # Timers and counters for every stage, written out per category
+        self.metrics = Metrics()
+        
+        # Search responses are cached on disk between runs
+        self.response_cache = ResponseCache(os.path.join(self.base_path, '.http_cache.sqlite')) if use_cache else None
+        
+        # Paper metadata goes to per-paper JSON files or an indexed database
+        self.metadata_store = create_metadata_store(metadata_backend, self.base_path)
+        
+        # Every paper saved so far, shared across queries, categories and runs
+        self.corpus_index = CorpusIndex(os.path.join(self.base_path, '.corpus_index.sqlite'))
+        self._inflight_downloads = {}
+        
+        # Downloads are claimed in the corpus index; a paper another worker is fetching is
+        # linked once that worker finishes, from one of these threads
+        self.download_owner = download_owner(worker_id)
+        self._claim_waiters = ThreadPoolExecutor(max_workers=download_workers)
+        
+        # PDFs are stored once by content hash and hard-linked into the query folders
+        self.blob_store = BlobStore(os.path.join(self.base_path, '.blobs'))
+        
+        # Full-text index of everything saved, searchable before any network call
+        self.search_index = SearchIndex(os.path.join(self.base_path, '.search_index.sqlite'))
+        
+        # Search results are ranked before download selection, with term statistics per category
+        self.rankers = {}
+        
+        # Saved papers can also be appended to a Parquet/Arrow dataset for analysis
+        self.columnar_exporter = (ColumnarExporter(os.path.join(self.base_path, '.columnar', columnar_format),
+                                                   columnar_format) if columnar_format else None)
+        
+        # Downloaded PDFs can go on to a process pool that extracts their text
+        self.text_extractor = TextExtractor(os.path.join(self.base_path, '.blobs', 'text')) if extract_text else None
+        
+        # Finished steps of the current run, so an interrupted run can resume
+        journal_name = '.run_journal.jsonl' if worker_id is None else f'.run_journal-{worker_id}.jsonl'
+        self.journal = RunJournal(os.path.join(self.base_path, journal_name))
+        
+        # When each query was last harvested from each source, for incremental harvests
+        self.harvest_state = HarvestState(os.path.join(self.base_path, '.harvest_state.sqlite'))
     
     def load_search_terms(self):
         """Load search terms from AcademicSearchTerms.py if available."""
@@ -96,97 +223,191 @@ class EnhancedScholarlyArticleScraper:
         """Search ArXiv using their API."""
         papers = []
         try:
-            params = {
-                'search_query': f'all:{query}',
-                'start': 0,
-                'max_results': max_results,
-                'sortBy': 'relevance',
-                'sortOrder': 'descending'
-            }
+            for paper in self.iter_arxiv(query, max_results):
+                papers.append(paper)
             
-            url = f"{self.academic_sources['arxiv']['api_url']}?{urlencode(params)}"
-            response = self.session.get(url, timeout=15)
-            
-            if response.status_code == 200:
-                # Parse XML response
-                from xml.etree import ElementTree as ET
-                root = ET.fromstring(response.content)
-                
-                # Extract papers
-                for entry in root.findall('{http://www.w3.org/2005/Atom}entry'):
-                    title_elem = entry.find('{http://www.w3.org/2005/Atom}title')
-                    summary_elem = entry.find('{http://www.w3.org/2005/Atom}summary')
-                    
-                    authors = []
-                    for author in entry.findall('{http://www.w3.org/2005/Atom}author'):
-                        name_elem = author.find('{http://www.w3.org/2005/Atom}name')
-                        if name_elem is not None:
-                            authors.append(name_elem.text)
-                    
-                    # Get PDF link
-                    pdf_link = None
-                    for link in entry.findall('{http://www.w3.org/2005/Atom}link'):
-                        if link.get('type') == 'application/pdf':
-                            pdf_link = link.get('href')
-                            break
-                    
-                    if title_elem is not None and pdf_link:
-                        paper = {
-                            'title': title_elem.text.strip(),
-                            'authors': ', '.join(authors),
-                            'abstract': summary_elem.text.strip() if summary_elem is not None else '',
-                            'pdf_url': pdf_link,
-                            'source': 'ArXiv',
-                            'query': query
-                        }
-                        papers.append(paper)
-                
-                print(f"  ArXiv: Found {len(papers)} papers")
+            print(f"  ArXiv: Found {len(papers)} papers")
         
         except Exception as e:
             print(f"  Error searching ArXiv: {str(e)}")
         
         return papers
     
+    def _arxiv_request(self, query, start, max_results, since=None):
+        search_query = f'all:{query}'
+        if since:
+            # submittedDate ranges are in GMT, to the minute
+            now = datetime.now(timezone.utc)
+            search_query += f" AND submittedDate:[{since.astimezone(timezone.utc):%Y%m%d%H%M} TO {now:%Y%m%d%H%M}]"
+        params = {
+            'search_query': search_query,
+            'start': start,
+            'max_results': max_results,
+            'sortBy': 'relevance',
+            'sortOrder': 'descending'
+        }
+        return {'url': f"{self.academic_sources['arxiv']['api_url']}?{urlencode(params)}"}
+    
+    def iter_arxiv(self, query, max_results=1000, page_size=100, since=None):
+        """
+        Yield ArXiv papers page by page, parsing each Atom feed incrementally.
+        With `since`, only papers submitted after that time are requested.
+        """
+        start = 0
+        count = 0
+        total_results = None
+        
+        while start < max_results and (total_results is None or start < total_results):
+            url = self._arxiv_request(query, start, min(page_size, max_results - start), since)['url']
+            response = self._get(url, source='arxiv', stream=True)
+            
+            if response.status_code != 200:
+                response.close()
+                raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+            
+            # Parse time of a page includes reading it when the body is streamed
+            entries_seen = 0
+            parse_seconds = 0.0
+            items = self._iterparse_arxiv_feed(self._response_stream(response), query)
+            while True:
+                parse_start = time.perf_counter()
+                item = next(items, response)
+                parse_seconds += time.perf_counter() - parse_start
+                if item is response:
+                    break
+                if isinstance(item, int):
+                    total_results = item
+                    continue
+                entries_seen += 1
+                if item is not None:
+                    yield item
+                    count += 1
+                    # A server may send a longer page than was asked for
+                    if count >= max_results:
+                        break
+            response.close()
+            self.metrics.observe('parse_seconds', parse_seconds, source='arxiv')
+            
+            if entries_seen == 0 or count >= max_results:
+                return
+            start += entries_seen
+    
+    def _response_stream(self, response):
+        """File-like body of a streamed response (cached bodies are already in memory)."""
+        if self.response_cache is not None:
+            return io.BytesIO(response.content)
+        response.raw.decode_content = True
+        return response.raw
+    
+    def _iterparse_arxiv_feed(self, stream, query):
+        """
+        Parse an ArXiv Atom feed as it is read. Yields the feed's total result
+        count (an int), then one Paper per entry (None for unusable entries).
+        """
+        atom = '{http://www.w3.org/2005/Atom}'
+        total_results_tag = '{http://a9.com/-/spec/opensearch/1.1/}totalResults'
+        root = None
+        
+        for event, elem in ET.iterparse(stream, events=('start', 'end')):
+            if event == 'start':
+                if root is None:
+                    root = elem
+                continue
+            
+            if elem.tag == total_results_tag and elem.text and elem.text.strip().isdigit():
+                yield int(elem.text)
+            elif elem.tag == f'{atom}entry':
+                yield self._parse_arxiv_entry(elem, query)
+                # Drop parsed entries so memory stays bounded by one entry
+                root.clear()
+    
+    def _parse_arxiv_entry(self, entry, query):
+        """Build a Paper from one Atom <entry>, or None if it has no title/PDF."""
+        atom = '{http://www.w3.org/2005/Atom}'
+        title_elem = entry.find(f'{atom}title')
+        summary_elem = entry.find(f'{atom}summary')
+        id_elem = entry.find(f'{atom}id')
+        
+        authors = []
+        for author in entry.findall(f'{atom}author'):
+            name_elem = author.find(f'{atom}name')
+            if name_elem is not None:
+                authors.append(name_elem.text)
+        
+        # Get PDF link
+        pdf_link = None
+        for link in entry.findall(f'{atom}link'):
+            if link.get('type') == 'application/pdf':
+                pdf_link = link.get('href')
+                break
+        
+        if title_elem is None or not title_elem.text or not pdf_link:
+            return None
+        
+        # The entry id is the abs page, which carries the arXiv ID
+        return Paper(
+            title=title_elem.text,
+            authors=', '.join(authors),
+            abstract=summary_elem.text if summary_elem is not None else None,
+            pdf_url=pdf_link,
+            url=id_elem.text if id_elem is not None else None,
+            source='ArXiv',
+            query=query
+        )
+    
+    def _semantic_scholar_request(self, query, max_results, since=None):
+        params = {
+            'query': query,
+            'limit': max_results,
+            'fields': SEMANTIC_SCHOLAR_FIELDS
+        }
+        if since:
+            # Open-ended range: published on or after that day
+            params['publicationDateOrYear'] = f"{since:%Y-%m-%d}:"
+        return {
+            'url': self.academic_sources['semantic_scholar']['api_url'],
+            'params': params
+        }
+    
+    def _parse_semantic_scholar(self, data, query):
+        """Build Papers from a Semantic Scholar search response."""
+        papers = []
+        for paper_data in data.get('data', []):
+            authors = [author.get('name', '') for author in paper_data.get('authors', [])]
+            
+            pdf_url = None
+            if paper_data.get('openAccessPdf'):
+                pdf_url = paper_data['openAccessPdf'].get('url')
+            
+            external_ids = paper_data.get('externalIds') or {}
+            
+            paper = Paper(
+                title=paper_data.get('title'),
+                authors=', '.join(authors),
+                abstract=paper_data.get('abstract'),
+                pdf_url=pdf_url,
+                url=paper_data.get('url'),
+                doi=external_ids.get('DOI'),
+                arxiv_id=external_ids.get('ArXiv'),
+                venue=paper_data.get('venue'),
+                year=paper_data.get('year'),
+                citations=paper_data.get('citationCount'),
+                source='Semantic Scholar',
+                query=query
+            )
+            papers.append(paper)
+        return papers
+    
     def search_semantic_scholar(self, query, max_results=10):
         """Search Semantic Scholar API."""
         papers = []
         try:
-            params = {
-                'query': query,
-                'limit': max_results,
-                'fields': 'title,authors,abstract,url,venue,year,citationCount,openAccessPdf'
-            }
-            
-            response = self.session.get(
-                self.academic_sources['semantic_scholar']['api_url'],
-                params=params,
-                timeout=15
-            )
+            request = self._semantic_scholar_request(query, max_results)
+            response = self._get(request['url'], source='semantic_scholar', params=request['params'])
             
             if response.status_code == 200:
-                data = response.json()
-                
-                for paper_data in data.get('data', []):
-                    authors = [author.get('name', '') for author in paper_data.get('authors', [])]
-                    
-                    pdf_url = None
-                    if paper_data.get('openAccessPdf'):
-                        pdf_url = paper_data['openAccessPdf'].get('url')
-                    
-                    paper = {
-                        'title': paper_data.get('title', ''),
-                        'authors': ', '.join(authors),
-                        'abstract': paper_data.get('abstract', ''),
-                        'pdf_url': pdf_url,
-                        'venue': paper_data.get('venue', ''),
-                        'year': paper_data.get('year'),
-                        'citations': paper_data.get('citationCount', 0),
-                        'source': 'Semantic Scholar',
-                        'query': query
-                    }
-                    papers.append(paper)
-                
+                with self.metrics.timer('parse_seconds', source='semantic_scholar'):
+                    papers = self._parse_semantic_scholar(response.json(), query)
                 print(f"  Semantic Scholar: Found {len(papers)} papers")
         
         except Exception as e:
@@ -194,55 +415,66 @@ class EnhancedScholarlyArticleScraper:
         
         return papers
     
+    def _crossref_request(self, query, max_results, since=None):
+        params = {
+            'query': query,
+            'rows': max_results,
+            'sort': 'relevance',
+            'select': 'DOI,title,author,abstract,publisher,published-print,issued,URL'
+        }
+        if since:
+            # Works registered or updated since then, including ones published long ago
+            params['filter'] = f"from-index-date:{since:%Y-%m-%d}"
+        return {
+            'url': self.academic_sources['crossref']['api_url'],
+            'params': params
+        }
+    
+    def _parse_crossref(self, data, query):
+        """Build Papers from a CrossRef works response."""
+        papers = []
+        for item in data.get('message', {}).get('items', []):
+            title = ''
+            if 'title' in item and item['title']:
+                title = item['title'][0]
+            
+            authors = []
+            if 'author' in item:
+                for author in item['author']:
+                    name_parts = []
+                    if 'given' in author:
+                        name_parts.append(author['given'])
+                    if 'family' in author:
+                        name_parts.append(author['family'])
+                    if name_parts:
+                        authors.append(' '.join(name_parts))
+            
+            # Online-only works have no print date; Paper reads the year out of the date
+            # and strips the JATS markup of the abstract
+            paper = Paper(
+                title=title,
+                authors=', '.join(authors),
+                abstract=item.get('abstract'),
+                doi=item.get('DOI'),
+                publisher=item.get('publisher'),
+                year=item.get('published-print') or item.get('issued'),
+                url=item.get('URL'),
+                source='CrossRef',
+                query=query
+            )
+            papers.append(paper)
+        return papers
+    
     def search_crossref(self, query, max_results=10):
         """Search CrossRef API for academic papers."""
         papers = []
         try:
-            params = {
-                'query': query,
-                'rows': max_results,
-                'sort': 'relevance',
-                'select': 'DOI,title,author,abstract,publisher,published-print,URL'
-            }
-            
-            response = self.session.get(
-                self.academic_sources['crossref']['api_url'],
-                params=params,
-                timeout=15
-            )
+            request = self._crossref_request(query, max_results)
+            response = self._get(request['url'], source='crossref', params=request['params'])
             
             if response.status_code == 200:
-                data = response.json()
-                
-                for item in data.get('message', {}).get('items', []):
-                    title = ''
-                    if 'title' in item and item['title']:
-                        title = item['title'][0]
-                    
-                    authors = []
-                    if 'author' in item:
-                        for author in item['author']:
-                            name_parts = []
-                            if 'given' in author:
-                                name_parts.append(author['given'])
-                            if 'family' in author:
-                                name_parts.append(author['family'])
-                            if name_parts:
-                                authors.append(' '.join(name_parts))
-                    
-                    paper = {
-                        'title': title,
-                        'authors': ', '.join(authors),
-                        'abstract': item.get('abstract', ''),
-                        'doi': item.get('DOI', ''),
-                        'publisher': item.get('publisher', ''),
-                        'year': item.get('published-print', {}).get('date-parts', [[None]])[0][0],
-                        'url': item.get('URL', ''),
-                        'source': 'CrossRef',
-                        'query': query
-                    }
-                    papers.append(paper)
-                
+                with self.metrics.timer('parse_seconds', source='crossref'):
+                    papers = self._parse_crossref(response.json(), query)
                 print(f"  CrossRef: Found {len(papers)} papers")
         
         except Exception as e:
@@ -250,54 +482,143 @@ class EnhancedScholarlyArticleScraper:
         
         return papers
     
+    def iter_semantic_scholar_bulk(self, query, max_results=1000, since=None):
+        """
+        Yield Semantic Scholar papers from the bulk search endpoint (up to 1000
+        per request), following its continuation tokens. Results are not ranked
+        by relevance, so this is meant for harvesting rather than top-N search.
+        """
+        url = self.academic_sources['semantic_scholar']['bulk_url']
+        params = self._semantic_scholar_request(query, max_results, since)['params']
+        del params['limit']
+        count = 0
+        
+        while count < max_results:
+            response = self._get(url, source='semantic_scholar', params=params)
+            if response.status_code != 200:
+                raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+            
+            data = response.json()
+            with self.metrics.timer('parse_seconds', source='semantic_scholar'):
+                papers = self._parse_semantic_scholar(data, query)
+            
+            for paper in papers[:max_results - count]:
+                yield paper
+            count += len(papers)
+            
+            if not papers or not data.get('token'):
+                return
+            params = dict(params, token=data['token'])
+    
+    def fetch_semantic_scholar_batch(self, paper_ids, query=None, batch_size=500):
+        """
+        Look papers up by ID ('DOI:...', 'ARXIV:...' or a Semantic Scholar ID)
+        with the batch endpoint, up to 500 per request. Returns {id: paper}.
+        """
+        source_info = self.academic_sources['semantic_scholar']
+        found = {}
+        
+        for start in range(0, len(paper_ids), batch_size):
+            chunk = paper_ids[start:start + batch_size]
+            response = self._send(source_info['batch_url'], source='semantic_scholar', method='POST',
+                                  params={'fields': SEMANTIC_SCHOLAR_FIELDS}, json={'ids': chunk},
+                                  timeout=source_info['timeout'])
+            if response.status_code != 200:
+                print(f"  Semantic Scholar batch lookup: HTTP {response.status_code}")
+                continue
+            
+            # The response lists one entry (or null) per requested ID, in order
+            for paper_id, paper_data in zip(chunk, response.json()):
+                if paper_data:
+                    found[paper_id] = self._parse_semantic_scholar({'data': [paper_data]}, query)[0]
+        
+        return found
+    
+    def enrich_papers(self, papers):
+        """
+        Fill in missing PDF links, abstracts, venues, years and citation counts
+        from one Semantic Scholar batch lookup by DOI/arXiv ID. Returns the
+        number of papers that were found.
+        """
+        by_id = {}
+        for paper in papers:
+            if paper.get('source') == 'Semantic Scholar':
+                continue
+            doi, arxiv_id = extract_doi(paper), extract_arxiv_id(paper)
+            paper_id = f'DOI:{doi}' if doi else f'ARXIV:{arxiv_id}' if arxiv_id else None
+            if paper_id:
+                by_id.setdefault(paper_id, []).append(paper)
+        
+        if not by_id:
+            return 0
+        
+        found = self.fetch_semantic_scholar_batch(list(by_id))
+        for paper_id, s2_paper in found.items():
+            for paper in by_id[paper_id]:
+                for field in ('pdf_url', 'abstract', 'venue', 'year', 'citations'):
+                    if not paper.get(field) and s2_paper.get(field):
+                        paper[field] = s2_paper[field]
+        return sum(len(by_id[paper_id]) for paper_id in found)
+    
+    def iter_crossref(self, query, max_results=1000, rows=1000, since=None):
+        """Yield CrossRef works with cursor-based deep paging (up to 1000 rows per request)."""
+        request = self._crossref_request(query, min(rows, max_results), since)
+        params = dict(request['params'], cursor='*')
+        count = 0
+        
+        while count < max_results:
+            params['rows'] = min(rows, max_results - count)
+            response = self._get(request['url'], source='crossref', params=params)
+            if response.status_code != 200:
+                raise requests.HTTPError(f"HTTP {response.status_code}", response=response)
+            
+            data = response.json()
+            with self.metrics.timer('parse_seconds', source='crossref'):
+                papers = self._parse_crossref(data, query)
+            
+            for paper in papers:
+                yield paper
+            count += len(papers)
+            
+            next_cursor = data.get('message', {}).get('next-cursor')
+            if not papers or not next_cursor:
+                return
+            params = dict(params, cursor=next_cursor)
+    
+    def _google_scholar_request(self, query, max_results):
+        return {
+            'url': f"https://scholar.google.com/scholar?q={quote_plus(query)}&num={max_results}"
+        }
+    
+    def _parse_google_scholar(self, html, query):
+        """Build Papers from a Google Scholar results page."""
+        papers = []
+        for fields in self.html_parser.google_scholar_results(html):
+            # Extract authors and venue
+            authors_text = fields['authors_text']
+            
+            paper = Paper(
+                title=fields['title'],
+                authors=authors_text.split(' - ')[0] if ' - ' in authors_text else authors_text,
+                abstract=fields['abstract'],
+                url=fields['url'],
+                pdf_url=fields['pdf_link'],
+                source='Google Scholar',
+                query=query
+            )
+            papers.append(paper)
+        return papers
+    
     def search_google_scholar_web(self, query, max_results=10):
         """Search Google Scholar via web scraping."""
         papers = []
         try:
-            search_url = f"https://scholar.google.com/scholar?q={quote_plus(query)}&num={max_results}"
-            
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
-            }
-            
-            response = self.session.get(search_url, headers=headers, timeout=15)
+            request = self._google_scholar_request(query, max_results)
+            response = self._get(request['url'], source='google_scholar')
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                for result in soup.select('.gs_r.gs_or.gs_scl'):
-                    title_elem = result.select_one('h3.gs_rt a')
-                    if not title_elem:
-                        continue
-                    
-                    title = title_elem.get_text(strip=True)
-                    url = title_elem.get('href', '')
-                    
-                    # Extract authors and venue
-                    authors_elem = result.select_one('.gs_a')
-                    authors_text = authors_elem.get_text(strip=True) if authors_elem else ''
-                    
-                    # Extract abstract
-                    abstract_elem = result.select_one('.gs_rs')
-                    abstract = abstract_elem.get_text(strip=True) if abstract_elem else ''
-                    
-                    # Check for PDF links
-                    pdf_link = None
-                    pdf_elem = result.select_one('a[href$=".pdf"]')
-                    if pdf_elem:
-                        pdf_link = pdf_elem.get('href')
-                    
-                    paper = {
-                        'title': title,
-                        'authors': authors_text.split(' - ')[0] if ' - ' in authors_text else authors_text,
-                        'abstract': abstract,
-                        'url': url,
-                        'pdf_url': pdf_link,
-                        'source': 'Google Scholar',
-                        'query': query
-                    }
-                    papers.append(paper)
-                
+                with self.metrics.timer('parse_seconds', source='google_scholar'):
+                    papers = self._parse_google_scholar(response.text, query)
                 print(f"  Google Scholar: Found {len(papers)} papers")
         
         except Exception as e:
@@ -305,43 +626,36 @@ class EnhancedScholarlyArticleScraper:
         
         return papers
     
+    def _ieee_request(self, query, max_results):
+        return {
+            'url': f"https://ieeexplore.ieee.org/search/searchresult.jsp?queryText={quote_plus(query)}&highlight=true&returnType=SEARCH"
+        }
+    
+    def _parse_ieee(self, html, query, max_results):
+        """Build Papers from an IEEE Xplore results page."""
+        papers = []
+        for fields in self.html_parser.ieee_results(html, max_results):
+            paper = Paper(
+                title=fields['title'],
+                authors=fields['authors'],
+                abstract=fields['abstract'],
+                url=f"https://ieeexplore.ieee.org{fields['href']}",
+                source='IEEE Xplore',
+                query=query
+            )
+            papers.append(paper)
+        return papers
+    
     def search_ieee_web(self, query, max_results=10):
         """Search IEEE Xplore via web scraping."""
         papers = []
         try:
-            search_url = f"https://ieeexplore.ieee.org/search/searchresult.jsp?queryText={quote_plus(query)}&highlight=true&returnType=SEARCH"
-            
-            response = self.session.get(search_url, timeout=15)
+            request = self._ieee_request(query, max_results)
+            response = self._get(request['url'], source='ieee')
             
             if response.status_code == 200:
-                soup = BeautifulSoup(response.text, 'html.parser')
-                
-                for result in soup.select('.List-results-items')[:max_results]:
-                    title_elem = result.select_one('h2 a')
-                    if not title_elem:
-                        continue
-                    
-                    title = title_elem.get_text(strip=True)
-                    url = f"https://ieeexplore.ieee.org{title_elem.get('href', '')}"
-                    
-                    # Extract authors
-                    authors_elem = result.select_one('.author')
-                    authors = authors_elem.get_text(strip=True) if authors_elem else ''
-                    
-                    # Extract abstract
-                    abstract_elem = result.select_one('.description')
-                    abstract = abstract_elem.get_text(strip=True) if abstract_elem else ''
-                    
-                    paper = {
-                        'title': title,
-                        'authors': authors,
-                        'abstract': abstract,
-                        'url': url,
-                        'source': 'IEEE Xplore',
-                        'query': query
-                    }
-                    papers.append(paper)
-                
+                with self.metrics.timer('parse_seconds', source='ieee'):
+                    papers = self._parse_ieee(response.text, query, max_results)
                 print(f"  IEEE Xplore: Found {len(papers)} papers")
         
         except Exception as e:
@@ -349,75 +663,219 @@ class EnhancedScholarlyArticleScraper:
         
         return papers
     
-    def download_pdf(self, paper, save_path):
-        """Download PDF if available."""
+    def _pdf_path(self, paper, save_path):
+        """Where a paper's PDF is saved inside a query folder."""
+        # Clean filename
+        clean_title = re.sub(r'[\\/*?:"<>|]', '_', paper['title'])
+        clean_title = clean_title[:80]  # Limit length
+        return os.path.join(save_path, f"{clean_title}.pdf")
+    
+    def _query_path(self, category_path, query_index, query):
+        """Folder that holds the results of one query."""
+        clean_query = re.sub(r'[\\/*?:"<>|]', '_', query)
+        return os.path.join(category_path, f"{query_index:02d}_{clean_query[:30]}")
+    
+    def download_pdf(self, paper, save_path, progress=None):
+        """
+        Download a PDF into the blob store, reporting each chunk's size to `progress`,
+        and link it into the query folder. Returns the PDF's path in the folder.
+        """
         if not paper.get('pdf_url'):
             return None
         
+        url = paper['pdf_url']
+        source = paper.get('source')
+        filename = os.path.basename(self._pdf_path(paper, save_path))
+        start = time.perf_counter()
+        writer = None
+        response = None
         try:
-            # Clean filename
-            clean_title = re.sub(r'[\\/*?:"<>|]', '_', paper['title'])
-            clean_title = clean_title[:80]  # Limit length
-            filename = f"{clean_title}.pdf"
-            
-            file_path = os.path.join(save_path, filename)
-            
-            print(f"    Downloading PDF: {filename}")
+            digest = self.blob_store.lookup_url(url)
+            if digest:
+                print(f"    Already downloaded: {filename}")
+                self.metrics.inc('downloads', result='skipped', source=source)
+                return self.blob_store.link(digest, save_path, filename, url)
             
-            # Download with academic headers
-            headers = {
-                'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36',
-                'Accept': 'application/pdf,*/*'
-            }
+            # Resume an interrupted download from where it stopped
+            headers = DOWNLOAD_HEADERS
+            writer = self.blob_store.writer(url)
+            resume_from = writer.size
+            if resume_from:
+                headers = dict(DOWNLOAD_HEADERS, Range=f'bytes={resume_from}-')
+                print(f"    Resuming PDF: {filename} from {resume_from/1024:.1f} KB")
+            else:
+                print(f"    Downloading PDF: {filename}")
             
-            response = self.session.get(paper['pdf_url'], headers=headers, timeout=30, stream=True)
+            response = self._get(url, headers=headers, timeout=30, stream=True)
+            if response.status_code == 416 and resume_from:
+                # Server has nothing past what we already have
+                digest = self.blob_store.commit(writer, url)
+                return self.blob_store.link(digest, save_path, filename, url)
             response.raise_for_status()
+            content_type = response.headers.get('Content-Type')
+            check_content_type(content_type)
             
-            # Save PDF
-            with open(file_path, 'wb') as f:
-                for chunk in response.iter_content(chunk_size=8192):
-                    if chunk:
-                        f.write(chunk)
+            # Servers that ignore Range send the whole file again
+            if resume_from and response.status_code != 206:
+                writer.restart()
             
-            file_size = os.path.getsize(file_path)
-            print(f"      Downloaded: {file_size/1024:.1f} KB")
+            # Hash and check the PDF while it streams to disk
+            received = 0
+            for chunk in response.iter_content(chunk_size=8192):
+                if chunk:
+                    writer.write(chunk)
+                    received += len(chunk)
+                    if progress:
+                        progress(len(chunk))
             
-            return file_path
+            digest = self.blob_store.commit(writer, url, content_type)
+            print(f"      Downloaded: {writer.size/1024:.1f} KB")
             
+            self.metrics.observe('download_seconds', time.perf_counter() - start, source=source)
+            self.metrics.inc('download_bytes', received, source=source)
+            self.metrics.inc('downloads', result='ok', source=source)
+            return self.blob_store.link(digest, save_path, filename, url)
+            
+        except InvalidPDFError as e:
+            print(f"      Not a PDF: {str(e)}")
+            self.blob_store.discard(url, writer)
+            self.metrics.inc('downloads', result='invalid', source=source)
+            return None
         except Exception as e:
             print(f"      Error downloading PDF: {str(e)}")
+            if writer is not None:
+                self.blob_store.suspend(url, writer)
+            self.metrics.inc('downloads', result='error', source=source)
             return None
+        finally:
+            # A body left unread would hold on to its pooled connection
+            if response is not None:
+                response.close()
     
-    def save_paper_metadata(self, paper, save_path):
-        """Save paper metadata as JSON."""
+    def save_paper_metadata(self, paper, save_path, category=None):
+        """Save paper metadata through the configured metadata store."""
         try:
-            clean_title = re.sub(r'[\\/*?:"<>|]', '_', paper['title'])
-            clean_title = clean_title[:80]
-            metadata_file = os.path.join(save_path, f"{clean_title}_metadata.json")
-            
-            with open(metadata_file, 'w', encoding='utf-8') as f:
-                json.dump(paper, f, indent=2, ensure_ascii=False)
-                
+            with self.metrics.timer('metadata_write_seconds', kind='paper'):
+                metadata_path = self.metadata_store.save_paper(paper, save_path, category)
+                self.search_index.add_paper(paper, category, metadata_path)
+                if self.columnar_exporter is not None:
+                    self.columnar_exporter.add_paper(paper, category)
+                return metadata_path
         except Exception as e:
             print(f"      Error saving metadata: {str(e)}")
+            return None
+    
+    def _get(self, url, source=None, **kwargs):
+        """GET a URL, serving a source's search responses from the cache while fresh."""
+        if source:
+            kwargs.setdefault('timeout', self.academic_sources[source]['timeout'])
+        if source and self.response_cache is not None:
+            ttl = self.academic_sources[source]['cache_ttl']
+            send = lambda send_url, **send_kwargs: self._send(send_url, source=source, **send_kwargs)
+            return self.response_cache.get(self.session, url, ttl, send=send, **kwargs)
+        return self._send(url, source=source, **kwargs)
+    
+    def _send(self, url, source=None, max_throttle_wait=60, method='GET', **kwargs):
+        """
+        Send a request once its host's rate budget allows. 429/5xx responses and connection
+        errors are retried with jittered backoff within the source's time budget, and
+        the source's circuit breaker is told how the request went. A scraped source
+        that answers 403/429 is blocking us, which counts as a failure right away.
+        """
+        breaker = self.circuit_breakers.get(source)
+        if breaker:
+            try:
+                breaker.check()
+            except CircuitOpenError:
+                self.metrics.inc('circuit_open_skips', source=source)
+                raise
+            deadline = time.monotonic() + self.academic_sources[source]['time_budget']
+            scraped = self.academic_sources[source].get('scraped', False)
+        else:
+            deadline = time.monotonic() + max_throttle_wait
+            scraped = False
+        
+        host = get_host(url)
+        for attempt in range(self.retry_policy.max_attempts):
+            self.metrics.inc('rate_limit_sleep_seconds', self.rate_limiter.acquire(url), host=host)
+            retry_after = None
+            try:
+                with self.metrics.timer('request_seconds', source=source or 'download'):
+                    response = self.session.request(method, url, **kwargs)
+            except (requests.ConnectionError, requests.Timeout, requests.exceptions.ChunkedEncodingError) as e:
+                response, error = None, e
+                self.metrics.inc('request_errors', source=source or 'download')
+            except requests.RequestException:
+                # Not worth retrying (redirect loop, bad URL), but a half-open trial must still end
+                self.metrics.inc('request_errors', source=source or 'download')
+                if breaker:
+                    breaker.record_failure()
+                raise
+            else:
+                self.metrics.inc('responses', source=source or 'download', status=response.status_code)
+                retry_after = self.rate_limiter.update_from_response(url, response)
+                if scraped and response.status_code in BLOCKED_STATUSES:
+                    breaker.record_failure()
+                    return response
+                if not self.retry_policy.should_retry(response.status_code):
+                    if breaker:
+                        breaker.record_success()
+                    return response
+                error = f"HTTP {response.status_code}"
+            
+            delay = self.retry_policy.delay(attempt, retry_after)
+            if attempt + 1 == self.retry_policy.max_attempts or time.monotonic() + delay > deadline:
+                break
+            
+            print(f"  {error} from {host}, retrying in {delay:.1f}s")
+            self.metrics.inc('retries', source=source or 'download')
+            self.metrics.inc('retry_sleep_seconds', delay, source=source or 'download')
+            if response is not None:
+                response.close()
+            time.sleep(delay)
+        
+        if breaker:
+            breaker.record_failure()
+        if response is None:
+            raise error
+        return response
+    
+    def query_source(self, source_key, query, max_results=5):
+        """Query a single source, reporting errors instead of raising them."""
+        source_info = self.academic_sources[source_key]
+        try:
+            with self.metrics.timer('search_seconds', source=source_key):
+                papers = source_info['search_function'](query, max_results)
+            self.metrics.inc('papers_found', len(papers), source=source_key)
+            return papers
+        except Exception as e:
+            print(f"  Error with {source_info['name']}: {str(e)}")
+            return []
     
-    def search_all_sources(self, query, max_results_per_source=5):
+    def search_all_sources(self, query, max_results_per_source=5, concurrent=None):
         """Search all available academic sources."""
+        if concurrent is None:
+            concurrent = self.concurrent_sources
+        
         all_papers = []
         
         print(f"\nSearching for: '{query}'")
         print("-" * 50)
         
-        for source_key, source_info in self.academic_sources.items():
-            try:
-                papers = source_info['search_function'](query, max_results_per_source)
-                all_papers.extend(papers)
-                
-                # Respectful delay
-                time.sleep(source_info['rate_limit'])
-                
-            except Exception as e:
-                print(f"  Error with {source_info['name']}: {str(e)}")
+        source_keys = list(self.academic_sources)
+        
+        if concurrent:
+            with ThreadPoolExecutor(max_workers=len(source_keys)) as executor:
+                futures = [
+                    executor.submit(self.query_source, source_key, query, max_results_per_source)
+                    for source_key in source_keys
+                ]
+                # Collect in source order so deduplication keeps the same papers
+                for future in futures:
+                    all_papers.extend(future.result())
+        else:
+            for source_key in source_keys:
+                all_papers.extend(self.query_source(source_key, query, max_results_per_source))
         
         # Remove duplicates based on title similarity
         unique_papers = self.deduplicate_papers(all_papers)
@@ -426,33 +884,343 @@ class EnhancedScholarlyArticleScraper:
         return unique_papers
     
     def deduplicate_papers(self, papers):
-        """Remove duplicate papers based on title similarity."""
+        """Remove duplicate papers by DOI/arXiv ID and title similarity."""
+        with self.metrics.timer('dedup_seconds'):
+            unique_papers = PaperDeduplicator().deduplicate(papers)
+        self.metrics.inc('duplicates_removed', len(papers) - len(unique_papers))
+        return unique_papers
+    
+    def save_query_summary(self, query_path, query, papers, downloaded_count, timestamp=None, category=None,
+                           total_found=None):
+        """Save the search results and download count for one query."""
+        with self.metrics.timer('metadata_write_seconds', kind='summary'):
+            self.metadata_store.save_query_summary(query_path, query, papers, downloaded_count, timestamp, category,
+                                                   total_found)
+    
+    def write_metrics(self, stage):
+        """Append a metrics snapshot to metrics.jsonl and rewrite metrics.prom in the output folder."""
+        if self.response_cache is not None:
+            self.metrics.set('cache_hits', self.response_cache.hits)
+            self.metrics.set('cache_misses', self.response_cache.misses)
+            self.metrics.set('cache_revalidated', self.response_cache.revalidated)
+        for name, value in self.download_pool.stats().items():
+            self.metrics.set(f'download_pool_{name}', value)
+        if self.text_extractor is not None:
+            for name, value in self.text_extractor.stats().items():
+                self.metrics.set(f'text_extraction_{name}', value)
+        
+        # Sharded workers each keep their own files
+        suffix = '' if self.worker_id is None else f'-{self.worker_id}'
+        try:
+            self.metrics.write_jsonl(os.path.join(self.base_path, f'metrics{suffix}.jsonl'), stage=stage)
+            self.metrics.write_prometheus(os.path.join(self.base_path, f'metrics{suffix}.prom'))
+        except OSError as e:
+            print(f"  Error writing metrics: {str(e)}")
+    
+    def _finish_queries(self, pending_queries, wait=False):
+        """Write summaries for queries whose downloads are done; return the PDFs downloaded."""
+        downloaded_total = 0
+        
+        for pending in list(pending_queries):
+            if not wait and not all(future.done() for future in pending['downloads']):
+                continue
+            
+            downloaded_count = 0
+            for future in pending['downloads']:
+                try:
+                    if future.result():
+                        downloaded_count += 1
+                except Exception as e:
+                    print(f"      Error downloading PDF: {str(e)}")
+            
+            print(f"  Downloaded {downloaded_count} papers for query: {pending['query']}")
+            self.save_query_summary(pending['query_path'], pending['query'], pending['papers'],
+                                    downloaded_count + pending['previously_downloaded'],
+                                    pending['timestamp'], pending['category'], pending['total_found'])
+            self.journal.record_query(pending['category'], pending['query_index'], pending['query'])
+            
+            downloaded_total += downloaded_count
+            pending_queries.remove(pending)
+        
+        return downloaded_total
+    
+    def _queue_paper(self, paper, category_name, query, query_path, label, submit=None):
+        """
+        Save a paper into a query folder and return a Future for its PDF path.
+        Papers already in the corpus are hard-linked instead of fetched again.
+        `submit(paper, path)` schedules the download (the thread pool by default).
+        """
+        entry = self.corpus_index.lookup(paper)
+        
+        if entry is not None and entry['metadata_path'] and os.path.exists(entry['metadata_path']):
+            existing_metadata = entry['metadata_path']
+        else:
+            existing_metadata = None
+        
+        inflight = self._inflight_downloads.get(entry['id']) if entry else None
+        if inflight is not None:
+            print(f"{label} Already downloading: {paper['title'][:50]}...")
+            if existing_metadata:
+                link_file(existing_metadata, query_path)
+            linked = Future()
+            
+            def link_when_done(f):
+                pdf_path = None if f.exception() else f.result()
+                linked.set_result(pdf_path and (link_file(pdf_path, query_path) or pdf_path))
+            
+            inflight.add_done_callback(link_when_done)
+            return linked
+        
+        if entry is not None and self.corpus_index.existing_pdf(entry):
+            print(f"{label} Already in corpus: {paper['title'][:50]}...")
+            if existing_metadata:
+                link_file(existing_metadata, query_path)
+            linked = Future()
+            linked.set_result(self.corpus_index.link_pdf(entry, query_path))
+            return linked
+        
+        print(f"{label} {paper['title'][:50]}...")
+        
+        # Save metadata
+        metadata_path = self.save_paper_metadata(paper, query_path, category_name)
+        paper_id = entry['id'] if entry else self.corpus_index.add(paper, category_name, query, metadata_path)
+        
+        if not paper.get('pdf_url'):
+            return None
+        
+        submit = submit or self.download_pool.submit
+        
+        # Another worker process is already downloading this paper: link its PDF when it is done
+        if not self.corpus_index.claim_download(paper_id, self.download_owner):
+            print(f"{label} Downloading in another worker: {paper['title'][:50]}...")
+            
+            def link_when_saved():
+                pdf_path = self.corpus_index.wait_for_pdf(paper_id)
+                if pdf_path and os.path.exists(pdf_path):
+                    return link_file(pdf_path, query_path) or pdf_path
+                if self.corpus_index.claim_download(paper_id, self.download_owner):
+                    # That worker failed or died: download the PDF here after all
+                    return self._start_download(paper, paper_id, query_path, submit).result()
+                return None
+            
+            return self._claim_waiters.submit(link_when_saved)
+        
+        # Try to download PDF in the background
+        return self._start_download(paper, paper_id, query_path, submit)
+    
+    def _start_download(self, paper, paper_id, query_path, submit):
+        """Download a paper whose claim this process holds, and record the outcome in the indexes."""
+        try:
+            future = submit(paper, query_path)
+        except Exception:
+            self.corpus_index.release_download(paper_id, self.download_owner)
+            raise
+        self._inflight_downloads[paper_id] = future
+        
+        def on_done(f):
+            self._inflight_downloads.pop(paper_id, None)
+            if not f.cancelled() and not f.exception() and f.result():
+                self.corpus_index.set_pdf(paper_id, f.result())
+                self.search_index.set_pdf(paper, f.result())
+                if self.text_extractor is not None:
+                    self._extract_text(paper, f.result())
+            else:
+                self.corpus_index.release_download(paper_id, self.download_owner)
+        
+        future.add_done_callback(on_done)
+        return future
+    
+    def _extract_text(self, paper, pdf_path):
+        """Queue a downloaded PDF for text extraction and index the text once it is ready."""
+        def index_text(pdf_path, text_path):
+            with open(text_path, 'r', encoding='utf-8') as f:
+                self.search_index.set_pdf(paper, pdf_path, f.read())
+        
+        # The blob store already knows the PDF's hash, so it is not read again here
+        digest = self.blob_store.lookup_url(paper['pdf_url'])
+        self.text_extractor.submit(pdf_path, digest, index_text)
+    
+    def wait_for_text_extraction(self):
+        """Wait until the text of every downloaded PDF is extracted and indexed."""
+        if self.text_extractor is None:
+            return
+        with self.metrics.timer('text_extraction_wait_seconds'):
+            self.text_extractor.wait()
+    
+    def _queue_journaled_paper(self, paper, category_name, query_index, query, query_path, label, submit=None):
+        """Queue a paper like _queue_paper and journal it once its PDF step is done."""
+        future = self._queue_paper(paper, category_name, query, query_path, label, submit)
+        if future is None:
+            self.journal.record_paper(category_name, query_index, paper['title'])
+            return None
+        
+        future.add_done_callback(
+            lambda f: self.journal.record_paper(
+                category_name, query_index, paper['title'], None if f.exception() else f.result()))
+        return future
+    
+    def stream_source(self, source_key, query, max_results=5):
+        """Yield a source's papers, as they are parsed when the source supports it."""
+        source_info = self.academic_sources[source_key]
+        if 'stream_function' not in source_info:
+            yield from self.query_source(source_key, query, max_results)
+            return
+        
+        count = 0
+        start = time.perf_counter()
+        try:
+            for paper in source_info['stream_function'](query, max_results):
+                count += 1
+                yield paper
+            print(f"  {source_info['name']}: Found {count} papers")
+        except Exception as e:
+            print(f"  Error with {source_info['name']}: {str(e)}")
+        finally:
+            self.metrics.observe('search_seconds', time.perf_counter() - start, source=source_key)
+            self.metrics.inc('papers_found', count, source=source_key)
+    
+    def stream_query(self, query, category_name, query_index, query_path, max_papers, max_results_per_source=5):
+        """
+        Run one query as a streaming pipeline: search -> normalize -> dedup ->
+        select -> metadata write and PDF download. Downloads for the first hits
+        start while slower sources are still responding.
+        Returns the unique papers found and the download futures.
+        """
+        print(f"\nStreaming search for: '{query}'")
+        print("-" * 50)
+        
+        deduplicator = PaperDeduplicator()
         unique_papers = []
+        selected = []
+        queued = []
+        downloads = []
         
-        for paper in papers:
-            is_duplicate = False
-            paper_title = paper['title'].lower().strip()
+        producers = [
+            (lambda source_key=source_key: self.stream_source(source_key, query, max_results_per_source))
+            for source_key in self.academic_sources
+        ]
+        
+        def normalize(paper):
+            title = ' '.join((paper.get('title') or '').split())
+            if not title:
+                return None
+            paper['title'] = title
+            paper.setdefault('query', query)
+            return paper
+        
+        def deduplicate(paper):
+            if not deduplicator.add(paper):
+                return None
+            unique_papers.append(paper)
+            return paper
+        
+        def select(paper):
+            if len(selected) >= max_papers:
+                return None
+            selected.append(paper)
+            return paper
+        
+        def save_and_download(paper):
+            os.makedirs(query_path, exist_ok=True)
+            queued.append(paper)
+            future = self._queue_journaled_paper(paper, category_name, query_index, query, query_path,
+                                                 f"  [{len(queued)}/{max_papers}]")
+            if future is not None:
+                downloads.append(future)
+        
+        run_pipeline(producers, [normalize, deduplicate, select], save_and_download)
+        
+        print(f"\nTotal unique papers found: {len(unique_papers)}")
+        return unique_papers, downloads
+    
+    def rank_papers(self, query, papers, category_name=None):
+        """Order papers by relevance to the query (BM25, citations, recency), best first."""
+        if category_name not in self.rankers:
+            self.rankers[category_name] = RelevanceRanker()
+        with self.metrics.timer('rank_seconds'):
+            return self.rankers[category_name].rank(query, papers)
+    
+    def _start_query(self, category_name, category_path, query_index, query, total_queries, max_papers):
+        """
+        Search one query and queue its downloads. Returns the pending entry that
+        _finish_queries completes, or None if there is nothing left to wait for.
+        """
+        if self.journal.is_query_finished(category_name, query_index):
+            print(f"\n[{query_index}/{total_queries}] Skipping finished query: {query}")
+            return None
+        
+        print(f"\n[{query_index}/{total_queries}] Processing query: {query}")
+        
+        # Create query subfolder
+        query_path = self._query_path(category_path, query_index, query)
+        
+        # Search all sources, reusing results journaled by an interrupted run
+        timestamp = datetime.now().isoformat()
+        papers = self.journal.get_search_results(category_name, query_index)
+        total_found = self.journal.get_total_found(category_name, query_index)
+        downloads = []
+        previously_downloaded = 0
+        
+        # Only the papers picked for download are journaled; a resumed run needs no more
+        if papers is None and self.streaming:
+            # Hits flow straight into metadata writes and downloads
+            papers, downloads = self.stream_query(query, category_name, query_index, query_path, max_papers)
+            total_found = len(papers)
+            self.journal.record_search(category_name, query_index, query, papers[:max_papers], total_found)
+        else:
+            if papers is None:
+                papers = self.search_all_sources(query, max_results_per_source=5)
+                papers = self.rank_papers(query, papers, category_name)
+                total_found = len(papers)
+                self.journal.record_search(category_name, query_index, query, papers[:max_papers], total_found)
             
-            for existing in unique_papers:
-                existing_title = existing['title'].lower().strip()
-                
-                # Simple similarity check
-                if abs(len(paper_title) - len(existing_title)) / max(len(paper_title), 1) < 0.2:
-                    # Check for significant word overlap
-                    paper_words = set(paper_title.split())
-                    existing_words = set(existing_title.split())
-                    
-                    overlap = len(paper_words.intersection(existing_words))
-                    total_words = len(paper_words.union(existing_words))
-                    
-                    if overlap / max(total_words, 1) > 0.7:
-                        is_duplicate = True
-                        break
+            if papers and not os.path.exists(query_path):
+                os.makedirs(query_path)
+            
+            # Queue the best-ranked papers for download
+            papers_to_download = papers[:max_papers]
             
-            if not is_duplicate:
-                unique_papers.append(paper)
+            for j, paper in enumerate(papers_to_download, 1):
+                if self.journal.is_paper_finished(category_name, query_index, paper['title']):
+                    if self.journal.get_paper_file(category_name, query_index, paper['title']):
+                        previously_downloaded += 1
+                    continue
+                
+                future = self._queue_journaled_paper(paper, category_name, query_index, query, query_path,
+                                                     f"  [{j}/{len(papers_to_download)}]")
+                if future is not None:
+                    downloads.append(future)
         
-        return unique_papers
+        if not papers:
+            print("No papers found for this query.")
+            self.journal.record_query(category_name, query_index, query)
+            return None
+        
+        return {
+            'category': category_name,
+            'query_index': query_index,
+            'query': query,
+            'query_path': query_path,
+            'papers': papers,
+            'total_found': total_found,
+            'timestamp': timestamp,
+            'downloads': downloads,
+            'previously_downloaded': previously_downloaded
+        }
+    
+    def search_and_download_query(self, category_name, query_index, query, max_papers_per_query=3):
+        """Search and download papers for one query of a category (one work item of a sharded run)."""
+        category_path = os.path.join(self.base_path, category_name)
+        os.makedirs(category_path, exist_ok=True)
+        
+        total_queries = len(self.search_categories.get(category_name, [])) or query_index
+        pending = self._start_query(category_name, category_path, query_index, query,
+                                    total_queries, max_papers_per_query)
+        total_downloads = self._finish_queries([pending], wait=True) if pending else 0
+        self.wait_for_text_extraction()
+        self.metadata_store.flush()
+        self.search_index.flush()
+        return total_downloads
     
     def search_and_download_category(self, category_name, max_papers_per_query=3):
         """Search and download papers for a specific category."""
@@ -473,67 +1241,168 @@ class EnhancedScholarlyArticleScraper:
         print(f"Queries to process: {len(queries)}")
         print('='*60)
         
+        # Queries whose PDFs are still downloading while the next searches run
+        pending_queries = []
+        
+        for i, query in enumerate(queries, 1):
+            pending = self._start_query(category_name, category_path, i, query, len(queries), max_papers_per_query)
+            if pending is None:
+                continue
+            
+            pending_queries.append(pending)
+            total_downloads += self._finish_queries(pending_queries)
+            print(f"  {self.download_pool.format_stats()}")
+        
+        # Wait for the remaining downloads of this category
+        total_downloads += self._finish_queries(pending_queries, wait=True)
+        self.wait_for_text_extraction()
+        self.metadata_store.flush()
+        self.search_index.flush()
+        if self.columnar_exporter is not None:
+            self.columnar_exporter.flush()
+        print(f"  {self.download_pool.format_stats()}")
+        self.write_metrics(category_name)
+        
+        return total_downloads
+    
+    def _harvest_source(self, source_key, query, max_results, incremental=False):
+        """
+        Fetch one query's records from a source's bulk function. In incremental
+        mode only records newer than the last successful harvest are requested,
+        and the harvest time is moved forward once the source has been read fully,
+        not when `max_results` cut the harvest short.
+        """
+        source_info = self.academic_sources[source_key]
+        since = None
+        if incremental:
+            last_harvest = self.harvest_state.last_harvest(source_key, query)
+            since = last_harvest - HARVEST_OVERLAP if last_harvest else None
+        
+        started_at = datetime.now(timezone.utc)
+        papers = []
+        try:
+            with self.metrics.timer('search_seconds', source=source_key, mode='bulk'):
+                # One record past the limit tells a cut-off harvest from one that read everything
+                for paper in source_info['bulk_function'](query, max_results + 1, since=since):
+                    papers.append(paper)
+                    if len(papers) > max_results:
+                        break
+        except Exception as e:
+            # Keep the old harvest time so the next run asks for this window again
+            print(f"  Error with {source_info['name']}: {str(e)}")
+        else:
+            if len(papers) > max_results:
+                # Records past the limit were never fetched, so the window stays open for them
+                papers = papers[:max_results]
+                print(f"  {source_info['name']}: stopped at {max_results} records, harvest time not moved")
+            else:
+                self.harvest_state.record(source_key, query, started_at, len(papers))
+        
+        self.metrics.inc('papers_found', len(papers), source=source_key)
+        window = f" since {since:%Y-%m-%d %H:%M}" if since else ''
+        print(f"  {source_info['name']}: {len(papers)} records{window}")
+        return papers
+    
+    def harvest_category(self, category_name, max_results_per_query=1000,
+                         sources=('arxiv', 'semantic_scholar', 'crossref'), incremental=False):
+        """
+        Harvest metadata (no PDFs) for a whole category with the bulk endpoints:
+        ArXiv paging, Semantic Scholar bulk search and CrossRef deep paging fetch
+        up to 1000 records per request, and papers from other sources are
+        completed with one Semantic Scholar batch lookup. With `incremental`,
+        each (source, query) only asks for records newer than its last harvest
+        and the new ones are merged into the query's existing results.
+        Returns the number of new papers saved.
+        """
+        if category_name not in self.search_categories:
+            print(f"Category '{category_name}' not found!")
+            return 0
+        
+        queries = self.search_categories[category_name]
+        category_path = os.path.join(self.base_path, category_name)
+        os.makedirs(category_path, exist_ok=True)
+        
+        print(f"\n{'='*60}")
+        print(f"Harvesting category: {category_name.replace('_', ' ').title()}")
+        print(f"Queries to process: {len(queries)}")
+        print('='*60)
+        
+        # One deduplicator for the whole category, so overlapping queries keep a paper once
+        deduplicator = PaperDeduplicator()
+        total_saved = 0
+        
         for i, query in enumerate(queries, 1):
-            print(f"\n[{i}/{len(queries)}] Processing query: {query}")
+            print(f"\n[{i}/{len(queries)}] Harvesting query: {query}")
+            query_path = self._query_path(category_path, i, query)
             
-            # Search all sources
-            papers = self.search_all_sources(query, max_results_per_source=5)
+            # Results of earlier harvests stay in the summary, and the new ones are checked against them
+            previous_papers = self.metadata_store.query_papers(query_path) if incremental else []
+            deduplicator.deduplicate(previous_papers)
             
-            if not papers:
-                print("No papers found for this query.")
-                continue
+            papers = []
+            for source_key in sources:
+                papers.extend(self._harvest_source(source_key, query, max_results_per_query, incremental))
             
-            # Create query subfolder
-            clean_query = re.sub(r'[\\/*?:"<>|]', '_', query)
-            query_path = os.path.join(category_path, f"{i:02d}_{clean_query[:30]}")
-            if not os.path.exists(query_path):
-                os.makedirs(query_path)
+            with self.metrics.timer('dedup_seconds'):
+                new_papers = deduplicator.deduplicate(papers)
+            self.metrics.inc('duplicates_removed', len(papers) - len(new_papers))
             
-            # Download top papers
-            papers_to_download = papers[:max_papers_per_query]
-            downloaded_count = 0
+            try:
+                enriched = self.enrich_papers(new_papers)
+                if enriched:
+                    print(f"  Completed {enriched} records from Semantic Scholar")
+            except Exception as e:
+                print(f"  Error with Semantic Scholar batch lookup: {str(e)}")
             
-            for j, paper in enumerate(papers_to_download, 1):
-                print(f"  [{j}/{len(papers_to_download)}] {paper['title'][:50]}...")
-                
-                # Save metadata
-                self.save_paper_metadata(paper, query_path)
-                
-                # Try to download PDF
-                if self.download_pdf(paper, query_path):
-                    downloaded_count += 1
-                    total_downloads += 1
-                
-                # Brief delay between downloads
-                time.sleep(random.uniform(1, 3))
-            
-            print(f"  Downloaded {downloaded_count} papers for this query")
-            
-            # Save query summary
-            summary = {
-                'query': query,
-                'timestamp': datetime.now().isoformat(),
-                'total_found': len(papers),
-                'downloaded': downloaded_count,
-                'papers': papers
-            }
+            # Summary and metadata list the most relevant papers first
+            new_papers = self.rank_papers(query, new_papers, category_name)
+            
+            if not new_papers:
+                if not papers:
+                    print("No new papers found for this query." if previous_papers else "No papers found for this query.")
+                else:
+                    print("All papers were found by earlier queries or harvests.")
+                continue
             
-            summary_file = os.path.join(query_path, 'query_summary.json')
-            with open(summary_file, 'w', encoding='utf-8') as f:
-                json.dump(summary, f, indent=2, ensure_ascii=False)
+            os.makedirs(query_path, exist_ok=True)
             
-            # Delay between queries
-            time.sleep(random.uniform(3, 6))
+            # Papers already in the corpus keep their first metadata file
+            saved = 0
+            for paper in new_papers:
+                if self.corpus_index.lookup(paper) is not None:
+                    continue
+                metadata_path = self.save_paper_metadata(paper, query_path, category_name)
+                self.corpus_index.add(paper, category_name, query, metadata_path)
+                saved += 1
+            
+            self.save_query_summary(query_path, query, previous_papers + new_papers, 0, category=category_name)
+            print(f"  Saved {saved} new of {len(new_papers)} unique papers")
+            total_saved += saved
         
-        return total_downloads
+        self.metadata_store.flush()
+        self.search_index.flush()
+        if self.columnar_exporter is not None:
+            self.columnar_exporter.flush()
+        self.write_metrics(category_name)
+        
+        return total_saved
 
 def main():
     """Main function to run the scholarly article scraper."""
-    scraper = EnhancedScholarlyArticleScraper()
-    
     print("Enhanced Scholarly Article Scraper")
     print("=" * 50)
     
+    use_async = input("\nUse the async engine? (y/N): ").strip().lower() == 'y'
+    if use_async:
+        try:
+            from async_scraper import SyncScholarlyScraper
+            scraper = SyncScholarlyScraper()
+        except ImportError as e:
+            print(f"{e}\nUsing the threaded engine instead.")
+            use_async = False
+    if not use_async:
+        scraper = EnhancedScholarlyArticleScraper()
+    
     # Show available categories
     categories = list(scraper.search_categories.keys())
     print(f"\nAvailable categories ({len(categories)}):")
@@ -559,25 +1428,68 @@ def main():
         max_papers = input("\nMax papers per query (default: 3): ").strip()
         max_papers = int(max_papers) if max_papers.isdigit() else 3
         
+        # Bulk harvesting saves metadata for whole categories without downloading PDFs
+        if not use_async and input("\nBulk harvest metadata instead of searching? (y/N): ").strip().lower() == 'y':
+            incremental = input("Only fetch records newer than the last harvest? (y/N): ").strip().lower() == 'y'
+            total_saved = 0
+            for category in selected_categories:
+                total_saved += scraper.harvest_category(category, incremental=incremental)
+            print(f"\n{'='*60}")
+            print(f"Harvest complete! New papers saved: {total_saved}")
+            print(f"Files saved to: {scraper.base_path}")
+            print(f"\nTime spent per stage:\n{scraper.metrics.format_summary()}")
+            return
+        
+        # Several categories can be spread across worker processes
+        workers = 1
+        if len(selected_categories) > 1 and not use_async:
+            workers = input("\nWorker processes (default: 1): ").strip()
+            workers = int(workers) if workers.isdigit() and int(workers) > 0 else 1
+        
         # Start processing
         total_papers = 0
-        for category in selected_categories:
-            papers_downloaded = scraper.search_and_download_category(category, max_papers)
-            total_papers += papers_downloaded
-            
-            if len(selected_categories) > 1:
-                print(f"\nCompleted {category}: {papers_downloaded} papers downloaded")
-                time.sleep(5)  # Longer delay between categories
+        if workers > 1:
+            from sharding import run_sharded
+            results = run_sharded(scraper.search_categories, selected_categories, max_papers,
+                                  workers, scraper.base_path)
+            total_papers = sum(results.values())
+        elif use_async:
+            # Categories run side by side on one event loop
+            results = scraper.search_and_download_categories(selected_categories, max_papers)
+            total_papers = sum(results.values())
+        else:
+            for category in selected_categories:
+                papers_downloaded = scraper.search_and_download_category(category, max_papers)
+                total_papers += papers_downloaded
+                
+                if len(selected_categories) > 1:
+                    print(f"\nCompleted {category}: {papers_downloaded} papers downloaded")
         
         print(f"\n{'='*60}")
         print(f"Scraping complete!")
         print(f"Total papers downloaded: {total_papers}")
         print(f"Files saved to: {scraper.base_path}")
         
+        print(f"\nTime spent per stage:\n{scraper.metrics.format_summary()}")
+        
+        # The run finished, so the next one starts fresh
+        scraper.journal.clear()
+        
     except KeyboardInterrupt:
         print("\nScraping interrupted by user.")
     except Exception as e:
         print(f"\nError: {str(e)}")
+    finally:
+        scraper.write_metrics('run')
+        scraper.download_pool.shutdown(wait=False)
+        # Papers still queued or downloading can be claimed again by the next run
+        scraper.corpus_index.release_claims(scraper.download_owner)
+        if scraper.text_extractor is not None:
+            scraper.text_extractor.shutdown()
+        scraper.metadata_store.close()
+        scraper.search_index.close()
+        if scraper.columnar_exporter is not None:
+            scraper.columnar_exporter.close()
 
 if __name__ == "__main__":
     main()
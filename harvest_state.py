@@ -0,0 +1,61 @@
+"""
+Incremental harvest state for the scholarly article scraper.
+Remembers when each (source, query) pair was last harvested successfully,
+so the next harvest only asks the source for records newer than that.
+"""
+
+import sqlite3
+import threading
+from datetime import datetime, timezone
+
+
+class HarvestState:
+    """SQLite table of the last successful harvest per (source, query)."""
+
+    def __init__(self, state_file):
+        self.state_file = state_file
+        self.lock = threading.Lock()
+        # Sharded runs open the state from several processes at once
+        self.db = sqlite3.connect(state_file, timeout=30, check_same_thread=False)
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS harvests (
+                source TEXT NOT NULL,
+                query TEXT NOT NULL,
+                harvested_at TEXT NOT NULL,
+                records INTEGER,
+                PRIMARY KEY (source, query)
+            );
+        """)
+        self.db.commit()
+
+    def last_harvest(self, source, query):
+        """Return when `query` was last harvested from `source` (UTC), or None."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT harvested_at FROM harvests WHERE source = ? AND query = ?", (source, query)
+            ).fetchone()
+        return datetime.fromisoformat(row[0]) if row else None
+
+    def record(self, source, query, harvested_at=None, records=None):
+        """Remember a successful harvest; `harvested_at` is when its first request was sent."""
+        harvested_at = harvested_at or datetime.now(timezone.utc)
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO harvests (source, query, harvested_at, records) VALUES (?, ?, ?, ?)",
+                (source, query, harvested_at.isoformat(), records)
+            )
+            self.db.commit()
+
+    def clear(self, source=None):
+        """Forget the harvest times of one source, or of every source."""
+        with self.lock:
+            if source is None:
+                self.db.execute("DELETE FROM harvests")
+            else:
+                self.db.execute("DELETE FROM harvests WHERE source = ?", (source,))
+            self.db.commit()
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,204 @@
+"""
+HTML parser backends for the Google Scholar and IEEE Xplore scrapers.
+Each backend pulls the same raw fields out of a results page; the scraper
+turns them into Papers. lxml (XPath) is the default, selectolax is
+used when asked for and installed, and BeautifulSoup remains as a fallback
+that only builds the result containers. lxml builds the whole page: in C
+that is cheaper than limiting it to the containers with iterparse.
+"""
+
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree as lxml_etree, html as lxml_html
+except ImportError:
+    lxml_html = None
+
+try:
+    from selectolax.parser import HTMLParser as SelectolaxHTMLParser
+except ImportError:
+    SelectolaxHTMLParser = None
+
+
+def _has_class(name):
+    return f"contains(concat(' ', normalize-space(@class), ' '), ' {name} ')"
+
+
+def _class_token(name):
+    # While parsing, SoupStrainer sees the raw class attribute, so match one token of it
+    def matches(value):
+        if not value:
+            return False
+        tokens = value.split() if isinstance(value, str) else value
+        return name in tokens
+    return matches
+
+
+def _scholar_fields(title, url, authors_text, abstract, pdf_link):
+    return {'title': title, 'url': url, 'authors_text': authors_text, 'abstract': abstract, 'pdf_link': pdf_link}
+
+
+def _ieee_fields(title, href, authors, abstract):
+    return {'title': title, 'href': href, 'authors': authors, 'abstract': abstract}
+
+
+class BeautifulSoupParser:
+    """BeautifulSoup with html.parser, restricted to the result containers."""
+
+    name = 'bs4'
+
+    def _text(self, elem):
+        return elem.get_text(strip=True) if elem else ''
+
+    def google_scholar_results(self, html):
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer('div', class_=_class_token('gs_r')))
+        results = []
+        for result in soup.select('.gs_r.gs_or.gs_scl'):
+            title_elem = result.select_one('h3.gs_rt a')
+            if not title_elem:
+                continue
+            pdf_elem = result.select_one('a[href$=".pdf"]')
+            results.append(_scholar_fields(
+                title_elem.get_text(strip=True), title_elem.get('href', ''),
+                self._text(result.select_one('.gs_a')), self._text(result.select_one('.gs_rs')),
+                pdf_elem.get('href') if pdf_elem else None
+            ))
+        return results
+
+    def ieee_results(self, html, max_results):
+        soup = BeautifulSoup(html, 'html.parser', parse_only=SoupStrainer(class_=_class_token('List-results-items')))
+        results = []
+        for result in soup.select('.List-results-items')[:max_results]:
+            title_elem = result.select_one('h2 a')
+            if not title_elem:
+                continue
+            results.append(_ieee_fields(
+                title_elem.get_text(strip=True), title_elem.get('href', ''),
+                self._text(result.select_one('.author')), self._text(result.select_one('.description'))
+            ))
+        return results
+
+
+class LxmlParser:
+    """lxml's C HTML parser with precompiled XPath queries."""
+
+    name = 'lxml'
+
+    def __init__(self):
+        xpath = lxml_etree.XPath
+        self.scholar_results = xpath(f"//div[{_has_class('gs_r')} and {_has_class('gs_or')} and {_has_class('gs_scl')}]")
+        self.scholar_title = xpath(f".//h3[{_has_class('gs_rt')}]//a")
+        self.scholar_authors = xpath(f".//*[{_has_class('gs_a')}]")
+        self.scholar_abstract = xpath(f".//*[{_has_class('gs_rs')}]")
+        self.scholar_pdf = xpath(".//a[substring(@href, string-length(@href) - 3) = '.pdf']")
+        self.ieee_results_xpath = xpath(f"//*[{_has_class('List-results-items')}]")
+        self.ieee_title = xpath(".//h2//a")
+        self.ieee_authors = xpath(f".//*[{_has_class('author')}]")
+        self.ieee_abstract = xpath(f".//*[{_has_class('description')}]")
+        self.text_nodes = xpath(".//text()[not(ancestor::script) and not(ancestor::style)]")
+
+    def _text(self, elems):
+        # Same as BeautifulSoup's get_text(strip=True): every text node stripped, then joined
+        if not elems:
+            return ''
+        return ''.join(text.strip() for text in self.text_nodes(elems[0]))
+
+    def _tree(self, html):
+        if not html.strip():
+            return None
+        try:
+            return lxml_html.fromstring(html)
+        except ValueError:
+            # lxml refuses str input that carries an XML encoding declaration
+            return lxml_html.fromstring(html.encode('utf-8'))
+
+    def google_scholar_results(self, html):
+        tree = self._tree(html)
+        results = []
+        for result in self.scholar_results(tree) if tree is not None else []:
+            title_elems = self.scholar_title(result)
+            if not title_elems:
+                continue
+            pdf_elems = self.scholar_pdf(result)
+            results.append(_scholar_fields(
+                self._text(title_elems), title_elems[0].get('href', ''),
+                self._text(self.scholar_authors(result)), self._text(self.scholar_abstract(result)),
+                pdf_elems[0].get('href') if pdf_elems else None
+            ))
+        return results
+
+    def ieee_results(self, html, max_results):
+        tree = self._tree(html)
+        results = []
+        for result in self.ieee_results_xpath(tree)[:max_results] if tree is not None else []:
+            title_elems = self.ieee_title(result)
+            if not title_elems:
+                continue
+            results.append(_ieee_fields(
+                self._text(title_elems), title_elems[0].get('href', ''),
+                self._text(self.ieee_authors(result)), self._text(self.ieee_abstract(result))
+            ))
+        return results
+
+
+class SelectolaxParser:
+    """selectolax (Modest engine) with CSS selectors."""
+
+    name = 'selectolax'
+
+    def _text(self, node):
+        return node.text(deep=True, separator='', strip=True) if node else ''
+
+    def google_scholar_results(self, html):
+        results = []
+        for result in SelectolaxHTMLParser(html).css('.gs_r.gs_or.gs_scl'):
+            title_elem = result.css_first('h3.gs_rt a')
+            if not title_elem:
+                continue
+            pdf_elem = result.css_first('a[href$=".pdf"]')
+            results.append(_scholar_fields(
+                self._text(title_elem), title_elem.attributes.get('href') or '',
+                self._text(result.css_first('.gs_a')), self._text(result.css_first('.gs_rs')),
+                pdf_elem.attributes.get('href') if pdf_elem else None
+            ))
+        return results
+
+    def ieee_results(self, html, max_results):
+        results = []
+        for result in SelectolaxHTMLParser(html).css('.List-results-items')[:max_results]:
+            title_elem = result.css_first('h2 a')
+            if not title_elem:
+                continue
+            results.append(_ieee_fields(
+                self._text(title_elem), title_elem.attributes.get('href') or '',
+                self._text(result.css_first('.author')), self._text(result.css_first('.description'))
+            ))
+        return results
+
+
+HTML_PARSERS = {
+    'bs4': BeautifulSoupParser,
+    'lxml': LxmlParser,
+    'selectolax': SelectolaxParser
+}
+
+
+def available_html_parsers():
+    """Names of the backends whose libraries are installed."""
+    names = ['bs4']
+    if lxml_html is not None:
+        names.append('lxml')
+    if SelectolaxHTMLParser is not None:
+        names.append('selectolax')
+    return names
+
+
+def create_html_parser(name='auto'):
+    """Build the HTML parser backend `name` ('auto', 'lxml', 'selectolax' or 'bs4')."""
+    if name == 'auto':
+        name = 'lxml' if lxml_html is not None else 'selectolax' if SelectolaxHTMLParser is not None else 'bs4'
+    if name not in HTML_PARSERS:
+        raise ValueError(f"Unknown HTML parser: {name}")
+    if name not in available_html_parsers():
+        raise ImportError(f"HTML parser '{name}' is not installed: pip install {name}")
+    return HTML_PARSERS[name]()
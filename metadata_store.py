@@ -0,0 +1,238 @@
+"""
+Metadata storage backends for the scholarly article scraper.
+The JSON backend writes the original per-paper `*_metadata.json` and
+`query_summary.json` files; the SQLite backend keeps everything in one
+indexed database and can export back to the JSON layout.
+"""
+
+import os
+import re
+import sqlite3
+import threading
+from datetime import datetime
+
+from dedup import extract_arxiv_id, extract_doi, title_hash
+from paper import Paper, dumps, loads, write_json
+
+
+def metadata_filename(title):
+    """File name used for a paper's metadata in the JSON layout."""
+    clean_title = re.sub(r'[\\/*?:"<>|]', '_', title)
+    return f"{clean_title[:80]}_metadata.json"
+
+
+class JsonMetadataStore:
+    """One JSON file per paper plus a query_summary.json per query folder."""
+
+    def save_paper(self, paper, save_path, category=None):
+        """Write a paper's metadata file and return its path."""
+        metadata_file = os.path.join(save_path, metadata_filename(paper['title']))
+        write_json(metadata_file, paper)
+        return metadata_file
+
+    def save_query_summary(self, query_path, query, papers, downloaded_count, timestamp=None, category=None,
+                           total_found=None):
+        """Write the search results and download count for one query."""
+        summary = {
+            'query': query,
+            'timestamp': timestamp or datetime.now().isoformat(),
+            'total_found': len(papers) if total_found is None else total_found,
+            'downloaded': downloaded_count,
+            'papers': papers
+        }
+
+        summary_file = os.path.join(query_path, 'query_summary.json')
+        write_json(summary_file, summary)
+        return summary_file
+
+    def query_papers(self, query_path):
+        """Return the papers of a query's summary, or [] if it has none yet."""
+        summary_file = os.path.join(query_path, 'query_summary.json')
+        if not os.path.exists(summary_file):
+            return []
+        with open(summary_file, 'rb') as f:
+            return [Paper.from_dict(paper) for paper in loads(f.read()).get('papers', [])]
+
+    def flush(self):
+        pass
+
+    def close(self):
+        pass
+
+
+class SQLiteMetadataStore:
+    """Indexed SQLite metadata store with batched, transactional writes."""
+
+    def __init__(self, db_file, batch_size=200):
+        self.db_file = db_file
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending_papers = []
+        self.pending_positions = []
+
+        self.db = sqlite3.connect(db_file, timeout=30, check_same_thread=False)
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS papers (
+                id INTEGER PRIMARY KEY,
+                query_path TEXT NOT NULL,
+                title_hash TEXT NOT NULL,
+                title TEXT,
+                doi TEXT,
+                arxiv_id TEXT,
+                source TEXT,
+                year INTEGER,
+                category TEXT,
+                query TEXT,
+                position INTEGER,
+                saved INTEGER NOT NULL DEFAULT 0,
+                data TEXT NOT NULL,
+                UNIQUE (query_path, title_hash)
+            );
+            CREATE INDEX IF NOT EXISTS papers_doi ON papers (doi);
+            CREATE INDEX IF NOT EXISTS papers_title_hash ON papers (title_hash);
+            CREATE INDEX IF NOT EXISTS papers_source ON papers (source);
+            CREATE INDEX IF NOT EXISTS papers_year ON papers (year);
+            CREATE INDEX IF NOT EXISTS papers_query ON papers (query);
+            CREATE TABLE IF NOT EXISTS query_summaries (
+                query_path TEXT PRIMARY KEY,
+                category TEXT,
+                query TEXT,
+                timestamp TEXT,
+                total_found INTEGER,
+                downloaded INTEGER
+            );
+        """)
+        self.db.commit()
+
+    def _paper_row(self, paper, query_path, category, position, saved):
+        year = paper.get('year')
+        if not isinstance(year, int):
+            year = int(year) if isinstance(year, str) and year.isdigit() else None
+        return (
+            query_path, title_hash(paper.get('title')) or '', paper.get('title'),
+            extract_doi(paper), extract_arxiv_id(paper), paper.get('source'), year,
+            category, paper.get('query'), position, saved, dumps(paper)
+        )
+
+    def save_paper(self, paper, save_path, category=None):
+        """Queue a paper for insertion; rows are written in batches."""
+        with self.lock:
+            self.pending_papers.append(self._paper_row(paper, save_path, category, None, 1))
+            if len(self.pending_papers) >= self.batch_size:
+                self._flush()
+        return None
+
+    def save_query_summary(self, query_path, query, papers, downloaded_count, timestamp=None, category=None,
+                           total_found=None):
+        """Record a query's results; papers are stored once, with their rank in the results."""
+        with self.lock:
+            for position, paper in enumerate(papers):
+                self.pending_positions.append(self._paper_row(paper, query_path, category, position, 0))
+            self._flush(summary=(query_path, category, query, timestamp or datetime.now().isoformat(),
+                                 len(papers) if total_found is None else total_found, downloaded_count))
+        return None
+
+    def _flush(self, summary=None):
+        # Caller must hold self.lock; everything pending is written in one transaction
+        with self.db:
+            if self.pending_papers:
+                self.db.executemany("""
+                    INSERT INTO papers (query_path, title_hash, title, doi, arxiv_id, source, year,
+                                        category, query, position, saved, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (query_path, title_hash) DO UPDATE SET saved = 1, data = excluded.data
+                """, self.pending_papers)
+            if self.pending_positions:
+                self.db.executemany("""
+                    INSERT INTO papers (query_path, title_hash, title, doi, arxiv_id, source, year,
+                                        category, query, position, saved, data)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ON CONFLICT (query_path, title_hash) DO UPDATE SET position = excluded.position
+                """, self.pending_positions)
+            if summary:
+                self.db.execute("INSERT OR REPLACE INTO query_summaries VALUES (?, ?, ?, ?, ?, ?)", summary)
+        self.pending_papers = []
+        self.pending_positions = []
+
+    def flush(self):
+        """Write any queued rows."""
+        with self.lock:
+            self._flush()
+
+    def query_papers(self, query_path):
+        """Return the papers recorded for a query folder, in result order."""
+        self.flush()
+        with self.lock:
+            rows = self.db.execute(
+                "SELECT data FROM papers WHERE query_path = ? ORDER BY position IS NULL, position, id", (query_path,)
+            ).fetchall()
+        return [Paper.from_dict(loads(row[0])) for row in rows]
+
+    def find(self, doi=None, title=None, source=None, year=None, query=None, limit=None):
+        """Look up stored papers by any combination of indexed fields."""
+        clauses, params = [], []
+        for column, value in (('doi', doi.lower() if doi else None), ('title_hash', title_hash(title) if title else None),
+                              ('source', source), ('year', year), ('query', query)):
+            if value is not None:
+                clauses.append(f"{column} = ?")
+                params.append(value)
+
+        sql = "SELECT data FROM papers"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " ORDER BY id"
+        if limit:
+            sql += f" LIMIT {int(limit)}"
+
+        self.flush()
+        with self.lock:
+            return [Paper.from_dict(loads(row[0])) for row in self.db.execute(sql, params)]
+
+    def export_json(self, json_store=None):
+        """Write the stored metadata back out in the per-folder JSON layout."""
+        json_store = json_store or JsonMetadataStore()
+        self.flush()
+
+        with self.lock:
+            query_paths = [row[0] for row in self.db.execute("SELECT DISTINCT query_path FROM papers")]
+            summaries = {row[0]: row for row in self.db.execute("SELECT * FROM query_summaries")}
+
+        exported = 0
+        for query_path in query_paths:
+            with self.lock:
+                rows = self.db.execute(
+                    "SELECT data, saved FROM papers WHERE query_path = ? "
+                    "ORDER BY position IS NULL, position, id", (query_path,)
+                ).fetchall()
+
+            os.makedirs(query_path, exist_ok=True)
+            papers = []
+            for data, saved in rows:
+                paper = Paper.from_dict(loads(data))
+                papers.append(paper)
+                if saved:
+                    json_store.save_paper(paper, query_path)
+                    exported += 1
+
+            if query_path in summaries:
+                _, _, query, timestamp, total_found, downloaded = summaries[query_path]
+                json_store.save_query_summary(query_path, query, papers, downloaded, timestamp,
+                                              total_found=total_found)
+
+        return exported
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.db.close()
+
+
+def create_metadata_store(backend, base_path):
+    """Build the metadata store for `backend` ('json' or 'sqlite')."""
+    if backend == 'json':
+        return JsonMetadataStore()
+    if backend == 'sqlite':
+        return SQLiteMetadataStore(os.path.join(base_path, 'metadata.sqlite'))
+    raise ValueError(f"Unknown metadata backend: {backend}")
@@ -0,0 +1,162 @@
+"""
+In-process instrumentation for the scholarly article scraper.
+Counters, gauges and latency histograms keyed by name and labels, written
+out as JSON lines snapshots or Prometheus text exposition format.
+"""
+
+import bisect
+import json
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime
+
+# Upper bounds (seconds) of the latency histogram buckets
+LATENCY_BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+
+class Histogram:
+    """Fixed-bucket latency histogram with count, sum, min and max."""
+
+    def __init__(self, buckets=LATENCY_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.min = None
+        self.max = None
+
+    def observe(self, value):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def quantile(self, q):
+        """Estimate a quantile as the upper bound of the bucket it falls in."""
+        if not self.count:
+            return None
+        rank = q * self.count
+        seen = 0
+        for bound, count in zip(self.buckets, self.counts):
+            seen += count
+            if seen >= rank:
+                return min(bound, self.max)
+        return self.max
+
+    def to_dict(self):
+        return {
+            'count': self.count,
+            'sum': round(self.total, 6),
+            'min': self.min,
+            'max': self.max,
+            'p50': self.quantile(0.5),
+            'p95': self.quantile(0.95)
+        }
+
+
+def _label_key(labels):
+    return tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None))
+
+
+def _format_name(name, key):
+    if not key:
+        return name
+    return name + '{' + ','.join(f'{label}={value}' for label, value in key) + '}'
+
+
+def _prometheus_labels(key, extra=()):
+    pairs = list(key) + list(extra)
+    if not pairs:
+        return ''
+    return '{' + ','.join(f'{label}="{value}"' for label, value in pairs) + '}'
+
+
+class Metrics:
+    """Thread-safe registry of counters, gauges and histograms."""
+
+    def __init__(self, prefix='scraper'):
+        self.prefix = prefix
+        self.lock = threading.Lock()
+        self.counters = {}
+        self.gauges = {}
+        self.histograms = {}
+        self.started = time.time()
+
+    def inc(self, name, value=1, **labels):
+        key = (name, _label_key(labels))
+        with self.lock:
+            self.counters[key] = self.counters.get(key, 0) + value
+
+    def set(self, name, value, **labels):
+        with self.lock:
+            self.gauges[(name, _label_key(labels))] = value
+
+    def observe(self, name, seconds, **labels):
+        key = (name, _label_key(labels))
+        with self.lock:
+            histogram = self.histograms.get(key)
+            if histogram is None:
+                histogram = self.histograms[key] = Histogram()
+            histogram.observe(seconds)
+
+    @contextmanager
+    def timer(self, name, **labels):
+        """Observe how long the `with` block takes, even if it raises."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start, **labels)
+
+    def snapshot(self, **extra):
+        """Return all metrics as one JSON-serializable dict."""
+        with self.lock:
+            snapshot = {
+                'timestamp': datetime.now().isoformat(),
+                'uptime_seconds': round(time.time() - self.started, 3),
+                'counters': {_format_name(name, key): value for (name, key), value in sorted(self.counters.items())},
+                'gauges': {_format_name(name, key): value for (name, key), value in sorted(self.gauges.items())},
+                'histograms': {_format_name(name, key): histogram.to_dict()
+                               for (name, key), histogram in sorted(self.histograms.items())}
+            }
+        snapshot.update(extra)
+        return snapshot
+
+    def write_jsonl(self, path, **extra):
+        """Append a snapshot as one JSON line."""
+        with open(path, 'a', encoding='utf-8') as f:
+            f.write(json.dumps(self.snapshot(**extra)) + '\n')
+
+    def to_prometheus(self):
+        """Render all metrics in the Prometheus text exposition format."""
+        lines = []
+        with self.lock:
+            for (name, key), value in sorted(self.counters.items()):
+                lines.append(f"{self.prefix}_{name}_total{_prometheus_labels(key)} {value}")
+            for (name, key), value in sorted(self.gauges.items()):
+                lines.append(f"{self.prefix}_{name}{_prometheus_labels(key)} {value}")
+            for (name, key), histogram in sorted(self.histograms.items()):
+                metric = f"{self.prefix}_{name}"
+                cumulative = 0
+                for bound, count in zip(histogram.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"{metric}_bucket{_prometheus_labels(key, [('le', bound)])} {cumulative}")
+                lines.append(f"{metric}_bucket{_prometheus_labels(key, [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"{metric}_sum{_prometheus_labels(key)} {histogram.total}")
+                lines.append(f"{metric}_count{_prometheus_labels(key)} {histogram.count}")
+        return '\n'.join(lines) + '\n'
+
+    def write_prometheus(self, path):
+        """Overwrite `path` with the current metrics in Prometheus text format."""
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(self.to_prometheus())
+
+    def format_summary(self):
+        """Short human-readable summary of the latency histograms."""
+        lines = []
+        for name, stats in self.snapshot()['histograms'].items():
+            lines.append(f"  {name}: {stats['count']} calls, {stats['sum']:.2f}s total, "
+                         f"p50 {stats['p50']:.3f}s, p95 {stats['p95']:.3f}s")
+        return '\n'.join(lines)
@@ -0,0 +1,202 @@
+"""
+Paper records for the scholarly article scraper.
+Every source builds a Paper: a fixed set of fields held in __slots__, so a
+record takes a fraction of the memory of a dict. Values are normalized
+(whitespace, years, citation counts, DOIs and arXiv IDs) as a paper is
+built, and papers keep dict-style access (paper['title'], paper.get('doi')),
+so code written for the old dicts works unchanged. Papers are written as compact JSON, with
+every field present, using orjson when it is installed.
+"""
+
+import html
+import json
+import re
+
+from dedup import find_arxiv_id, find_doi
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+FIELDS = ('title', 'authors', 'abstract', 'pdf_url', 'url', 'doi', 'arxiv_id', 'venue', 'publisher',
+          'year', 'citations', 'source', 'query', 'relevance')
+FIELD_SET = frozenset(FIELDS)
+
+JATS_TITLE_PATTERN = re.compile(r'<(?:jats:)?title>\s*abstract\s*</(?:jats:)?title>', re.IGNORECASE)
+TAG_PATTERN = re.compile(r'<[^>]+>')
+
+
+def clean_text(value):
+    """Collapse whitespace; empty values become None."""
+    if value is None:
+        return None
+    text = value if isinstance(value, str) else str(value)
+    # Substring checks are much cheaper than splitting text that is already clean
+    if '  ' in text or '\n' in text or '\t' in text or '\r' in text:
+        return ' '.join(text.split()) or None
+    return text.strip() or None
+
+
+def _clean_token(value):
+    # URLs, IDs and labels only need trimming
+    if isinstance(value, str):
+        value = value.strip()
+    return value or None
+
+
+def clean_jats(abstract):
+    """Plain text of a CrossRef JATS abstract, without its 'Abstract' heading."""
+    if not abstract:
+        return None
+    text = abstract
+    if '<' in text:
+        text = TAG_PATTERN.sub(' ', JATS_TITLE_PATTERN.sub(' ', text))
+    if '&' in text:
+        text = html.unescape(text)
+    return clean_text(text)
+
+
+def parse_year(value):
+    """Year from an int, a date string or a CrossRef date ({'date-parts': [[2021, 5, 3]]} or its parts)."""
+    if isinstance(value, dict):
+        value = value.get('date-parts')
+    if isinstance(value, list):
+        value = value[0][0] if value and isinstance(value[0], list) and value[0] else None
+    if isinstance(value, str) and value[:4].isdigit():
+        value = int(value[:4])
+    if isinstance(value, int) and not isinstance(value, bool) and 1000 <= value <= 2999:
+        return value
+    return None
+
+
+def parse_count(value):
+    """Non-negative count, or None."""
+    if isinstance(value, str) and value.isdigit():
+        value = int(value)
+    return value if isinstance(value, int) and not isinstance(value, bool) and value >= 0 else None
+
+
+class Paper:
+    """One search result. Fields a source does not provide read as None."""
+
+    __slots__ = FIELDS + ('extra',)
+
+    def __init__(self, title='', authors=None, abstract=None, pdf_url=None, url=None, doi=None, arxiv_id=None,
+                 venue=None, publisher=None, year=None, citations=None, source=None, query=None, relevance=None,
+                 **extra):
+        # Most fields of most results are missing, so empty values skip the cleaning calls
+        self.title = clean_text(title) or '' if title else ''
+        self.authors = clean_text(authors) if authors else None
+        if abstract:
+            # CrossRef abstracts come as JATS XML
+            abstract = clean_jats(abstract) if '<jats:' in abstract else clean_text(abstract)
+        self.abstract = abstract or None
+        self.pdf_url = pdf_url = _clean_token(pdf_url) if pdf_url else None
+        self.url = url = _clean_token(url) if url else None
+        self.venue = clean_text(venue) if venue else None
+        self.publisher = clean_text(publisher) if publisher else None
+        self.year = parse_year(year) if year else None
+        self.citations = parse_count(citations)
+        self.source = _clean_token(source) if source else None
+        self.query = _clean_token(query) if query else None
+        self.relevance = relevance
+        # Anything else a caller attaches; most papers have none, so no dict is made for them
+        self.extra = extra or None
+        # Both IDs are also found in URLs, e.g. a DOI link from CrossRef or an arXiv PDF link
+        self.doi = find_doi(_clean_token(doi) if doi else None, url, pdf_url)
+        self.arxiv_id = find_arxiv_id(_clean_token(arxiv_id) if arxiv_id else None, pdf_url, url)
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build a Paper from a dict read back from JSON (a Paper is returned as is)."""
+        if isinstance(data, cls):
+            return data
+        return cls(**data)
+
+    def __getitem__(self, key):
+        if key in FIELD_SET:
+            return getattr(self, key)
+        if self.extra and key in self.extra:
+            return self.extra[key]
+        raise KeyError(key)
+
+    def __setitem__(self, key, value):
+        if key in FIELD_SET:
+            setattr(self, key, value)
+        else:
+            if self.extra is None:
+                self.extra = {}
+            self.extra[key] = value
+
+    def __contains__(self, key):
+        return self.get(key) is not None
+
+    def get(self, key, default=None):
+        if key in FIELD_SET:
+            value = getattr(self, key)
+        else:
+            value = self.extra.get(key) if self.extra else None
+        return default if value is None else value
+
+    def setdefault(self, key, value):
+        if self.get(key) is None:
+            self[key] = value
+        return self[key]
+
+    def keys(self):
+        """Every field name, in field order, then any extra keys."""
+        return list(FIELDS) + list(self.extra) if self.extra else list(FIELDS)
+
+    def __iter__(self):
+        return iter(self.keys())
+
+    def __len__(self):
+        return len(self.keys())
+
+    def items(self):
+        return list(self.to_dict().items())
+
+    def to_dict(self):
+        """Every field as a plain dict, None where unset, as written to JSON."""
+        data = {field: getattr(self, field) for field in FIELDS}
+        if self.extra:
+            data.update(self.extra)
+        return data
+
+    def copy(self):
+        paper = Paper.__new__(Paper)
+        for field in FIELDS:
+            setattr(paper, field, getattr(self, field))
+        paper.extra = dict(self.extra) if self.extra else None
+        return paper
+
+    def __repr__(self):
+        return f"Paper({self.title[:60]!r}, source={self.source!r}, year={self.year!r})"
+
+
+def _default(obj):
+    if isinstance(obj, Paper):
+        return obj.to_dict()
+    raise TypeError(f"{type(obj).__name__} is not JSON serializable")
+
+
+def dumps_bytes(obj):
+    """Compact UTF-8 JSON of `obj`; Papers anywhere inside it are written as dicts."""
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default)
+    return json.dumps(obj, ensure_ascii=False, separators=(',', ':'), default=_default).encode('utf-8')
+
+
+def dumps(obj):
+    return dumps_bytes(obj).decode('utf-8')
+
+
+def loads(data):
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+
+def write_json(path, obj):
+    """Write `obj` to `path` as compact JSON."""
+    with open(path, 'wb') as f:
+        f.write(dumps_bytes(obj))
@@ -0,0 +1,240 @@
+"""
+PDF text extraction stage for the scholarly article scraper.
+Downloaded PDFs are handed to a process pool that extracts their text on
+every core. Results are cached by the SHA-256 of the PDF, so a PDF found
+under several queries, or again in a later run, is only extracted once.
+Each PDF gets a compact `.txt` sidecar (whitespace collapsed, pages split
+by form feeds) hard-linked next to it. Extraction needs pypdf (or PyPDF2
+or pdfplumber).
+
+    python pdf_text.py --base-path Academic_Papers --workers 8
+"""
+
+import argparse
+import hashlib
+import io
+import mmap
+import multiprocessing
+import os
+import threading
+from concurrent.futures import Future, ProcessPoolExecutor
+
+from search_index import SearchIndex
+
+try:
+    from pypdf import PdfReader
+except ImportError:
+    try:
+        from PyPDF2 import PdfReader
+    except ImportError:
+        PdfReader = None
+
+try:
+    import pdfplumber
+except ImportError:
+    pdfplumber = None
+
+# PDFs larger than this are memory-mapped instead of read into memory
+MMAP_THRESHOLD = 32 * 1024 * 1024
+
+
+def available_backend():
+    """Name of the library text is extracted with, or None if none is installed."""
+    if PdfReader is not None:
+        return PdfReader.__module__.split('.')[0]
+    if pdfplumber is not None:
+        return 'pdfplumber'
+    return None
+
+
+def _require_backend():
+    # Pulling strings out of content streams by hand gives letter-spaced junk
+    # that would only pollute the search index, so there is no fallback
+    if available_backend() is None:
+        raise ImportError("PDF text extraction requires pypdf: pip install pypdf")
+
+
+def compact_text(text):
+    """Collapse runs of whitespace within each page; pages stay split by form feeds."""
+    return '\f'.join(' '.join(page.split()) for page in text.split('\f'))
+
+
+def _extract(stream):
+    if PdfReader is not None:
+        return '\f'.join(page.extract_text() or '' for page in PdfReader(stream).pages)
+    with pdfplumber.open(stream) as pdf:
+        return '\f'.join(page.extract_text() or '' for page in pdf.pages)
+
+
+def extract_text(pdf_path):
+    """Extract the text of one PDF; oversized files are memory-mapped rather than read."""
+    _require_backend()
+    with open(pdf_path, 'rb') as f:
+        if os.path.getsize(pdf_path) < MMAP_THRESHOLD:
+            return compact_text(_extract(io.BytesIO(f.read())))
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+            return compact_text(_extract(mapped))
+
+
+def _extract_to_file(pdf_path, text_path):
+    # Runs in a worker process; the text goes to disk rather than back through a pipe
+    text = extract_text(pdf_path)
+    partial_path = f"{text_path}.{os.getpid()}.part"
+    with open(partial_path, 'w', encoding='utf-8') as f:
+        f.write(text)
+    os.replace(partial_path, text_path)
+    return len(text)
+
+
+def file_digest(path):
+    """SHA-256 of a file, read in 1 MB chunks."""
+    sha256 = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1024 * 1024), b''):
+            sha256.update(chunk)
+    return sha256.hexdigest()
+
+
+class TextExtractor:
+    """Process pool that extracts PDF text into a cache keyed by content hash."""
+
+    def __init__(self, cache_dir, max_workers=None):
+        _require_backend()
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers or os.cpu_count()
+        self.lock = threading.Lock()
+        self.all_done = threading.Condition(self.lock)
+        self.inflight = {}  # digest -> Future
+        self.pending = 0  # submissions whose sidecar/callback step has not run yet
+        self.extracted = 0
+        self.cached = 0
+        self.failed = 0
+        self.executor = None
+
+    def text_path(self, digest):
+        return os.path.join(self.cache_dir, digest[:2], f"{digest}.txt")
+
+    def _pool(self):
+        # Caller must hold self.lock. Started on first use; spawned so the workers
+        # do not inherit the download threads and open connections of the scraper
+        if self.executor is None:
+            self.executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                                mp_context=multiprocessing.get_context('spawn'))
+        return self.executor
+
+    def submit(self, pdf_path, digest=None, callback=None):
+        """
+        Extract a PDF's text unless it is cached, then link a `.txt` sidecar next
+        to the PDF and call `callback(pdf_path, text_path)`. Returns a Future.
+        """
+        digest = digest or file_digest(pdf_path)
+        text_path = self.text_path(digest)
+
+        started = False
+        with self.lock:
+            self.pending += 1
+            future = self.inflight.get(digest)
+            if future is None:
+                if os.path.exists(text_path):
+                    self.cached += 1
+                    future = Future()
+                    future.set_result(None)
+                else:
+                    os.makedirs(os.path.dirname(text_path), exist_ok=True)
+                    future = self._pool().submit(_extract_to_file, pdf_path, text_path)
+                    self.inflight[digest] = future
+                    started = True
+
+        # Callbacks of a future that is already done run right here, and they take the lock
+        if started:
+            future.add_done_callback(lambda f: self._finished(digest, f))
+
+        def on_done(f):
+            try:
+                if f.exception() is not None:
+                    print(f"      Error extracting text: {os.path.basename(pdf_path)}: {f.exception()}")
+                    return
+                self._link_sidecar(text_path, pdf_path)
+                if callback:
+                    callback(pdf_path, text_path)
+            finally:
+                with self.lock:
+                    self.pending -= 1
+                    self.all_done.notify_all()
+
+        future.add_done_callback(on_done)
+        return future
+
+    def _finished(self, digest, future):
+        with self.lock:
+            self.inflight.pop(digest, None)
+            if future.exception() is None:
+                self.extracted += 1
+            else:
+                self.failed += 1
+
+    def _link_sidecar(self, text_path, pdf_path):
+        sidecar_path = os.path.splitext(pdf_path)[0] + '.txt'
+        if os.path.exists(sidecar_path):
+            return
+        try:
+            os.link(text_path, sidecar_path)
+        except OSError:
+            # No hard links here: the text stays in the cache only
+            pass
+
+    def wait(self):
+        """Block until every submitted PDF has been extracted and linked."""
+        with self.lock:
+            self.all_done.wait_for(lambda: self.pending == 0)
+
+    def stats(self):
+        with self.lock:
+            return {'extracted': self.extracted, 'cached': self.cached, 'failed': self.failed,
+                    'inflight': len(self.inflight)}
+
+    def shutdown(self, wait=True):
+        with self.lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+def extract_tree(base_path, max_workers=None, callback=None):
+    """Extract every PDF under `base_path` that has no cached text yet; returns the stats."""
+    extractor = TextExtractor(os.path.join(base_path, '.blobs', 'text'), max_workers)
+    try:
+        for folder, dirnames, filenames in os.walk(base_path):
+            # The blob store itself is reached through the links in the query folders
+            dirnames[:] = [name for name in dirnames if not name.startswith('.')]
+            for filename in filenames:
+                if filename.lower().endswith('.pdf'):
+                    extractor.submit(os.path.join(folder, filename), callback=callback)
+        extractor.wait()
+    finally:
+        extractor.shutdown()
+    return extractor.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Extract the text of every downloaded PDF.")
+    parser.add_argument('--base-path', default='Academic_Papers', help="scraper output folder")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="extraction processes")
+    args = parser.parse_args()
+    _require_backend()
+
+    # The text also goes into the corpus search index
+    index = SearchIndex(os.path.join(args.base_path, '.search_index.sqlite'))
+
+    def index_text(pdf_path, text_path):
+        with open(text_path, 'r', encoding='utf-8') as f:
+            index.set_text(pdf_path, f.read())
+
+    print(f"Extracting with {available_backend()} on {args.workers} processes")
+    stats = extract_tree(args.base_path, args.workers, index_text)
+    index.close()
+    print(f"Extracted {stats['extracted']} PDFs, {stats['cached']} already cached, {stats['failed']} failed")
+
+
+if __name__ == "__main__":
+    main()
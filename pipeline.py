@@ -0,0 +1,74 @@
+"""
+Minimal threaded streaming pipeline for the scholarly article scraper.
+Producers and stages run in their own threads and hand items on through
+bounded queues, so a slow stage applies backpressure to the ones before it.
+"""
+
+import queue
+import threading
+
+_DONE = object()
+
+
+def _run_producer(producer, out_queue):
+    try:
+        for item in producer():
+            out_queue.put(item)
+    except Exception as e:
+        print(f"  Pipeline producer failed: {str(e)}")
+
+
+def _run_stage(stage, in_queue, out_queue):
+    while True:
+        item = in_queue.get()
+        if item is _DONE:
+            out_queue.put(_DONE)
+            return
+        try:
+            result = stage(item)
+        except Exception as e:
+            print(f"  Pipeline stage {getattr(stage, '__name__', stage)} failed: {str(e)}")
+            continue
+        if result is not None:
+            out_queue.put(result)
+
+
+def run_pipeline(producers, stages, sink, queue_size=16):
+    """
+    Stream items from `producers` through `stages` into `sink`.
+
+    Each producer is a callable returning an iterable and runs in its own
+    thread. Each stage maps one item to a new item, or to None to drop it.
+    `sink` is called in the calling thread for every item that gets through.
+    """
+    queues = [queue.Queue(maxsize=queue_size) for _ in range(len(stages) + 1)]
+
+    producer_threads = [
+        threading.Thread(target=_run_producer, args=(producer, queues[0]), daemon=True)
+        for producer in producers
+    ]
+    stage_threads = [
+        threading.Thread(target=_run_stage, args=(stage, queues[i], queues[i + 1]), daemon=True)
+        for i, stage in enumerate(stages)
+    ]
+
+    def close_input():
+        for thread in producer_threads:
+            thread.join()
+        queues[0].put(_DONE)
+
+    for thread in producer_threads + stage_threads:
+        thread.start()
+    threading.Thread(target=close_input, daemon=True).start()
+
+    while True:
+        item = queues[-1].get()
+        if item is _DONE:
+            break
+        try:
+            sink(item)
+        except Exception as e:
+            print(f"  Pipeline sink failed: {str(e)}")
+
+    for thread in stage_threads:
+        thread.join()
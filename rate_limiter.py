@@ -0,0 +1,212 @@
+"""
+Per-host token bucket rate limiting for the scholarly article scraper.
+Requests only wait when the budget of the host they target is used up.
+"""
+
+import sqlite3
+import threading
+import time
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+from urllib.parse import urlparse
+
+
+def get_host(url):
+    """Return the lower-cased host of a URL (or the value itself if it is already a host)."""
+    host = urlparse(url).hostname if '://' in url else url
+    return (host or '').lower()
+
+
+def parse_retry_after(value):
+    """Parse a Retry-After header (seconds or HTTP date) into seconds to wait."""
+    if not value:
+        return None
+
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class TokenBucket:
+    """Token bucket holding up to `capacity` tokens, refilled at `rate` tokens per second."""
+
+    def __init__(self, rate, capacity=1):
+        self.rate = float(rate)
+        self.capacity = float(capacity)
+        self.tokens = float(capacity)
+        self.updated = time.monotonic()
+        self.lock = threading.Lock()
+
+    def _refill(self, now):
+        # `updated` lies in the future while the bucket is blocked
+        if now > self.updated:
+            self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+            self.updated = now
+
+    def reserve(self):
+        """Take a token and return how many seconds the caller must wait before using it."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            # Tokens may go negative: callers queue up behind earlier reservations
+            self.tokens -= 1
+            wait = max(0.0, self.updated - now)
+            if self.tokens < 0:
+                wait += -self.tokens / self.rate
+            return wait
+
+    def block(self, seconds):
+        """Stop refilling for `seconds` and drop any banked tokens (e.g. after a 429)."""
+        with self.lock:
+            now = time.monotonic()
+            self._refill(now)
+            self.tokens = min(self.tokens, 0.0)
+            self.updated = max(self.updated, now + seconds)
+
+
+class HostRateLimiter:
+    """Keeps one token bucket per host and applies server throttling hints to it."""
+
+    def __init__(self, default_rate=0.5, default_capacity=2, default_backoff=10):
+        self.default_rate = default_rate
+        self.default_capacity = default_capacity
+        self.default_backoff = default_backoff
+        self.limits = {}
+        self.buckets = {}
+        self.lock = threading.Lock()
+
+    def configure(self, host, rate, capacity=1):
+        """Set the request rate (per second) and burst size for a host."""
+        host = get_host(host)
+        with self.lock:
+            self.limits[host] = (rate, capacity)
+            self.buckets[host] = TokenBucket(rate, capacity)
+
+    def bucket(self, url):
+        """Return the bucket for the host of `url`, creating it on first use."""
+        host = get_host(url)
+        with self.lock:
+            if host not in self.buckets:
+                rate, capacity = self.limits.get(host, (self.default_rate, self.default_capacity))
+                self.buckets[host] = TokenBucket(rate, capacity)
+            return self.buckets[host]
+
+    def reserve(self, url):
+        """Reserve a request slot for `url` without blocking; return the seconds to wait."""
+        return self.bucket(url).reserve()
+
+    def acquire(self, url):
+        """Block until a request to `url` is allowed; return the time spent waiting."""
+        wait = self.reserve(url)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+    def update_from_response(self, url, response):
+        """Throttle the host after a 429/503 and return the advised delay, if any."""
+        if response.status_code not in (429, 503):
+            return None
+
+        delay = parse_retry_after(response.headers.get('Retry-After'))
+        if delay is None:
+            if response.status_code != 429:
+                return None
+            delay = self.default_backoff
+
+        self.block(url, delay)
+        return delay
+
+    def block(self, url, seconds):
+        """Pause requests to the host of `url` for `seconds`."""
+        self.bucket(url).block(seconds)
+
+
+class SharedRateLimiter(HostRateLimiter):
+    """
+    HostRateLimiter whose buckets live in a SQLite file, so every worker
+    process (or machine sharing the file) draws from the same per-host budget.
+    """
+
+    def __init__(self, limits_file, default_rate=0.5, default_capacity=2, default_backoff=10):
+        super().__init__(default_rate, default_capacity, default_backoff)
+        self.limits_file = limits_file
+        self.db = sqlite3.connect(limits_file, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS buckets (
+                host TEXT PRIMARY KEY,
+                rate REAL NOT NULL,
+                capacity REAL NOT NULL,
+                tokens REAL NOT NULL,
+                updated REAL NOT NULL
+            )
+        """)
+
+    def configure(self, host, rate, capacity=1):
+        """Set the request rate (per second) and burst size for a host, keeping its shared state."""
+        host = get_host(host)
+        with self.lock:
+            self.limits[host] = (rate, capacity)
+            self.db.execute(
+                "INSERT INTO buckets VALUES (?, ?, ?, ?, ?) "
+                "ON CONFLICT (host) DO UPDATE SET rate = excluded.rate, capacity = excluded.capacity",
+                (host, rate, capacity, capacity, time.time())
+            )
+
+    def _update(self, url, change):
+        # Wall-clock time, since monotonic clocks are not comparable between processes
+        host = get_host(url)
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                row = self.db.execute(
+                    "SELECT rate, capacity, tokens, updated FROM buckets WHERE host = ?", (host,)
+                ).fetchone()
+                if row is None:
+                    rate, capacity = self.limits.get(host, (self.default_rate, self.default_capacity))
+                    row = (rate, capacity, capacity, time.time())
+
+                rate, capacity, tokens, updated = row
+                now = time.time()
+                if now > updated:
+                    tokens = min(capacity, tokens + (now - updated) * rate)
+                    updated = now
+
+                tokens, updated, result = change(rate, tokens, updated, now)
+                self.db.execute("INSERT OR REPLACE INTO buckets VALUES (?, ?, ?, ?, ?)",
+                                (host, rate, capacity, tokens, updated))
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+        return result
+
+    def reserve(self, url):
+        """Reserve a request slot for `url` in the shared bucket; return the seconds to wait."""
+        def take(rate, tokens, updated, now):
+            tokens -= 1
+            wait = max(0.0, updated - now)
+            if tokens < 0:
+                wait += -tokens / rate
+            return tokens, updated, wait
+
+        return self._update(url, take)
+
+    def block(self, url, seconds):
+        """Pause requests to the host of `url` for `seconds`, for every worker."""
+        def pause(rate, tokens, updated, now):
+            return min(tokens, 0.0), max(updated, now + seconds), None
+
+        self._update(url, pause)
+
+    def close(self):
+        with self.lock:
+            self.db.close()
@@ -0,0 +1,96 @@
+"""
+Retry and circuit breaker helpers for the scholarly article scraper.
+Transient failures (429, 5xx, dropped connections) are retried with jittered
+exponential backoff; a source that keeps failing is skipped for a cooldown
+period instead of costing a full timeout on every query.
+"""
+
+import random
+import threading
+import time
+
+# Statuses worth retrying: throttling and transient server errors
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+# Statuses a scraped site answers with when it blocks us or shows a captcha
+BLOCKED_STATUSES = (403, 429)
+
+
+class CircuitOpenError(Exception):
+    """Raised instead of calling a source whose circuit breaker is open."""
+
+
+class RetryPolicy:
+    """Exponential backoff with full jitter, capped at `max_delay` seconds."""
+
+    def __init__(self, max_attempts=4, base_delay=1.0, max_delay=30.0, retry_statuses=RETRY_STATUSES):
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.retry_statuses = retry_statuses
+
+    def should_retry(self, status_code):
+        return status_code in self.retry_statuses
+
+    def delay(self, attempt, retry_after=None):
+        """Seconds to wait before retry number `attempt` (0-based), never less than `retry_after`."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        return delay
+
+
+class CircuitBreaker:
+    """
+    Opens after `failure_threshold` consecutive failures and rejects calls for
+    `cooldown` seconds; then lets one trial call through (half-open) and closes
+    again if it succeeds.
+    """
+
+    def __init__(self, name, failure_threshold=3, cooldown=300):
+        self.name = name
+        self.failure_threshold = failure_threshold
+        self.cooldown = cooldown
+        self.failures = 0
+        self.opened_at = None
+        self.trial_running = False
+        self.lock = threading.Lock()
+
+    @property
+    def state(self):
+        with self.lock:
+            if self.opened_at is None:
+                return 'closed'
+            if time.monotonic() - self.opened_at < self.cooldown:
+                return 'open'
+            return 'half-open'
+
+    def allow(self):
+        """Return True if a call may go ahead now."""
+        with self.lock:
+            if self.opened_at is None:
+                return True
+            if time.monotonic() - self.opened_at < self.cooldown or self.trial_running:
+                return False
+            self.trial_running = True
+            return True
+
+    def check(self):
+        """Raise CircuitOpenError unless a call may go ahead now."""
+        if not self.allow():
+            raise CircuitOpenError(f"{self.name} skipped after repeated failures (cooling down)")
+
+    def record_success(self):
+        with self.lock:
+            self.failures = 0
+            self.opened_at = None
+            self.trial_running = False
+
+    def record_failure(self):
+        with self.lock:
+            self.failures += 1
+            if self.trial_running or self.failures >= self.failure_threshold:
+                if self.opened_at is None or self.trial_running:
+                    print(f"  {self.name} is failing; skipping it for {self.cooldown:.0f}s")
+                self.opened_at = time.monotonic()
+                self.trial_running = False
@@ -0,0 +1,167 @@
+"""
+On-disk HTTP response cache for the search APIs and web scrapers.
+Bodies are stored zlib-compressed in SQLite, expire after a per-source TTL,
+are revalidated with ETag/Last-Modified and evicted least-recently-used
+once the cache grows past its size cap.
+"""
+
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+import zlib
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+# Only headers that still describe the stored (decoded) body are kept
+STORED_HEADERS = ('Content-Type', 'ETag', 'Last-Modified', 'Date')
+
+
+def normalize_url(url, params=None):
+    """Return a canonical form of `url` plus `params` for use as a cache key."""
+    if params:
+        url = requests.Request('GET', url, params=params).prepare().url
+
+    parts = urlsplit(url)
+    query = urlencode(sorted(parse_qsl(parts.query, keep_blank_values=True)))
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or '/', query, ''))
+
+
+def build_response(url, status, headers, content):
+    """Wrap an in-memory body in a requests.Response so parsers can use .json()/.text."""
+    response = requests.Response()
+    response.status_code = status
+    response.url = url
+    response.headers = CaseInsensitiveDict(headers)
+    response.encoding = get_encoding_from_headers(response.headers)
+    response._content = content
+    return response
+
+
+def revalidation_headers(cached):
+    """Conditional request headers that let the server answer 304 for a cached response."""
+    headers = {}
+    if 'ETag' in cached.headers:
+        headers['If-None-Match'] = cached.headers['ETag']
+    if 'Last-Modified' in cached.headers:
+        headers['If-Modified-Since'] = cached.headers['Last-Modified']
+    return headers
+
+
+class ResponseCache:
+    """SQLite-backed cache of successful GET responses."""
+
+    def __init__(self, cache_file, max_bytes=256 * 1024 * 1024):
+        self.cache_file = cache_file
+        self.max_bytes = max_bytes
+        self.lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.revalidated = 0
+
+        self.db = sqlite3.connect(cache_file, timeout=30, check_same_thread=False)
+        self.db.execute("""
+            CREATE TABLE IF NOT EXISTS responses (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                status INTEGER NOT NULL,
+                headers TEXT NOT NULL,
+                body BLOB NOT NULL,
+                size INTEGER NOT NULL,
+                stored_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )
+        """)
+        self.db.execute("CREATE INDEX IF NOT EXISTS responses_last_access ON responses (last_access)")
+        self.db.commit()
+
+    @staticmethod
+    def make_key(url, params=None):
+        return hashlib.sha256(normalize_url(url, params).encode('utf-8')).hexdigest()
+
+    def lookup(self, key):
+        """Return (response, age_in_seconds) for a cached key, or (None, None)."""
+        with self.lock:
+            row = self.db.execute(
+                "SELECT url, status, headers, body, stored_at FROM responses WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None:
+                return None, None
+            self.db.execute("UPDATE responses SET last_access = ? WHERE key = ?", (time.time(), key))
+            self.db.commit()
+
+        url, status, headers, body, stored_at = row
+        response = build_response(url, status, json.loads(headers), zlib.decompress(body))
+        response.from_cache = True
+        return response, time.time() - stored_at
+
+    def store(self, key, response):
+        """Store a successful response body under `key`."""
+        headers = {name: response.headers[name] for name in STORED_HEADERS if name in response.headers}
+        body = zlib.compress(response.content, 6)
+        now = time.time()
+
+        with self.lock:
+            self.db.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                (key, response.url, response.status_code, json.dumps(headers), body, len(body), now, now)
+            )
+            self._evict()
+            self.db.commit()
+
+    def refresh(self, key):
+        """Mark a cached entry as fresh again after a 304 Not Modified."""
+        with self.lock:
+            now = time.time()
+            self.db.execute("UPDATE responses SET stored_at = ?, last_access = ? WHERE key = ?", (now, now, key))
+            self.db.commit()
+
+    def _evict(self):
+        # Caller must hold self.lock
+        total = self.db.execute("SELECT COALESCE(SUM(size), 0) FROM responses").fetchone()[0]
+        if total <= self.max_bytes:
+            return
+
+        rows = self.db.execute("SELECT key, size FROM responses ORDER BY last_access").fetchall()
+        for key, size in rows:
+            if total <= self.max_bytes:
+                break
+            self.db.execute("DELETE FROM responses WHERE key = ?", (key,))
+            total -= size
+
+    def get(self, session, url, ttl, params=None, headers=None, send=None, **kwargs):
+        """
+        Return a cached response for `url` if it is younger than `ttl`, otherwise
+        fetch it with `send` (defaults to `session.get`), revalidating stale entries.
+        """
+        send = send or session.get
+        key = self.make_key(url, params)
+        cached, age = self.lookup(key)
+
+        if cached is not None and age < ttl:
+            self.hits += 1
+            return cached
+
+        request_headers = dict(headers or {})
+        if cached is not None:
+            request_headers.update(revalidation_headers(cached))
+
+        response = send(url, params=params, headers=request_headers or None, **kwargs)
+
+        if response.status_code == 304 and cached is not None:
+            self.revalidated += 1
+            self.refresh(key)
+            return cached
+
+        self.misses += 1
+        if response.status_code == 200:
+            self.store(key, response)
+        return response
+
+    def close(self):
+        with self.lock:
+            self.db.close()
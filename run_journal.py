@@ -0,0 +1,103 @@
+"""
+Persistent run journal for the scholarly article scraper.
+Records finished (category, query, paper) steps so an interrupted run can
+pick up where it stopped instead of searching and downloading again.
+"""
+
+import os
+import threading
+
+from paper import Paper, dumps, loads
+
+
+class RunJournal:
+    """Append-only JSON lines journal of completed scraping steps."""
+
+    def __init__(self, journal_file):
+        self.journal_file = journal_file
+        self.lock = threading.Lock()
+        self.search_results = {}  # (category, query_index) -> papers picked for download
+        self.found_counts = {}  # (category, query_index) -> number of papers the search found
+        self.finished_queries = set()  # (category, query_index)
+        self.finished_papers = {}  # (category, query_index, title) -> file path or None
+        self.load()
+
+    def load(self):
+        """Replay the journal file into memory."""
+        if not os.path.exists(self.journal_file):
+            return
+
+        with open(self.journal_file, 'r', encoding='utf-8') as f:
+            for line in f:
+                try:
+                    entry = loads(line)
+                except ValueError:
+                    # Last line may be cut short if the run was killed mid-write
+                    continue
+                self._apply(entry)
+
+    def _apply(self, entry):
+        key = (entry.get('category'), entry.get('query_index'))
+        event = entry.get('event')
+
+        if event == 'query_searched':
+            self.search_results[key] = [Paper.from_dict(paper) for paper in entry.get('papers', [])]
+            self.found_counts[key] = entry.get('total_found', len(self.search_results[key]))
+        elif event == 'query_finished':
+            self.finished_queries.add(key)
+        elif event == 'paper_finished':
+            self.finished_papers[key + (entry.get('title'),)] = entry.get('file')
+
+    def _append(self, entry):
+        with self.lock:
+            self._apply(entry)
+            with open(self.journal_file, 'a', encoding='utf-8') as f:
+                f.write(dumps(entry) + '\n')
+
+    def record_search(self, category, query_index, query, papers, total_found=None):
+        """
+        Remember the papers a query picked for download, and how many it found,
+        so the search is not run again. The rest of the results are not needed
+        to resume and would only grow the journal.
+        """
+        self._append({'event': 'query_searched', 'category': category, 'query_index': query_index,
+                      'query': query, 'papers': papers,
+                      'total_found': len(papers) if total_found is None else total_found})
+
+    def record_paper(self, category, query_index, title, file_path=None):
+        """Mark a paper's metadata and PDF step as finished."""
+        self._append({'event': 'paper_finished', 'category': category, 'query_index': query_index,
+                      'title': title, 'file': file_path})
+
+    def record_query(self, category, query_index, query):
+        """Mark a whole query (all of its papers and its summary) as finished."""
+        self._append({'event': 'query_finished', 'category': category, 'query_index': query_index,
+                      'query': query})
+
+    def get_search_results(self, category, query_index):
+        """Return the journaled papers picked for download by a query, or None."""
+        return self.search_results.get((category, query_index))
+
+    def get_total_found(self, category, query_index):
+        """Return how many papers a journaled search found, or None."""
+        return self.found_counts.get((category, query_index))
+
+    def is_query_finished(self, category, query_index):
+        return (category, query_index) in self.finished_queries
+
+    def is_paper_finished(self, category, query_index, title):
+        return (category, query_index, title) in self.finished_papers
+
+    def get_paper_file(self, category, query_index, title):
+        """Return the saved PDF path of a finished paper, if it had one."""
+        return self.finished_papers.get((category, query_index, title))
+
+    def clear(self):
+        """Forget all progress once a run has completed."""
+        with self.lock:
+            self.search_results.clear()
+            self.found_counts.clear()
+            self.finished_queries.clear()
+            self.finished_papers.clear()
+            if os.path.exists(self.journal_file):
+                os.remove(self.journal_file)
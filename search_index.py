@@ -0,0 +1,246 @@
+"""
+Local full-text search over the harvested corpus.
+Titles, abstracts and authors of every saved paper (and the text of its PDF,
+once extracted) go into an SQLite FTS5 index ranked by BM25, so the corpus
+can be searched in milliseconds before anything is fetched again:
+
+    python search_index.py "graph neural networks" --limit 5
+    python search_index.py --rebuild
+"""
+
+import argparse
+import json
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+from dedup import extract_doi, paper_keys
+
+# BM25 weights of the title, abstract, authors and body (PDF text) columns
+COLUMN_WEIGHTS = (10.0, 3.0, 2.0, 1.0)
+
+DOCUMENT_FIELDS = ('id', 'title', 'authors', 'year', 'source', 'doi', 'url', 'category', 'query',
+                   'metadata_path', 'pdf_path', 'indexed_at')
+
+
+def match_expression(text):
+    """Turn free text into an FTS5 query that matches every word, ignoring FTS syntax."""
+    return ' '.join('"' + word.replace('"', '""') + '"' for word in text.split())
+
+
+class SearchIndex:
+    """SQLite FTS5 index of the corpus with batched, incremental updates."""
+
+    def __init__(self, index_file, batch_size=200):
+        self.index_file = index_file
+        self.batch_size = batch_size
+        self.lock = threading.Lock()
+        self.pending = []
+
+        # Sharded runs open the index from several processes at once
+        self.db = sqlite3.connect(index_file, timeout=30, check_same_thread=False)
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            CREATE TABLE IF NOT EXISTS documents (
+                id INTEGER PRIMARY KEY,
+                title TEXT,
+                authors TEXT,
+                year INTEGER,
+                source TEXT,
+                doi TEXT,
+                url TEXT,
+                category TEXT,
+                query TEXT,
+                metadata_path TEXT,
+                pdf_path TEXT,
+                indexed_at TEXT
+            );
+            CREATE TABLE IF NOT EXISTS document_keys (
+                key TEXT PRIMARY KEY,
+                document_id INTEGER NOT NULL REFERENCES documents (id)
+            );
+            CREATE VIRTUAL TABLE IF NOT EXISTS document_text USING fts5 (
+                title, abstract, authors, body, tokenize = 'porter unicode61 remove_diacritics 2'
+            );
+        """)
+        self.db.commit()
+
+    def _document_id(self, keys):
+        # Caller must hold self.lock
+        if not keys:
+            return None
+        placeholders = ', '.join('?' * len(keys))
+        row = self.db.execute(
+            f"SELECT document_id FROM document_keys WHERE key IN ({placeholders}) LIMIT 1", keys
+        ).fetchone()
+        return row[0] if row else None
+
+    def add_paper(self, paper, category=None, metadata_path=None):
+        """Queue a paper for indexing; a paper indexed before is updated in place."""
+        with self.lock:
+            self.pending.append((paper, category, metadata_path))
+            if len(self.pending) >= self.batch_size:
+                self._flush()
+
+    def _flush(self):
+        # Caller must hold self.lock; everything pending is written in one transaction
+        if not self.pending:
+            return
+        with self.db:
+            for paper, category, metadata_path in self.pending:
+                keys = paper_keys(paper)
+                year = paper.get('year')
+                if not isinstance(year, int):
+                    year = int(year) if isinstance(year, str) and year.isdigit() else None
+                row = (paper.get('title'), paper.get('authors'), year, paper.get('source'), extract_doi(paper),
+                       paper.get('url'), category, paper.get('query'), metadata_path, datetime.now().isoformat())
+
+                document_id = self._document_id(keys)
+                if document_id is None:
+                    document_id = self.db.execute(
+                        "INSERT INTO documents (title, authors, year, source, doi, url, category, query, "
+                        "metadata_path, indexed_at) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?)", row
+                    ).lastrowid
+                    body = ''
+                else:
+                    # Keep the first category/query and any PDF text already indexed
+                    self.db.execute(
+                        "UPDATE documents SET title = ?, authors = ?, year = COALESCE(?, year), source = ?, "
+                        "doi = COALESCE(?, doi), url = ?, category = COALESCE(category, ?), "
+                        "query = COALESCE(query, ?), metadata_path = COALESCE(?, metadata_path), indexed_at = ? "
+                        "WHERE id = ?", row + (document_id,)
+                    )
+                    old = self.db.execute("SELECT body FROM document_text WHERE rowid = ?", (document_id,)).fetchone()
+                    body = old[0] if old else ''
+                    self.db.execute("DELETE FROM document_text WHERE rowid = ?", (document_id,))
+
+                self.db.execute(
+                    "INSERT INTO document_text (rowid, title, abstract, authors, body) VALUES (?, ?, ?, ?, ?)",
+                    (document_id, paper.get('title') or '', paper.get('abstract') or '', paper.get('authors') or '', body)
+                )
+                self.db.executemany("INSERT OR IGNORE INTO document_keys (key, document_id) VALUES (?, ?)",
+                                    [(key, document_id) for key in keys])
+        self.pending = []
+
+    def flush(self):
+        """Write any queued papers."""
+        with self.lock:
+            self._flush()
+
+    def set_pdf(self, paper, pdf_path, text=None):
+        """Record where a paper's PDF is and, if given, index its extracted text."""
+        self.flush()
+        with self.lock, self.db:
+            document_id = self._document_id(paper_keys(paper))
+            if document_id is None:
+                return False
+            self.db.execute("UPDATE documents SET pdf_path = COALESCE(?, pdf_path) WHERE id = ?",
+                            (pdf_path, document_id))
+            if text is not None:
+                self.db.execute("UPDATE document_text SET body = ? WHERE rowid = ?", (text, document_id))
+        return True
+
+    def set_text(self, pdf_path, text):
+        """Index the extracted text of the papers whose PDF is at `pdf_path`."""
+        self.flush()
+        with self.lock, self.db:
+            ids = [row[0] for row in self.db.execute("SELECT id FROM documents WHERE pdf_path = ?", (pdf_path,))]
+            self.db.executemany("UPDATE document_text SET body = ? WHERE rowid = ?", [(text, i) for i in ids])
+        return len(ids)
+
+    def search(self, text, limit=10, category=None, year_from=None, raw=False):
+        """
+        Return the best BM25 matches for `text` as dicts with a score (lower is
+        better) and a snippet. `raw` passes `text` through as FTS5 query syntax.
+        """
+        expression = text if raw else match_expression(text)
+        if not expression:
+            return []
+
+        clauses, params = ["document_text MATCH ?"], [expression]
+        if category:
+            clauses.append("documents.category = ?")
+            params.append(category)
+        if year_from:
+            clauses.append("documents.year >= ?")
+            params.append(year_from)
+
+        weights = ', '.join(str(weight) for weight in COLUMN_WEIGHTS)
+        columns = ', '.join(f"documents.{field}" for field in DOCUMENT_FIELDS)
+        sql = (f"SELECT {columns}, bm25(document_text, {weights}) AS score, "
+               f"snippet(document_text, -1, '[', ']', '...', 16) "
+               f"FROM document_text JOIN documents ON documents.id = document_text.rowid "
+               f"WHERE {' AND '.join(clauses)} ORDER BY score LIMIT ?")
+        params.append(int(limit))
+
+        self.flush()
+        with self.lock:
+            rows = self.db.execute(sql, params).fetchall()
+
+        results = []
+        for row in rows:
+            result = dict(zip(DOCUMENT_FIELDS, row))
+            result['score'] = round(row[-2], 4)
+            result['snippet'] = row[-1]
+            results.append(result)
+        return results
+
+    def index_tree(self, base_path):
+        """Index every *_metadata.json file under `base_path`; returns how many were read."""
+        count = 0
+        for folder, _, filenames in os.walk(base_path):
+            if os.path.basename(folder).startswith('.'):
+                continue
+            category = os.path.relpath(folder, base_path).split(os.sep)[0]
+            for filename in filenames:
+                if not filename.endswith('_metadata.json'):
+                    continue
+                metadata_path = os.path.join(folder, filename)
+                try:
+                    with open(metadata_path, 'r', encoding='utf-8') as f:
+                        paper = json.load(f)
+                except (OSError, ValueError):
+                    continue
+                self.add_paper(paper, category, metadata_path)
+                count += 1
+        self.flush()
+        return count
+
+    def __len__(self):
+        self.flush()
+        with self.lock:
+            return self.db.execute("SELECT COUNT(*) FROM documents").fetchone()[0]
+
+    def close(self):
+        with self.lock:
+            self._flush()
+            self.db.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Search the papers already saved under the output folder.")
+    parser.add_argument('query', nargs='?', help="words to search titles, abstracts, authors and PDF text for")
+    parser.add_argument('--limit', type=int, default=10)
+    parser.add_argument('--category', help="only papers saved under this category")
+    parser.add_argument('--year-from', type=int, help="only papers from this year on")
+    parser.add_argument('--raw', action='store_true', help="treat the query as FTS5 syntax (OR, NEAR, prefix*)")
+    parser.add_argument('--base-path', default='Academic_Papers', help="scraper output folder")
+    parser.add_argument('--rebuild', action='store_true', help="(re)index every metadata file under the output folder")
+    args = parser.parse_args()
+
+    index = SearchIndex(os.path.join(args.base_path, '.search_index.sqlite'))
+    if args.rebuild:
+        print(f"Indexed {index.index_tree(args.base_path)} metadata files ({len(index)} papers)")
+
+    if args.query:
+        for result in index.search(args.query, args.limit, args.category, args.year_from, args.raw):
+            print(f"{result['score']:8.2f}  {result['title']} ({result['year'] or 'n.d.'}, {result['source']})")
+            print(f"          {result['snippet']}")
+            print(f"          {result['pdf_path'] or result['metadata_path'] or result['url']}")
+    index.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,120 @@
+"""
+Sharded runs of the scholarly article scraper.
+Every (category, query) pair becomes an item in a SQLite work queue and a
+pool of worker processes claims items from it. Workers share the per-host
+rate limits, response cache and corpus index through files in the output
+folder, so more workers never means more requests per second to one host
+or a second download of the same paper.
+
+Workers on other machines can join a run by pointing at the same output
+folder (and queue file) on shared storage:
+
+    python sharding.py --workers 4 --worker-offset 4
+"""
+
+import argparse
+import os
+import time
+from multiprocessing import Process
+
+from enhanced_scholarly_scraper import EnhancedScholarlyArticleScraper
+from work_queue import WorkQueue, default_worker_name
+
+
+def run_worker(worker_id, base_path='Academic_Papers', queue_file=None, scraper_options=None):
+    """Claim and process work items until the queue is empty; return the PDFs downloaded."""
+    scraper = EnhancedScholarlyArticleScraper(base_path, worker_id=worker_id, **(scraper_options or {}))
+    queue = WorkQueue(queue_file or os.path.join(scraper.base_path, '.work_queue.sqlite'))
+    total_downloads = 0
+
+    try:
+        while True:
+            item = queue.claim(worker_id)
+            if item is None:
+                break
+
+            print(f"\n[{worker_id}] {item['category']} #{item['query_index']}: {item['query']}")
+            try:
+                downloaded = scraper.search_and_download_query(item['category'], item['query_index'],
+                                                               item['query'], item['max_papers'])
+            except Exception as e:
+                print(f"[{worker_id}] Error: {str(e)}")
+                queue.fail(item['id'], e)
+                continue
+
+            queue.complete(item['id'], downloaded)
+            total_downloads += downloaded
+
+        # This worker's part of the run is done, so its journal is no longer needed
+        scraper.journal.clear()
+    finally:
+        scraper.download_pool.shutdown(wait=True)
+        scraper.corpus_index.release_claims(scraper.download_owner)
+        scraper.write_metrics(worker_id)
+        scraper.metadata_store.close()
+        scraper.search_index.close()
+        if scraper.columnar_exporter is not None:
+            scraper.columnar_exporter.close()
+        queue.close()
+
+    return total_downloads
+
+
+def run_sharded(search_categories, category_names, max_papers_per_query=3, workers=None,
+                base_path='Academic_Papers', queue_file=None, worker_offset=0, scraper_options=None):
+    """Queue every query of `category_names` and process them with `workers` processes."""
+    workers = workers or os.cpu_count() or 1
+    base_path = os.path.join(os.getcwd(), base_path)
+    os.makedirs(base_path, exist_ok=True)
+    queue_file = queue_file or os.path.join(base_path, '.work_queue.sqlite')
+
+    queue = WorkQueue(queue_file)
+    queued = queue.enqueue_categories(search_categories, category_names, max_papers_per_query)
+    print(f"Queued {queued} queries for {workers} workers")
+
+    start = time.time()
+    processes = [
+        Process(target=run_worker, args=(default_worker_name(worker_offset + i), base_path, queue_file,
+                                         scraper_options))
+        for i in range(workers)
+    ]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    counts = queue.counts()
+    results = queue.downloaded_by_category()
+    print(f"\nWork items: {counts} in {time.time() - start:.1f}s")
+
+    # Keep the queue while items are unfinished, so a rerun picks them up
+    if not counts.get('pending') and not counts.get('claimed'):
+        queue.clear()
+    queue.close()
+
+    return {category_name: results.get(category_name, 0) for category_name in category_names}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run the scholarly article scraper across worker processes.")
+    parser.add_argument('categories', nargs='*', help="categories to scrape (default: all)")
+    parser.add_argument('--workers', type=int, default=os.cpu_count(), help="worker processes on this machine")
+    parser.add_argument('--worker-offset', type=int, default=0, help="first worker number, for extra machines")
+    parser.add_argument('--max-papers', type=int, default=3, help="max papers per query")
+    parser.add_argument('--base-path', default='Academic_Papers', help="output folder shared by all workers")
+    parser.add_argument('--queue', help="work queue file (default: <base-path>/.work_queue.sqlite)")
+    args = parser.parse_args()
+
+    # Only used for its search terms; each worker builds its own scraper
+    scraper = EnhancedScholarlyArticleScraper(args.base_path)
+    scraper.download_pool.shutdown(wait=False)
+    search_categories = scraper.search_categories
+    category_names = args.categories or list(search_categories)
+
+    results = run_sharded(search_categories, category_names, args.max_papers, args.workers,
+                          args.base_path, args.queue, args.worker_offset)
+    print(f"Total papers downloaded: {sum(results.values())}")
+
+
+if __name__ == "__main__":
+    main()
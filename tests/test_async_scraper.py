@@ -0,0 +1,132 @@
+"""Tests of the async engine against the local stub server in benchmarks/."""
+
+import asyncio
+import os
+
+import pytest
+
+pytest.importorskip('aiohttp')
+
+from async_scraper import AsyncScholarlyArticleScraper
+from paper import Paper
+from stub_server import start_stub_server
+
+
+class AsyncStubScraper(AsyncScholarlyArticleScraper):
+    """Async scraper whose sources and PDF links all point at the stub server."""
+
+    def __init__(self, base_url, **kwargs):
+        super().__init__(use_cache=False, **kwargs)
+        self.base_url = base_url
+        for source_key in ('arxiv', 'semantic_scholar', 'crossref'):
+            self.academic_sources[source_key]['api_url'] = f"{base_url}/{source_key}"
+        self.rate_limiter.configure('127.0.0.1', 1000, 1000)
+        self.search_categories = {'testing': ['graph neural networks']}
+
+    def _google_scholar_request(self, query, max_results):
+        return {'url': f"{self.base_url}/google_scholar?q={query}"}
+
+    def _ieee_request(self, query, max_results):
+        return {'url': f"{self.base_url}/ieee?q={query}"}
+
+    async def search_all_sources(self, query, max_results_per_source=5):
+        papers = await super().search_all_sources(query, max_results_per_source)
+        for paper in papers:
+            if paper.get('pdf_url'):
+                paper['pdf_url'] = f"{self.base_url}/pdf/{os.path.basename(paper['pdf_url'])}"
+        return papers
+
+
+@pytest.fixture
+def stub():
+    server = start_stub_server(delay=0.05)
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def make_scraper(stub, tmp_path):
+    scrapers = []
+
+    def make(**kwargs):
+        scraper = AsyncStubScraper(stub.base_url, base_path=str(tmp_path / 'papers'), **kwargs)
+        scrapers.append(scraper)
+        return scraper
+
+    yield make
+    for scraper in scrapers:
+        scraper.download_pool.shutdown()
+        scraper.metadata_store.close()
+        scraper.search_index.close()
+
+
+def run(scraper, coroutine_function, *args):
+    # One event loop per call, like SyncScholarlyScraper
+    async def runner():
+        async with scraper:
+            return await coroutine_function(*args)
+    return asyncio.run(runner())
+
+
+def test_search_all_sources_returns_papers_from_every_source(make_scraper):
+    scraper = make_scraper()
+    papers = run(scraper, scraper.search_all_sources, 'graph neural networks')
+
+    assert papers
+    assert all(isinstance(paper, Paper) and paper['title'] for paper in papers)
+    assert {paper['source'] for paper in papers} == {'ArXiv', 'Semantic Scholar', 'CrossRef', 'Google Scholar',
+                                                      'IEEE Xplore'}
+    assert len({paper['title'].lower() for paper in papers}) == len(papers)
+
+
+def test_category_downloads_pdfs(stub, make_scraper):
+    scraper = make_scraper()
+    downloaded = run(scraper, scraper.search_and_download_category, 'testing', 2)
+
+    pdfs = [os.path.join(folder, name) for folder, _, names in os.walk(os.path.join(scraper.base_path, 'testing'))
+            for name in names if name.endswith('.pdf')]
+    assert downloaded == len(pdfs) == 2
+    for path in pdfs:
+        with open(path, 'rb') as f:
+            assert f.read() == stub.pdf_body
+
+
+def test_downloads_respect_per_host_limit(stub, make_scraper, tmp_path):
+    scraper = make_scraper(downloads_per_host=2, connections_per_host=8)
+    papers = [Paper(title=f"Paper {i}", pdf_url=f"{stub.base_url}/pdf/{i}.pdf") for i in range(8)]
+
+    async def download_all():
+        return await asyncio.gather(*[scraper.download_pdf(paper, str(tmp_path)) for paper in papers])
+
+    paths = run(scraper, download_all)
+
+    assert all(paths)
+    assert stub.pdf_requests_peak == 2
+
+
+def test_download_slots_work_across_event_loops(stub, make_scraper, tmp_path):
+    scraper = make_scraper(downloads_per_host=1)
+
+    for loop_index in range(2):
+        # Three downloads for one slot, so every run has to wait on the host's semaphore
+        papers = [Paper(title=f"Run {loop_index} paper {i}", pdf_url=f"{stub.base_url}/pdf/{loop_index}-{i}.pdf")
+                  for i in range(3)]
+
+        async def download_all():
+            return await asyncio.gather(*[scraper.download_pdf(paper, str(tmp_path)) for paper in papers])
+
+        assert all(run(scraper, download_all))
+    assert stub.pdf_requests_peak == 1
+
+
+def test_downloads_are_retried_like_searches(stub, make_scraper, tmp_path):
+    scraper = make_scraper()
+    scraper.retry_policy.base_delay = 0.01
+    stub.pdf_failures = 2
+    paper = Paper(title="Retried paper", pdf_url=f"{stub.base_url}/pdf/retried.pdf")
+
+    path = run(scraper, scraper.download_pdf, paper, str(tmp_path))
+
+    assert path and stub.pdf_failures == 0
+    assert scraper.metrics.counters[('retries', (('source', 'download'),))] == 2
@@ -0,0 +1,55 @@
+"""Tests of resuming downloads in the blob store."""
+
+import os
+import socket
+import subprocess
+import sys
+
+from blob_store import BlobStore
+
+URL = 'https://example.org/paper.pdf'
+
+
+def dead_pid():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return process.pid
+
+
+def orphan(store, pid, data, tag='a'):
+    """A private partial file as a killed process leaves it."""
+    path = store.partial_path(URL)[:-len('.part')] + f".{socket.gethostname()}-{pid}-{tag}.part"
+    with open(path, 'wb') as f:
+        f.write(data)
+    return path
+
+
+def test_killed_download_is_resumed(tmp_path):
+    store = BlobStore(str(tmp_path / 'blobs'))
+    orphan(store, dead_pid(), b'%PDF-1.4 first half')
+
+    writer = store.writer(URL)
+    assert writer.size == len(b'%PDF-1.4 first half')
+    writer.write(b' second half')
+    digest = store.commit(writer, URL)
+    assert store.lookup_url(URL) == digest
+    assert os.listdir(tmp_path / 'blobs' / 'partial') == []
+
+
+def test_longest_orphan_is_kept_when_the_store_opens(tmp_path):
+    store = BlobStore(str(tmp_path / 'blobs'))
+    pid = dead_pid()
+    orphan(store, pid, b'%PDF-1.4 short', 'a')
+    orphan(store, pid, b'%PDF-1.4 much longer', 'b')
+
+    store = BlobStore(str(tmp_path / 'blobs'))
+    assert os.listdir(tmp_path / 'blobs' / 'partial') == [os.path.basename(store.partial_path(URL))]
+    assert store.writer(URL).size == len(b'%PDF-1.4 much longer')
+
+
+def test_partial_of_a_running_process_is_left_alone(tmp_path):
+    store = BlobStore(str(tmp_path / 'blobs'))
+    path = orphan(store, os.getpid(), b'%PDF-1.4 still downloading')
+
+    assert store.writer(URL).size == 0
+    assert os.path.exists(path)
@@ -0,0 +1,60 @@
+"""Tests of PDF download claims in the corpus index."""
+
+import socket
+import subprocess
+import sys
+
+import pytest
+
+from corpus_index import CorpusIndex, download_owner
+from paper import Paper
+
+
+@pytest.fixture
+def index(tmp_path):
+    index = CorpusIndex(str(tmp_path / 'index.sqlite'))
+    yield index
+    index.close()
+
+
+def add_paper(index, title='A paper about claims'):
+    return index.add(Paper(title=title, doi='10.1000/claims'), 'testing', 'claims')
+
+
+def dead_owner():
+    process = subprocess.Popen([sys.executable, '-c', 'pass'])
+    process.wait()
+    return f"{socket.gethostname()}:{process.pid}:main"
+
+
+def test_live_claim_is_exclusive(index):
+    paper_id = add_paper(index)
+    assert index.claim_download(paper_id, download_owner('a'))
+    assert not index.claim_download(paper_id, download_owner('b'))
+
+
+def test_claim_of_dead_process_is_taken_over(index):
+    paper_id = add_paper(index)
+    assert index.claim_download(paper_id, dead_owner())
+    assert index.wait_for_pdf(paper_id, interval=0.01) is None
+    assert index.claim_download(paper_id, download_owner())
+
+
+def test_released_claims_can_be_claimed_again(index):
+    paper_id = add_paper(index)
+    owner = download_owner()
+    assert index.claim_download(paper_id, owner)
+    index.release_claims(owner)
+    assert index.claim_download(paper_id, download_owner('next run'))
+
+
+def test_saved_pdf_is_claimed_again_once_deleted(index, tmp_path):
+    paper_id = add_paper(index)
+    pdf_path = tmp_path / 'paper.pdf'
+    pdf_path.write_bytes(b'%PDF-1.4')
+    assert index.claim_download(paper_id, download_owner())
+    index.set_pdf(paper_id, str(pdf_path))
+    assert not index.claim_download(paper_id, download_owner('b'))
+
+    pdf_path.unlink()
+    assert index.claim_download(paper_id, download_owner('b'))
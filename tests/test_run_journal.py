@@ -0,0 +1,15 @@
+"""Tests of resuming a run from its journal."""
+
+from paper import Paper
+from run_journal import RunJournal
+
+
+def test_search_is_replayed_with_its_total(tmp_path):
+    journal_file = str(tmp_path / 'journal.jsonl')
+    kept = [Paper(title='Kept paper', doi='10.1000/kept')]
+    RunJournal(journal_file).record_search('testing', 1, 'query', kept, total_found=40)
+
+    journal = RunJournal(journal_file)
+    assert [paper['title'] for paper in journal.get_search_results('testing', 1)] == ['Kept paper']
+    assert journal.get_total_found('testing', 1) == 40
+    assert journal.get_total_found('testing', 2) is None
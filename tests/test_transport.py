@@ -0,0 +1,55 @@
+"""Tests of the session's DNS cache."""
+
+import ipaddress
+import socket
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pytest
+
+from transport import build_session
+
+
+class Handler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        self.send_response(200)
+        self.send_header('Content-Length', '2')
+        self.end_headers()
+        self.wfile.write(b'ok')
+
+    def log_message(self, *args):
+        pass
+
+
+@pytest.fixture
+def server():
+    server = ThreadingHTTPServer(('127.0.0.1', 0), Handler)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+def test_dns_cache_is_scoped_to_the_session(server, monkeypatch):
+    lookups = []
+    getaddrinfo = socket.getaddrinfo
+
+    def counting_getaddrinfo(host, *args, **kwargs):
+        try:
+            ipaddress.ip_address(host)
+        except ValueError:
+            # Only names need a DNS query; addresses are parsed in place
+            lookups.append(host)
+        return getaddrinfo(host, *args, **kwargs)
+
+    monkeypatch.setattr(socket, 'getaddrinfo', counting_getaddrinfo)
+    session = build_session()
+    assert socket.getaddrinfo is counting_getaddrinfo
+
+    url = f"http://localhost:{server.server_address[1]}/"
+    for _ in range(3):
+        # A new connection each time, so every request has to find the address
+        assert session.get(url, headers={'Connection': 'close'}).text == 'ok'
+    session.close()
+    assert lookups == ['localhost']
@@ -0,0 +1,126 @@
+"""
+Shared HTTP transport for the scholarly article scraper.
+One requests.Session with explicitly sized keep-alive connection pools,
+compressed responses (brotli when a decoder is installed) and a small DNS
+cache of its own, used by every search method and the PDF downloader.
+"""
+
+import socket
+import threading
+import time
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3 import HTTPConnectionPool, HTTPSConnectionPool
+from urllib3.exceptions import ConnectTimeoutError, NewConnectionError
+
+try:
+    import brotli  # noqa: F401  (lets urllib3 decode `br` responses)
+    BROTLI_AVAILABLE = True
+except ImportError:
+    try:
+        import brotlicffi  # noqa: F401
+        BROTLI_AVAILABLE = True
+    except ImportError:
+        BROTLI_AVAILABLE = False
+
+# PDFs are fetched unencoded so byte ranges line up when a download resumes
+DOWNLOAD_HEADERS = {'Accept': 'application/pdf,*/*', 'Accept-Encoding': 'identity'}
+
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/131.0.0.0 Safari/537.36'
+
+class DNSCache:
+    """getaddrinfo() results of the hosts one session connects to, kept for `ttl` seconds."""
+
+    def __init__(self, ttl=300):
+        self.ttl = ttl
+        self.entries = {}
+        self.lock = threading.Lock()
+
+    def resolve(self, host, port):
+        """Return the addresses of `host` to try in order, or None if it does not resolve."""
+        key = (host, port)
+        now = time.monotonic()
+        with self.lock:
+            entry = self.entries.get(key)
+            if entry is not None and now - entry[0] < self.ttl:
+                return entry[1]
+
+        try:
+            infos = socket.getaddrinfo(host, port, 0, socket.SOCK_STREAM)
+        except OSError:
+            # Left to urllib3, which reports it as a NameResolutionError
+            return None
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self.lock:
+            self.entries[key] = (now, addresses)
+        return addresses
+
+
+class _CachedDNSConnection:
+    """Opens sockets to the addresses in `dns_cache`; TLS and Host headers still use the host name."""
+
+    dns_cache = None
+
+    def _new_conn(self):
+        host = self._dns_host
+        addresses = self.dns_cache.resolve(host, self.port) or [host]
+        try:
+            for address in addresses[:-1]:
+                self._dns_host = address
+                try:
+                    return super()._new_conn()
+                except (NewConnectionError, ConnectTimeoutError):
+                    continue
+            self._dns_host = addresses[-1]
+            return super()._new_conn()
+        finally:
+            self._dns_host = host
+
+
+class CachedDNSAdapter(HTTPAdapter):
+    """HTTPAdapter whose connections resolve host names through a DNSCache of its own."""
+
+    def __init__(self, dns_cache, **kwargs):
+        # init_poolmanager() runs inside HTTPAdapter.__init__ and needs the cache
+        self.dns_cache = dns_cache
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        super().init_poolmanager(*args, **kwargs)
+        self.poolmanager.pool_classes_by_scheme = {
+            scheme: type(pool_class.__name__, (pool_class,), {
+                'ConnectionCls': type(pool_class.ConnectionCls.__name__,
+                                      (_CachedDNSConnection, pool_class.ConnectionCls),
+                                      {'dns_cache': self.dns_cache})
+            })
+            for scheme, pool_class in (('http', HTTPConnectionPool), ('https', HTTPSConnectionPool))
+        }
+
+
+def accept_encoding():
+    """Accept-Encoding header for the codecs urllib3 can decode here."""
+    return 'gzip, deflate, br' if BROTLI_AVAILABLE else 'gzip, deflate'
+
+
+def build_session(pool_connections=32, pool_maxsize=16, dns_ttl=300):
+    """
+    Return a Session whose adapters keep up to `pool_maxsize` open connections
+    for each of `pool_connections` hosts, resolving host names through a DNS
+    cache kept for `dns_ttl` seconds. Retries are left to resilience.py.
+    """
+    session = requests.Session()
+    if dns_ttl:
+        # Scoped to this session's connections; other code in the process resolves as usual
+        adapter = CachedDNSAdapter(DNSCache(dns_ttl), pool_connections=pool_connections,
+                                   pool_maxsize=pool_maxsize, max_retries=0)
+    else:
+        adapter = HTTPAdapter(pool_connections=pool_connections, pool_maxsize=pool_maxsize, max_retries=0)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({
+        'User-Agent': USER_AGENT,
+        'Accept-Encoding': accept_encoding(),
+        'Connection': 'keep-alive'
+    })
+    return session
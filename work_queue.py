@@ -0,0 +1,133 @@
+"""
+SQLite-backed work queue of (category, query) items for sharded runs.
+Worker processes, or machines sharing the queue file, claim items one at a
+time; a claim that is not finished within its lease goes back to the queue,
+or is marked failed once the item has used up its attempts.
+"""
+
+import socket
+import sqlite3
+import threading
+import time
+
+
+class WorkQueue:
+    """Queue of queries to scrape, shared through a SQLite file."""
+
+    def __init__(self, queue_file, lease_seconds=1800, max_attempts=3):
+        self.queue_file = queue_file
+        self.lease_seconds = lease_seconds
+        self.max_attempts = max_attempts
+        self.lock = threading.Lock()
+
+        self.db = sqlite3.connect(queue_file, timeout=30, isolation_level=None, check_same_thread=False)
+        self.db.executescript("""
+            PRAGMA journal_mode = WAL;
+            CREATE TABLE IF NOT EXISTS work_items (
+                id INTEGER PRIMARY KEY,
+                category TEXT NOT NULL,
+                query_index INTEGER NOT NULL,
+                query TEXT NOT NULL,
+                max_papers INTEGER NOT NULL,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                claimed_at REAL,
+                finished_at REAL,
+                downloaded INTEGER,
+                error TEXT,
+                UNIQUE (category, query_index)
+            );
+            CREATE INDEX IF NOT EXISTS work_items_status ON work_items (status);
+        """)
+
+    def enqueue_categories(self, search_categories, category_names, max_papers):
+        """Add one item per query of each category; items already queued are kept."""
+        rows = [
+            (category_name, i, query, max_papers)
+            for category_name in category_names
+            for i, query in enumerate(search_categories.get(category_name, []), 1)
+        ]
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            self.db.executemany(
+                "INSERT OR IGNORE INTO work_items (category, query_index, query, max_papers) VALUES (?, ?, ?, ?)",
+                rows
+            )
+            self.db.execute("COMMIT")
+        return len(rows)
+
+    def claim(self, worker):
+        """Claim the next pending (or expired) item for `worker`; return it as a dict or None."""
+        now = time.time()
+        with self.lock:
+            self.db.execute("BEGIN IMMEDIATE")
+            try:
+                # A worker died holding an item that has no attempts left: give up on it
+                self.db.execute(
+                    "UPDATE work_items SET status = 'failed', error = 'claim expired' "
+                    "WHERE status = 'claimed' AND claimed_at < ? AND attempts >= ?",
+                    (now - self.lease_seconds, self.max_attempts)
+                )
+                row = self.db.execute("""
+                    SELECT id, category, query_index, query, max_papers FROM work_items
+                    WHERE (status = 'pending' OR (status = 'claimed' AND claimed_at < ?))
+                      AND attempts < ?
+                    ORDER BY id LIMIT 1
+                """, (now - self.lease_seconds, self.max_attempts)).fetchone()
+                if row is not None:
+                    self.db.execute(
+                        "UPDATE work_items SET status = 'claimed', worker = ?, claimed_at = ?, "
+                        "attempts = attempts + 1 WHERE id = ?", (worker, now, row[0])
+                    )
+                self.db.execute("COMMIT")
+            except Exception:
+                self.db.execute("ROLLBACK")
+                raise
+
+        if row is None:
+            return None
+        return dict(zip(('id', 'category', 'query_index', 'query', 'max_papers'), row))
+
+    def complete(self, item_id, downloaded):
+        """Mark an item as done with the number of PDFs it downloaded."""
+        with self.lock:
+            self.db.execute(
+                "UPDATE work_items SET status = 'done', finished_at = ?, downloaded = ?, error = NULL WHERE id = ?",
+                (time.time(), downloaded, item_id)
+            )
+
+    def fail(self, item_id, error):
+        """Put a failed item back in the queue (until it runs out of attempts)."""
+        with self.lock:
+            self.db.execute(
+                "UPDATE work_items SET status = CASE WHEN attempts < ? THEN 'pending' ELSE 'failed' END, "
+                "error = ? WHERE id = ?", (self.max_attempts, str(error), item_id)
+            )
+
+    def counts(self):
+        """Return the number of items in each status."""
+        with self.lock:
+            return dict(self.db.execute("SELECT status, COUNT(*) FROM work_items GROUP BY status"))
+
+    def downloaded_by_category(self):
+        """Return PDFs downloaded per category by finished items."""
+        with self.lock:
+            return dict(self.db.execute(
+                "SELECT category, COALESCE(SUM(downloaded), 0) FROM work_items "
+                "WHERE status = 'done' GROUP BY category"
+            ))
+
+    def clear(self):
+        """Drop every item once a sharded run has completed."""
+        with self.lock:
+            self.db.execute("DELETE FROM work_items")
+
+    def close(self):
+        with self.lock:
+            self.db.close()
+
+
+def default_worker_name(index):
+    """Worker name that stays unique across machines sharing a queue file."""
+    return f"{socket.gethostname()}-{index}"